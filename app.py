@@ -1,49 +1,684 @@
 # debug_app.py - Complete Enhanced version with updated selectors and better error handling
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context, g
 import requests
 from bs4 import BeautifulSoup
 import time
 import re
-import csv
 import io
 import json
+import base64
+import tempfile
 from urllib.parse import quote
 import logging
 import random
-
-# Setup logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+import os
+import threading
+import itertools
+import hashlib
+import atexit
+import signal
+import importlib.util
+import uuid
+from collections import deque
+from types import SimpleNamespace
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, Future
+
+from driver_pool import WebDriverPool, DriverUnavailable
+from workers import WorkerSupervisor, WorkerError
+from jobs import JobManager
+from batch import BatchRunner, RateLimiter
+from tiling import TiledSearch, Geocoder, GEOCODE_URL
+from enrichment import InstagramEnricher, NOT_FOUND as INSTAGRAM_NOT_FOUND
+from storage import (ResultCache, EntityStore, ResultStore, PageCache, SelectorStatsStore, SnapshotStore,
+                     normalize_query, valid_cursor, RESULT_SORTS)
+from selector_registry import SelectorRegistry
+from metrics import MetricsRegistry
+from exports import EXPORT_FORMATS, ExportUnavailable, iter_csv, write_xlsx, write_parquet
+from logging_config import configure_logging, request_id, run_in_context, HOT
+
+# Setup logging (LOG_FORMAT=json for structured output); per-element events are sampled DEBUG
+configure_logging()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
-# Try to import selenium, but make it optional
-try:
-    from selenium import webdriver
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from selenium.webdriver.common.action_chains import ActionChains
-
-    SELENIUM_AVAILABLE = True
+# Selenium is optional and only imported when the first browser is needed
+SELENIUM_AVAILABLE = importlib.util.find_spec('selenium') is not None
+if SELENIUM_AVAILABLE:
     logger.info("Selenium is available")
-except ImportError as e:
-    SELENIUM_AVAILABLE = False
-    logger.warning(f"Selenium not available: {e}")
+else:
+    logger.warning("Selenium not available: No module named 'selenium'")
+
+
+class By:
+    """Selenium's locator strategies, defined here so using them does not import selenium"""
+    CSS_SELECTOR = 'css selector'
+    TAG_NAME = 'tag name'
+
+
+_selenium = None
+
+
+def selenium_api():
+    """Selenium classes used by the scraper, imported on first call"""
+    global _selenium
+    if _selenium is None:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions
+        from selenium.webdriver.common.action_chains import ActionChains
+        from selenium.common.exceptions import TimeoutException
+
+        _selenium = SimpleNamespace(webdriver=webdriver, Options=Options, WebDriverWait=WebDriverWait,
+                                    EC=expected_conditions, ActionChains=ActionChains,
+                                    TimeoutException=TimeoutException)
+    return _selenium
+
+
+# WebDriver pool sizing (one browser per concurrent scrape)
+DRIVER_POOL_SIZE = int(os.environ.get('DRIVER_POOL_SIZE', 2))
+DRIVER_MAX_PAGES = int(os.environ.get('DRIVER_MAX_PAGES', 50))
+DRIVER_CHECKOUT_TIMEOUT = float(os.environ.get('DRIVER_CHECKOUT_TIMEOUT', 120))
+# After Chrome fails to start, scrapes use demo data for this long before a launch is tried again
+DRIVER_LAUNCH_BACKOFF = float(os.environ.get('DRIVER_LAUNCH_BACKOFF', 30))
+# Browsers started in the background once the server is up (0: first scrape starts one)
+DRIVER_PREWARM = int(os.environ.get('DRIVER_PREWARM', 0))
+
+# Run scrapes in this many supervised worker processes that own their browsers (0: in the web process)
+SCRAPE_WORKERS = int(os.environ.get('SCRAPE_WORKERS', 0))
+# A worker (with its Chrome processes) is replaced after WORKER_MAX_JOBS scrapes or once it passes
+# WORKER_MAX_RSS_MB, and killed at twice that; jobs are killed WORKER_KILL_GRACE seconds past their budget
+WORKER_MAX_RSS_MB = float(os.environ.get('WORKER_MAX_RSS_MB', 1024))
+WORKER_MAX_JOBS = int(os.environ.get('WORKER_MAX_JOBS', 100))
+WORKER_KILL_GRACE = float(os.environ.get('WORKER_KILL_GRACE', 30))
+WORKER_CHECK_INTERVAL = float(os.environ.get('WORKER_CHECK_INTERVAL', 5))
+
+# 'standard' loads Maps like a desktop user; 'lean' blocks images, fonts, media, map tiles and
+# analytics, and navigation returns at DOMContentLoaded instead of the window load event
+BROWSER_PROFILE = os.environ.get('BROWSER_PROFILE', 'standard')
+BROWSER_PROFILES = ('standard', 'lean')
+# Requests the lean profile cancels (Network.setBlockedURLs wildcards); the results feed and
+# place panels come from XHR and scripts, which stay allowed
+LEAN_BLOCKED_URLS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.ico', '*.svg',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*fonts.gstatic.com/*', '*fonts.googleapis.com/*',
+    '*.mp4', '*.webm', '*.mp3', '*.m3u8',
+    '*googleusercontent.com/*', '*ggpht.com/*', '*/maps/vt*', '*/kh/v=*', '*streetviewpixels*',
+    '*google-analytics.com/*', '*googletagmanager.com/*', '*doubleclick.net/*', '*/gen_204*', '*/log?format=*'
+]
+# Chrome content settings for the lean profile (2 = block)
+LEAN_CONTENT_SETTINGS = {
+    'profile.managed_default_content_settings.images': 2,
+    'profile.managed_default_content_settings.media_stream': 2,
+    'profile.managed_default_content_settings.notifications': 2,
+    'profile.managed_default_content_settings.geolocation': 2
+}
+# Installed in every new document so Resource Timing keeps an entry per request (the default is 250)
+RESOURCE_TIMING_SCRIPT = "performance.setResourceTimingBufferSize(100000);"
+# Bytes the current page has downloaded; cross-origin responses without Timing-Allow-Origin
+# report 0, so this is a lower bound
+TRANSFER_SIZE_SCRIPT = """
+const entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+let bytes = 0;
+for (const entry of entries) bytes += entry.transferSize || 0;
+return bytes;
+"""
+
+# Latency budget for a whole scrape and per-condition wait limits (seconds)
+SCRAPE_BUDGET = float(os.environ.get('SCRAPE_BUDGET', 300))
+PAGE_READY_TIMEOUT = 15
+# Hard limit on driver.get, so a hung navigation fails instead of blocking the scrape
+PAGE_LOAD_TIMEOUT = 60
+DETAIL_READY_TIMEOUT = 8
+WAIT_POLL_INTERVAL = 0.2
+
+# Something that only exists once Maps has rendered results or a place panel
+RESULTS_READY_SELECTOR = 'div[role="feed"] > div, div[role="article"], .hfpxzc, a[data-cid], h1.DUwDvf'
+
+# 'bulk' parses every result card from one page_source; 'click' opens each listing
+EXTRACTION_MODE = os.environ.get('EXTRACTION_MODE', 'bulk')
+EXTRACTION_MODES = ('bulk', 'click')
+
+# Result-card anchors, in document order, shared by the parser and the click fallback
+FEED_CARD_SELECTOR = 'a.hfpxzc'
+# Shown below the last card once Maps has no more results to load
+FEED_END_SELECTOR = 'span.HlvSq'
+# Star rating and review count on a result card; with name, contacts and cid they fingerprint the card
+CARD_RATING_SELECTOR = '.MW4etd'
+CARD_REVIEWS_SELECTOR = '.UY7F9'
+# Largest limit a search may ask for; the feed is scrolled until that many cards are loaded
+MAX_LIMIT = int(os.environ.get('MAX_LIMIT', 500))
+# Wait for each scroll to load more cards, and scrolls in a row that may load nothing
+FEED_SCROLL_TIMEOUT = 5
+FEED_MAX_STALLS = 2
+# Cards missing any of these fields are completed through the detail panel
+BULK_REQUIRED_FIELDS = ('name', 'phone')
+
+# Per-field freshness of the place-id entity cache (seconds)
+DETAIL_FIELDS = ('name', 'phone', 'website')
+INSTAGRAM_FIELDS = ('instagram_handle', 'instagram_bio', 'instagram_followers')
+ENTITY_CONTACT_TTL = float(os.environ.get('ENTITY_CONTACT_TTL', 30 * 24 * 3600))
+ENTITY_INSTAGRAM_TTL = float(os.environ.get('ENTITY_INSTAGRAM_TTL', 7 * 24 * 3600))
+ENTITY_FIELD_TTLS = dict([(field, ENTITY_CONTACT_TTL) for field in DETAIL_FIELDS] +
+                         [(field, ENTITY_INSTAGRAM_TTL) for field in INSTAGRAM_FIELDS])
+
+# 'website' reads Instagram links from each business website, 'http' also searches by
+# name when the site has none, 'simulated' keeps the offline name heuristic
+INSTAGRAM_LOOKUP = os.environ.get('INSTAGRAM_LOOKUP', 'website')
+INSTAGRAM_WORKERS = int(os.environ.get('INSTAGRAM_WORKERS', 8))
+INSTAGRAM_PER_HOST = int(os.environ.get('INSTAGRAM_PER_HOST', 2))
+INSTAGRAM_TIMEOUT = float(os.environ.get('INSTAGRAM_TIMEOUT', 10))
+INSTAGRAM_BASE_URL = os.environ.get('INSTAGRAM_BASE_URL', 'https://www.instagram.com')
+INSTAGRAM_SEARCH_URL = os.environ.get('INSTAGRAM_SEARCH_URL', 'https://www.google.com/search')
+WEBSITE_MIN_INTERVAL = float(os.environ.get('WEBSITE_MIN_INTERVAL', 1.0))
+WEBSITE_CACHE_MAX_AGE = float(os.environ.get('WEBSITE_CACHE_MAX_AGE', 24 * 3600))
+WEBSITE_CACHE_MAX_ENTRIES = int(os.environ.get('WEBSITE_CACHE_MAX_ENTRIES', 5000))
+# Parsed Instagram profiles kept in memory (for WEBSITE_CACHE_MAX_AGE) so repeat lookups skip the profile page
+INSTAGRAM_PROFILE_CACHE_ENTRIES = int(os.environ.get('INSTAGRAM_PROFILE_CACHE_ENTRIES', 5000))
+
+# 'script' evaluates every detail selector in one execute_script; 'selectors' walks them from Python
+DETAIL_MODE = os.environ.get('DETAIL_MODE', 'script')
+
+# Updated CSS selectors for current Google Maps structure (2024/2025); the selector
+# registry reorders each cascade by what currently matches
+LISTING_SELECTORS = [
+    'div[role="article"]',
+    'div[jsaction*="mouseover"]',
+    '.hfpxzc',
+    'div[data-result-index]',
+    '.Nv2PK.tH5CWc.ENn4tc',
+    'a[data-cid]',
+    '.bfdHYd',
+    '.lI9IFe',
+    '[data-result-index] > div',
+    'div[jsaction*="click"] > div'
+]
+
+NAME_SELECTORS = [
+    'h1[class*="DUwDvf"]',  # Main business name
+    'h1.fontHeadlineSmall',
+    '[data-attrid="title"] h1',
+    '.qBF1Pd.fontHeadlineSmall',
+    'h1[jsaction*="pane"]',
+    '[role="main"] h1',
+    '.x3AX1-LfntMc-header-title-title',
+    'div[data-value] h1',
+    'h1.Io6YTe',
+    '.P5Bobd h1',
+    'h1[data-attrid="title"]'
+]
+
+PHONE_SELECTORS = [
+    'button[data-item-id*="phone"] .Io6YTe',
+    'button[aria-label*="phone"] .Io6YTe',
+    '[data-value*="+91"]',
+    'button[jsaction*="phone"] span',
+    '.rogA2c .Io6YTe',
+    'button[data-item-id="phone:tel:"] span',
+    '[data-item-id*="phone"] span',
+    'button[data-value*="+"] span'
+]
+
+WEBSITE_SELECTORS = [
+    'a[data-item-id*="authority"] .Io6YTe',
+    'button[data-item-id*="authority"] + a',
+    'a[data-value*="http"]:not([href*="google.com"])',
+    '.CsEnBe a[href*="http"]:not([href*="google.com"])',
+    'button[aria-label*="website"] + a',
+    '[data-item-id*="authority"] a',
+    'a[href*="http"]:not([href*="google"]):not([href*="maps"])'
+]
+
+SELECTOR_CASCADES = {
+    'listing': LISTING_SELECTORS,
+    'name': NAME_SELECTORS,
+    'phone': PHONE_SELECTORS,
+    'website': WEBSITE_SELECTORS
+}
+
+# Returns, per selector, the raw values the Python side would have read element by element;
+# validation stays in Python so both modes accept exactly the same data
+DETAIL_EXTRACTION_SCRIPT = """
+var selectors = arguments[0];
+// Result cards stay in the DOM beside the panel; their links belong to other places
+function inPanel(el) { return !el.closest('div[role="feed"]'); }
+function collect(list, read) {
+    return list.map(function (selector) {
+        try {
+            return Array.prototype.filter.call(document.querySelectorAll(selector), inPanel).map(read);
+        } catch (e) {
+            return [];
+        }
+    });
+}
+function text(el) { return (el.innerText || el.textContent || '').trim(); }
+var panel = document.querySelector('[role="main"], .siAUzd, .m6QErb');
+return {
+    h1: Array.prototype.map.call(document.querySelectorAll('h1'), text),
+    name: collect(selectors.name, text),
+    phone: collect(selectors.phone, function (el) {
+        return [text(el), el.getAttribute('aria-label'), el.getAttribute('data-value')];
+    }),
+    website: collect(selectors.website, function (el) {
+        return [el.href || el.getAttribute('href'), text(el), el.getAttribute('data-value')];
+    }),
+    panel: panel ? text(panel) : null
+};
+"""
+
+PHONE_PATTERN = re.compile(r'[\+]?[\d\s\-\(\)]{7,}')
+CID_PATTERN = re.compile(r'!1s0x[0-9a-f]+:(0x[0-9a-f]+)')
+
+# Business-name patterns in page_source, highest priority first, each with a literal every
+# match contains and, when that literal is not the start of the match, the character that is
+FALLBACK_NAME_PATTERNS = [
+    (re.compile(r'"([^"]*)",null,null,null,null,\[10,3\]'), '",null,null,null,null,[10,3]', '"'),  # Google Maps data
+    (re.compile(r'<title>([^-|]+)[\-|]'), '<title>', None),  # From page title
+    (re.compile(r'"name":"([^"]+)"'), '"name":"', None),
+    (re.compile(r'aria-label="([^"]*)"[^>]*class="[^"]*DUwDvf'), 'aria-label="', None)
+]
+
+# Place link (data-cid or href) for each listing element, in one round-trip
+LISTING_CID_SCRIPT = """
+return arguments[0].map(function (el) {
+    var link = el.matches('a.hfpxzc, a[data-cid]') ? el : el.querySelector('a.hfpxzc, a[data-cid]');
+    return link ? (link.getAttribute('data-cid') || link.href || null) : null;
+});
+"""
+
+# Scrolls the results feed to its bottom and returns the cards rendered from index arguments[1] on,
+# each as [index among all FEED_CARD_SELECTOR matches, card HTML (if arguments[3]) or null]
+FEED_SCROLL_SCRIPT = """
+var feed = document.querySelector('div[role="feed"]');
+if (!feed) { return null; }
+var anchors = feed.querySelectorAll(arguments[0]);
+var cards = [];
+if (arguments[1] < anchors.length) {
+    var all = Array.prototype.slice.call(document.querySelectorAll(arguments[0]));
+    for (var i = arguments[1]; i < anchors.length; i++) {
+        var card = anchors[i].closest('div.Nv2PK') || anchors[i].parentNode;
+        cards.push([all.indexOf(anchors[i]), arguments[3] ? card.outerHTML : null]);
+    }
+}
+var end = !!document.querySelector(arguments[2]);
+feed.scrollTop = feed.scrollHeight;
+return {cards: cards, count: anchors.length, end: end};
+"""
+
+# [cards rendered in the feed, end marker shown]
+FEED_STATE_SCRIPT = """
+var feed = document.querySelector('div[role="feed"]');
+return [feed ? feed.querySelectorAll(arguments[0]).length : 0, !!document.querySelector(arguments[1])];
+"""
+
+# The one card anchor a click-through needs, so no list of element references is held
+FEED_CARD_ELEMENT_SCRIPT = """
+return document.querySelectorAll(arguments[0])[arguments[1]] || null;
+"""
+
+# Process-wide metrics served at /metrics
+metrics = MetricsRegistry()
+HTTP_REQUESTS = metrics.counter('http_requests_total', 'HTTP requests served', ['method', 'endpoint', 'status'])
+HTTP_SECONDS = metrics.histogram('http_request_duration_seconds', 'Time until the response is returned '
+                                 '(streamed bodies are timed separately)', ['method', 'endpoint'])
+PHASE_SECONDS = metrics.histogram('scrape_phase_seconds', 'Wall time per scrape phase', ['phase'])
+SCRAPE_EVENTS = metrics.counter('scrape_events_total', 'Cache hits and other per-business scrape events', ['event'])
+DEMO_FALLBACKS = metrics.counter('scrape_demo_fallbacks_total', 'Scrapes answered with demo data', ['reason'])
+BROWSER_BYTES = metrics.counter('browser_transfer_bytes_total', 'Bytes downloaded by the browser during scrapes',
+                                ['profile'])
+RESULT_CACHE_LOOKUPS = metrics.counter('result_cache_lookups_total', 'Search result cache lookups', ['result'])
+EXPORT_SECONDS = metrics.histogram('export_seconds', 'Time to produce an export, including streaming', ['format'])
+
+
+class ScrapeContext:
+    """Latency budget and per-phase timings for a single scrape request"""
+
+    def __init__(self, budget=SCRAPE_BUDGET, on_total=None, cancel_event=None):
+        self.budget = budget
+        self.started = time.monotonic()
+        self.deadline = self.started + budget
+        self.phases = {}
+        self.budget_exhausted = False
+        self.demo_data = False
+        self.demo_reason = None
+        # Why the scrape ended early without running out of budget (e.g. its worker was killed)
+        self.failed = None
+        self.counters = {}
+        # Diff against the previous run, set by delta scrapes
+        self.changes = None
+        self.bytes_transferred = 0
+        # Phases may be timed from enrichment threads too
+        self._lock = threading.Lock()
+        # Progress hooks for background jobs
+        self.on_total = on_total
+        self.cancel_event = cancel_event
+
+    def remaining(self):
+        """Seconds left in the budget (never negative)"""
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self):
+        if self.remaining() <= 0:
+            self.budget_exhausted = True
+        return self.budget_exhausted
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+        SCRAPE_EVENTS.inc(amount, event=name)
+
+    def use_demo_data(self, reason):
+        self.demo_data = True
+        self.demo_reason = reason
+        DEMO_FALLBACKS.inc(reason=reason)
+
+    def fail(self, reason):
+        """Mark the scrape as cut short, so its partial results are not cached or snapshotted"""
+        self.failed = reason
+        self.count(reason)
+
+    def cancelled(self):
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    def should_stop(self):
+        """True once the scrape was cancelled or ran out of budget"""
+        if self.cancelled():
+            return True
+        return self.expired()
+
+    def report_total(self, total):
+        if self.on_total:
+            self.on_total(total)
+
+    def wait_timeout(self, timeout):
+        """Clamp a wait so it never overruns the request budget"""
+        return min(timeout, self.remaining())
+
+    @contextmanager
+    def phase(self, name):
+        """Accumulate wall time spent in a named phase"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.monotonic() - start)
+
+    def add_phase(self, name, elapsed):
+        with self._lock:
+            stats = self.phases.setdefault(name, {'total': 0.0, 'count': 0, 'max': 0.0})
+            stats['total'] += elapsed
+            stats['count'] += 1
+            stats['max'] = max(stats['max'], elapsed)
+        PHASE_SECONDS.observe(elapsed, phase=name)
+
+    def merge(self, timings):
+        """Fold in what a worker process measured for this scrape (see WorkerScrapeContext.export)"""
+        for name, elapsed in timings['phase_samples']:
+            self.add_phase(name, elapsed)
+        for name, amount in timings['counters'].items():
+            self.count(name, amount)
+        if timings['demo_reason']:
+            self.use_demo_data(timings['demo_reason'])
+        if timings['budget_exhausted']:
+            self.budget_exhausted = True
+        if timings['bytes_transferred']:
+            self.bytes_transferred += timings['bytes_transferred']
+            BROWSER_BYTES.inc(timings['bytes_transferred'], profile=timings['browser_profile'])
+        if timings['changes'] is not None:
+            self.changes = timings['changes']
+
+    def as_dict(self):
+        with self._lock:
+            return self._as_dict()
+
+    def _as_dict(self):
+        return {
+            'total': round(time.monotonic() - self.started, 3),
+            'budget': self.budget,
+            'budget_exhausted': self.budget_exhausted,
+            'demo_data': self.demo_data,
+            'failed': self.failed,
+            'bytes_transferred': self.bytes_transferred,
+            'counters': dict(self.counters),
+            'phases': {
+                name: {'total': round(s['total'], 3), 'count': s['count'], 'max': round(s['max'], 3)}
+                for name, s in self.phases.items()
+            }
+        }
+
+
+def first_detail_title(driver):
+    """Text of the first meaningful h1 in the detail panel, or ''"""
+    for h1 in driver.find_elements(By.TAG_NAME, 'h1'):
+        text = h1.text.strip()
+        if text and not text.lower().startswith('result'):
+            return text
+    return ''
+
+
+def valid_name(text):
+    """True if ``text`` looks like a real business name rather than a placeholder"""
+    return bool(text) and len(text) > 2 and text != "Unknown Business" and not text.lower().startswith('result')
+
+
+def clean_phone(text):
+    """Pull a phone number out of free text, or None"""
+    if text and ('+' in text or any(char.isdigit() for char in text)):
+        phone_match = PHONE_PATTERN.search(text)
+        if phone_match:
+            return phone_match.group().strip()
+    return None
+
+
+def clean_website(href):
+    """Return ``href`` if it looks like a business website (not a Google link), else None"""
+    if href and 'http' in href and 'google.com' not in href and 'maps' not in href:
+        return href
+    return None
+
+
+def extract_cid(href):
+    """Google Maps customer id from a place URL (``!1s0x...:0x<cid>``), or None"""
+    match = CID_PATTERN.search(href or '')
+    return str(int(match.group(1), 16)) if match else None
+
+
+def scan_fallback_name(page_source):
+    """Business name from the first match of the highest-priority pattern that yields one, or None
+
+    A plain substring search finds where each pattern can first match, so the
+    regex only runs from there and stops at its first match.
+    """
+    for pattern, literal, opener in FALLBACK_NAME_PATTERNS:
+        index = page_source.find(literal)
+        if index < 0:
+            continue
+        if opener:
+            index = max(0, page_source.rfind(opener, 0, index))
+        match = pattern.search(page_source, index)
+        if match:
+            candidate = match.group(1).strip()
+            if len(candidate) > 2 and not candidate.lower().startswith('result'):
+                return candidate
+    return None
+
+
+def maps_search_url(city, keyword, viewport=None):
+    """Maps search URL for ``keyword in city``, or for ``keyword`` within a {'lat', 'lng', 'zoom'} viewport"""
+    if viewport:
+        # Without a place name in the query Maps searches the area on screen
+        return (f"https://www.google.com/maps/search/{quote(keyword)}/"
+                f"@{viewport['lat']},{viewport['lng']},{viewport['zoom']}z")
+    return f"https://www.google.com/maps/search/{quote(f'{keyword} in {city}')}"
+
+
+def element_present(selector):
+    """Wait condition: some element matches the CSS ``selector``"""
+    return selenium_api().EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+
+
+class detail_panel_changed:
+    """Wait condition: the detail panel shows place ``cid``, or a title different from ``previous``
+
+    Maps puts the open place's id in the URL, so neighbours sharing a name are
+    told apart; the title only decides for listings without a known cid.
+    """
+
+    def __init__(self, previous, cid=None):
+        self.previous = previous
+        self.cid = cid
+
+    def __call__(self, driver):
+        title = first_detail_title(driver)
+        if not title:
+            return False
+        if self.cid:
+            return title if extract_cid(driver.current_url) == self.cid else False
+        return title if title != self.previous else False
+
+
+class feed_grew:
+    """Wait condition: the results feed holds more than ``count`` cards or shows its end marker"""
+
+    def __init__(self, count):
+        self.count = count
+
+    def __call__(self, driver):
+        count, end = driver.execute_script(FEED_STATE_SCRIPT, FEED_CARD_SELECTOR, FEED_END_SELECTOR)
+        return count > self.count or end
+
+
+def configure_browser_network(driver, profile=BROWSER_PROFILE):
+    """DevTools setup for a new Chrome driver: full resource timing, plus URL blocking when lean"""
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': RESOURCE_TIMING_SCRIPT})
+    if profile == 'lean':
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URLS})
+
+
+def card_fingerprint(card, rating, reviews):
+    """Short hash of what a result card shows; a place whose card hash is unchanged needs no re-scrape"""
+    parts = (card['cid'] or '', card['name'], rating, reviews, card['phone'], card['website'])
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+class SearchDelta:
+    """One delta scrape compared card by card with the search's previous snapshot
+
+    ``previous`` maps cid -> {'position', 'fingerprint', 'business'}. Cards
+    without a cid cannot be matched and are always scraped as added.
+    """
+
+    def __init__(self, previous):
+        self.previous = previous
+        self.cards = {}  # cid -> (position, fingerprint, status) seen this run
+        self.businesses = {}  # cid -> business as yielded this run
+        self.scanned = 0
+
+    def check(self, card):
+        """'added', 'changed' or 'unchanged' for a parsed result card"""
+        self.scanned += 1
+        cid = card['cid']
+        entry = self.previous.get(cid) if cid else None
+        if entry is None:
+            status = 'added'
+        elif entry['fingerprint'] == card['fingerprint']:
+            status = 'unchanged'
+        else:
+            status = 'changed'
+        if cid:
+            self.cards[cid] = (card['index'], card['fingerprint'], status)
+        return status
+
+    def previous_business(self, cid):
+        return dict(self.previous[cid]['business'])
+
+    def reused(self, business):
+        """Whether ``business`` was answered from the snapshot rather than scraped this run"""
+        card = self.cards.get(business.get('cid'))
+        return card is not None and card[2] == 'unchanged'
+
+    def record(self, business):
+        if business.get('cid') in self.cards:
+            self.businesses[business['cid']] = business
+
+    def entries(self):
+        """(cid, position, fingerprint, business) for the next snapshot"""
+        return [(cid, position, fingerprint, self.businesses[cid])
+                for cid, (position, fingerprint, _) in self.cards.items() if cid in self.businesses]
+
+    def changes(self, limit):
+        """Diff against the previous run
+
+        A place from the previous run counts as removed when this run read the
+        whole feed (fewer cards than ``limit``) without seeing it, or when it
+        ranked inside ``limit`` last time and is gone now.
+        """
+        def summary(cid, business):
+            return {'cid': cid, 'name': business.get('name')}
+
+        added, changed, unchanged = [], [], 0
+        for cid, (_, _, status) in self.cards.items():
+            business = self.businesses.get(cid)
+            if business is None:
+                continue
+            if status == 'added':
+                added.append(summary(cid, business))
+            elif status == 'changed':
+                before = self.previous[cid]['business']
+                fields = [field for field in DETAIL_FIELDS + INSTAGRAM_FIELDS if before.get(field) != business.get(field)]
+                changed.append(dict(summary(cid, business), fields=fields))
+            else:
+                unchanged += 1
+
+        feed_exhausted = self.scanned < limit
+        removed = [summary(cid, entry['business']) for cid, entry in self.previous.items()
+                   if cid not in self.cards and (feed_exhausted or entry['position'] < limit)]
+        return {'baseline': bool(self.previous), 'added': added, 'changed': changed, 'removed': removed,
+                'unchanged': unchanged}
 
 
 class BusinessAnalyzer:
-    def __init__(self):
+    def __init__(self, driver_factory=None, pool_size=DRIVER_POOL_SIZE, max_pages=DRIVER_MAX_PAGES,
+                 entity_store=None, enricher=None, selectors=None, browser_profile=BROWSER_PROFILE,
+                 snapshot_store=None):
+        if browser_profile not in BROWSER_PROFILES:
+            raise ValueError(f"Unknown browser profile '{browser_profile}', expected one of {BROWSER_PROFILES}")
+        self.browser_profile = browser_profile
         self.businesses = []
-        self.driver = None
-        if SELENIUM_AVAILABLE:
-            self.setup_selenium()
+        self.entity_store = entity_store
+        # Previous runs of each search, for delta scrapes
+        self.snapshot_store = snapshot_store
+        self.selectors = selectors or SelectorRegistry(SELECTOR_CASCADES)
+        # Without an enricher Instagram lookups run inline
+        self.enricher = enricher
+        self.pool = None
+        if driver_factory is None and SELENIUM_AVAILABLE:
+            driver_factory = self.setup_selenium
+        if driver_factory is not None:
+            # Drivers are started lazily on first checkout
+            self.pool = WebDriverPool(driver_factory, size=pool_size, max_pages=max_pages,
+                                      checkout_timeout=DRIVER_CHECKOUT_TIMEOUT, launch_backoff=DRIVER_LAUNCH_BACKOFF)
+
+    def driver_status(self):
+        """'Available' once a browser is running, 'Launch failing' while launches fail,
+        'Not started' before the first launch, 'Not Available' without Selenium"""
+        if not self.pool:
+            return 'Not Available'
+        status = self.pool.status()
+        if status['live'] > 0:
+            return 'Available'
+        if status['last_launch_error']:
+            return 'Launch failing'
+        return 'Not started'
 
     def setup_selenium(self):
-        """Enhanced Selenium setup with better stealth options"""
+        """Enhanced Selenium setup with better stealth options; returns a new driver or None"""
         try:
-            chrome_options = Options()
+            selenium = selenium_api()
+            chrome_options = selenium.Options()
             chrome_options.add_argument('--headless')
             chrome_options.add_argument('--no-sandbox')
             chrome_options.add_argument('--disable-dev-shm-usage')
@@ -58,132 +693,535 @@ class BusinessAnalyzer:
             chrome_options.add_argument('--disable-plugins-discovery')
             chrome_options.add_argument('--disable-web-security')
             chrome_options.add_argument('--allow-running-insecure-content')
+            if self.browser_profile == 'lean':
+                # Waits poll for the results feed, so the load event (images, tiles) is not needed
+                chrome_options.page_load_strategy = 'eager'
+                chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+                chrome_options.add_argument('--mute-audio')
+                chrome_options.add_experimental_option('prefs', LEAN_CONTENT_SETTINGS)
 
             # Try to create webdriver
-            self.driver = webdriver.Chrome(options=chrome_options)
+            driver = selenium.webdriver.Chrome(options=chrome_options)
 
             # Execute script to hide webdriver property
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+            configure_browser_network(driver, self.browser_profile)
 
-            logger.info("Chrome WebDriver initialized successfully")
+            logger.info(f"Chrome WebDriver initialized successfully ({self.browser_profile} profile)")
+            return driver
 
         except Exception as e:
             logger.error(f"Chrome driver setup failed: {e}")
             logger.info("Falling back to requests-only mode")
-            self.driver = None
+            return None
 
-    def scrape_google_maps_businesses(self, city, keyword, limit=10):
+    def scrape_google_maps_businesses(self, city, keyword, limit=10, ctx=None, mode=EXTRACTION_MODE, viewport=None,
+                                      delta=False):
         """Enhanced scraping method with better error handling and updated selectors"""
+        businesses = list(self.iter_google_maps_businesses(city, keyword, limit, ctx=ctx, mode=mode,
+                                                           viewport=viewport, delta=delta))
+        logger.info(f"Scraping completed. Returning {len(businesses)} businesses")
+        return businesses
+
+    def iter_google_maps_businesses(self, city, keyword, limit=10, ctx=None, mode=EXTRACTION_MODE, viewport=None,
+                                    delta=False):
+        """Yield each business as soon as its details and Instagram data are ready
+
+        With a ``viewport`` ({'lat', 'lng', 'zoom'}) only that part of the map is
+        searched. Falls back to demo data when nothing real could be extracted.
+        Closing the generator early returns the borrowed driver to the pool.
+
+        With ``delta`` (bulk mode) cards unchanged since the search's last
+        snapshot are answered from it; only new and changed ones are scraped
+        in full. The diff lands in ``ctx.changes`` once the scrape completes.
+        """
         logger.info(f"Starting scrape for '{keyword}' in '{city}', limit: {limit}")
+        ctx = ctx or ScrapeContext()
 
-        if not SELENIUM_AVAILABLE or not self.driver:
+        if not self.pool:
             logger.warning("Using demo data - Selenium not available")
-            return self.get_demo_data(city, keyword, limit)
+            ctx.use_demo_data('selenium_unavailable')
+            yield from self.get_demo_data(city, keyword, limit)
+            return
+
+        try:
+            with ctx.phase('driver_checkout'):
+                driver = self.pool.checkout(timeout=ctx.wait_timeout(self.pool.checkout_timeout))
+        except DriverUnavailable as e:
+            logger.warning(f"Using demo data - no WebDriver available: {e}")
+            ctx.use_demo_data('no_driver')
+            yield from self.get_demo_data(city, keyword, limit)
+            return
+
+        search_delta = self.start_delta(city, keyword, mode) if delta else None
+        found = 0
+        for business_data in self._enrich(self._scrape_leased(driver, city, keyword, limit, ctx, mode, viewport,
+                                                              search_delta), ctx, search_delta):
+            found += 1
+            if search_delta:
+                search_delta.record(business_data)
+            yield business_data
+
+        logger.info(f"Scraping completed. Found {found} valid businesses")
+        if search_delta and found:
+            self.finish_delta(search_delta, city, keyword, limit, ctx)
+        if not found and not ctx.cancelled():
+            ctx.use_demo_data('no_results')
+            yield from self.get_demo_data(city, keyword, limit)
+
+    def start_delta(self, city, keyword, mode):
+        """SearchDelta against the search's stored snapshot, or None when a delta scrape is not possible"""
+        if not self.snapshot_store:
+            logger.warning("Delta scrape requested without a snapshot store, scraping in full")
+            return None
+        if mode != 'bulk':
+            logger.warning("Delta scrapes compare result cards and need bulk mode, scraping in full")
+            return None
+        try:
+            previous = self.snapshot_store.load(city, keyword)
+        except Exception as e:
+            logger.error(f"Error reading search snapshot: {e}")
+            return None
+        logger.info(f"Delta scrape against a snapshot of {len(previous)} places")
+        return SearchDelta(previous)
+
+    def finish_delta(self, search_delta, city, keyword, limit, ctx):
+        """Publish the diff and store this run as the next baseline, unless it was cut short"""
+        if ctx.demo_data or ctx.budget_exhausted or ctx.failed or ctx.cancelled() or not search_delta.cards:
+            return
+        ctx.changes = search_delta.changes(limit)
+        logger.info(f"Delta: {len(ctx.changes['added'])} added, {len(ctx.changes['changed'])} changed, "
+                    f"{len(ctx.changes['removed'])} removed, {ctx.changes['unchanged']} unchanged")
+        try:
+            self.snapshot_store.update(city, keyword, search_delta.entries(),
+                                       [entry['cid'] for entry in ctx.changes['removed']])
+        except Exception as e:
+            logger.error(f"Error writing search snapshot: {e}")
 
-        businesses = []
-        search_query = f"{keyword} in {city}"
+    def _scrape_leased(self, driver, city, keyword, limit, ctx, mode, viewport=None, search_delta=None):
+        """Yield extracted businesses, returning the driver as soon as the browser work is done"""
+        lease = {'driver': driver, 'pages': 0, 'crashed': False}
+        try:
+            yield from self._scrape_with_driver(lease, city, keyword, limit, ctx, mode, viewport, search_delta)
+        except Exception:
+            lease['crashed'] = True
+            raise
+        finally:
+            if not lease['crashed'] and lease['pages']:
+                self.record_transfer(driver, ctx)
+            self.pool.checkin(driver, pages=lease['pages'], crashed=lease['crashed'])
+
+    def record_transfer(self, driver, ctx):
+        """Add the bytes the search page downloaded to the scrape's totals"""
+        try:
+            transferred = driver.execute_script(TRANSFER_SIZE_SCRIPT)
+        except Exception as e:
+            logger.debug(f"Could not read transfer size: {e}")
+            return
+        if transferred is None:
+            return
+        transferred = int(transferred)
+        ctx.bytes_transferred += transferred
+        BROWSER_BYTES.inc(transferred, profile=self.browser_profile)
+        logger.info(f"Search page transferred {transferred / 1024:.0f} KiB ({self.browser_profile} profile)")
+
+    def _enrich(self, businesses, ctx, search_delta=None):
+        """Instagram stage: lookups run on the enricher while the browser moves on
+
+        Businesses are yielded in extraction order as soon as their lookup is done.
+        Those a delta scrape answered from its snapshot are not written back to
+        the entity cache, which would make their old fields look fresh.
+        """
+        pending = deque()
+        try:
+            for business_data in businesses:
+                remember = not (search_delta and search_delta.reused(business_data))
+                pending.append((business_data, self._submit_instagram(business_data, ctx), remember))
+                while pending and pending[0][1].done():
+                    yield self._finish_instagram(*pending.popleft())
+
+            while pending:
+                business_data, future, remember = pending.popleft()
+                with ctx.phase('instagram_wait'):
+                    business_data = self._finish_instagram(business_data, future, remember)
+                yield business_data
+        finally:
+            for _, future, _ in pending:
+                future.cancel()
+            businesses.close()
+
+    def _submit_instagram(self, business_data, ctx):
+        if all(field in business_data for field in INSTAGRAM_FIELDS):
+            # Already filled from the entity cache
+            future = Future()
+            future.set_result(None)
+            return future
+        if self.enricher is None:
+            future = Future()
+            try:
+                future.set_result(self._lookup_instagram(business_data['name'], business_data.get('website'), ctx))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return self.enricher.submit(self._lookup_instagram, business_data['name'], business_data.get('website'), ctx)
+
+    def _lookup_instagram(self, business_name, website, ctx):
+        with ctx.phase('instagram'):
+            return self.lookup_instagram(business_name, website)
+
+    def _finish_instagram(self, business_data, future, remember=True):
+        try:
+            instagram_data = future.result()
+        except Exception as e:
+            logger.error(f"Error finding Instagram profile: {e}")
+            instagram_data = dict(INSTAGRAM_NOT_FOUND)
+        if instagram_data:
+            business_data.update(instagram_data)
+        if remember:
+            self.remember_entity(business_data)
+        return business_data
+
+    def lookup_instagram(self, business_name, website=None):
+        """Instagram fields for one business using the configured lookup"""
+        if INSTAGRAM_LOOKUP in ('website', 'http') and self.enricher is not None:
+            if website == "Not found":
+                website = None
+            return self.enricher.lookup(business_name, website, search=INSTAGRAM_LOOKUP == 'http')
+        return self.find_instagram_profile(business_name)
+
+    def wait_for(self, driver, condition, timeout, ctx):
+        """Poll ``condition`` until truthy or the (budget-clamped) timeout passes; None on timeout"""
+        selenium = selenium_api()
+        try:
+            return selenium.WebDriverWait(driver, ctx.wait_timeout(timeout),
+                                          poll_frequency=WAIT_POLL_INTERVAL).until(condition)
+        except selenium.TimeoutException:
+            return None
+
+    def _scrape_with_driver(self, lease, city, keyword, limit, ctx, mode=EXTRACTION_MODE, viewport=None,
+                            search_delta=None):
+        """Run one search on a driver borrowed from the pool"""
+        driver = lease['driver']
 
         try:
             # Search on Google Maps
-            maps_url = f"https://www.google.com/maps/search/{quote(search_query)}"
+            maps_url = maps_search_url(city, keyword, viewport)
             logger.info(f"Navigating to: {maps_url}")
 
-            self.driver.get(maps_url)
-            time.sleep(10)  # Increased wait time for page load
-
-            # Debug: Log current page info
-            logger.info(f"Page title: {self.driver.title}")
-            logger.info(f"Current URL: {self.driver.current_url}")
+            with ctx.phase('navigation'):
+                driver.get(maps_url)
+                lease['pages'] += 1
+                # Wait until results (or a single place panel) are rendered
+                if not self.wait_for(driver, element_present(RESULTS_READY_SELECTOR), PAGE_READY_TIMEOUT, ctx):
+                    logger.warning("Results feed not ready before timeout")
 
             # Check if we're on the right page
-            current_url = self.driver.current_url
+            current_url = driver.current_url
+            if logger.isEnabledFor(logging.DEBUG):
+                # driver.title is another WebDriver round-trip
+                logger.debug("Page title: %s, URL: %s", driver.title, current_url)
             if "google.com/maps" not in current_url:
                 logger.error("Failed to load Google Maps properly")
-                return self.get_demo_data(city, keyword, limit)
+                return
+
+            if mode == 'bulk':
+                # Cards are processed as each scroll of the feed loads them
+                cards = self.iter_feed_cards(driver, limit, ctx)
+                first = next(cards, None)
+                if first:
+                    yield from self._process_cards(driver, itertools.chain([first], cards), ctx, search_delta)
+                    return
+                logger.warning("No result cards parsed from the feed, falling back to click-through")
+
+            yield from self._process_listings(driver, limit, ctx)
 
-            # Wait for results to load and try multiple selectors
-            business_elements = self.find_business_listings(limit)
+        except Exception as e:
+            logger.error(f"Error scraping Google Maps: {e}")
+            # A failure outside the per-business loop usually means a dead session
+            lease['crashed'] = True
+
+    def _process_listings(self, driver, limit, ctx):
+        """Click through each listing element and read its detail panel"""
+        # Wait for results to load and try multiple selectors
+        with ctx.phase('listing_discovery'):
+            self.load_feed(driver, limit, ctx)
+            business_elements = self.find_business_listings(driver, limit, ctx)
 
             if not business_elements:
                 logger.warning("No business elements found, trying alternative approach")
-                # Try scrolling and waiting more
-                self.driver.execute_script("window.scrollTo(0, 500);")
-                time.sleep(5)
-                business_elements = self.find_business_listings(limit)
+                # Try scrolling to trigger lazy rendering, then look again
+                driver.execute_script("window.scrollTo(0, 500);")
+                business_elements = self.find_business_listings(driver, limit, ctx)
 
-                if not business_elements:
-                    logger.warning("Still no business elements found, using demo data")
-                    return self.get_demo_data(city, keyword, limit)
+        if not business_elements:
+            logger.warning("Still no business elements found, using demo data")
+            return
 
-            logger.info(f"Found {len(business_elements)} business elements to process")
+        logger.info(f"Found {len(business_elements)} business elements to process")
+        ctx.report_total(len(business_elements))
+        current_title = first_detail_title(driver)
+        cids = self.listing_cids(driver, business_elements)
 
-            # Extract business information
-            for i, element in enumerate(business_elements):
-                try:
-                    logger.info(f"Processing business {i + 1}/{len(business_elements)}")
+        # Extract business information
+        for i, element in enumerate(business_elements):
+            if ctx.should_stop():
+                logger.warning(f"Stopping scrape after {i} businesses (cancelled={ctx.cancelled()})")
+                break
 
-                    # Scroll element into view
-                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-                    time.sleep(2)
+            try:
+                logger.debug("Processing business %d/%d", i + 1, len(business_elements), extra=HOT)
+
+                known = self.known_entity(cids[i])
+                if all(field in known for field in DETAIL_FIELDS):
+                    # Already extracted recently; no need to open the panel
+                    business_data = {field: known[field] for field in DETAIL_FIELDS}
+                    ctx.count('entity_hits')
+                else:
+                    business_data, current_title = self._click_through(driver, element, current_title, ctx,
+                                                                       cids[i])
+
+                if business_data and business_data['name'] != "Unknown Business":
+                    business_data['cid'] = cids[i]
+                    self.apply_known_instagram(business_data, known, ctx)
+                    logger.debug("Successfully processed: %s", business_data['name'], extra=HOT)
+                else:
+                    logger.warning(f"Failed to extract valid data for business {i + 1}")
+                    continue
 
-                    # Try different click methods
-                    clicked = self.click_business_element(element)
-                    if not clicked:
-                        logger.warning(f"Failed to click business {i + 1}, skipping")
-                        continue
+            except Exception as e:
+                logger.error(f"Error processing business {i + 1}: {e}")
+                continue
 
-                    time.sleep(5)  # Wait for details panel to load
+            yield business_data
 
-                    business_data = self.extract_business_details()
-                    if business_data and business_data['name'] != "Unknown Business":
-                        # Find Instagram profile
-                        instagram_data = self.find_instagram_profile(business_data['name'])
-                        business_data.update(instagram_data)
-                        businesses.append(business_data)
-                        logger.info(f"Successfully processed: {business_data['name']}")
-                    else:
-                        logger.warning(f"Failed to extract valid data for business {i + 1}")
+    def _process_cards(self, driver, cards, ctx, search_delta=None):
+        """Turn parsed result cards into businesses, clicking only incomplete ones"""
+        current_title = None
 
-                    # Add delay between businesses
-                    time.sleep(2)
+        for i, card in enumerate(cards):
+            if ctx.should_stop():
+                logger.warning(f"Stopping scrape after {i} businesses (cancelled={ctx.cancelled()})")
+                break
 
-                except Exception as e:
-                    logger.error(f"Error processing business {i + 1}: {e}")
+            status = search_delta.check(card) if search_delta else None
+            if status == 'unchanged':
+                ctx.count('delta_unchanged')
+                yield search_delta.previous_business(card['cid'])
+                continue
+
+            try:
+                business_data = {key: card[key] for key in ('name', 'phone', 'website', 'cid')}
+                # A changed card may have changed contact details too, so skip the entity cache
+                known = {} if status == 'changed' else self.known_entity(card['cid'])
+                missing = []
+                for field in BULK_REQUIRED_FIELDS:
+                    if business_data[field] in ("Not found", "Unknown Business"):
+                        if field in known:
+                            business_data[field] = known[field]
+                        else:
+                            missing.append(field)
+                if known and not missing:
+                    ctx.count('entity_hits')
+
+                if missing:
+                    logger.debug("Card %d missing %s, opening detail panel", i + 1, missing, extra=HOT)
+                    if current_title is None:
+                        current_title = first_detail_title(driver)
+                    element = driver.execute_script(FEED_CARD_ELEMENT_SCRIPT, FEED_CARD_SELECTOR, card['index'])
+                    if element is not None:
+                        details, current_title = self._click_through(driver, element, current_title, ctx,
+                                                                     card['cid'])
+                        for key, value in (details or {}).items():
+                            if business_data.get(key) in (None, "Not found", "Unknown Business"):
+                                business_data[key] = value
+
+                if business_data['name'] == "Unknown Business":
+                    logger.warning(f"Failed to extract valid data for business {i + 1}")
                     continue
 
+                self.apply_known_instagram(business_data, known, ctx)
+
+            except Exception as e:
+                logger.error(f"Error processing business {i + 1}: {e}")
+                continue
+
+            yield business_data
+
+    def listing_cids(self, driver, elements):
+        """Place id of each listing element (None where unknown)"""
+        try:
+            links = driver.execute_script(LISTING_CID_SCRIPT, elements) or []
         except Exception as e:
-            logger.error(f"Error scraping Google Maps: {e}")
-            return self.get_demo_data(city, keyword, limit)
+            logger.debug("Could not read listing links: %s", e)
+            links = []
+        cids = [link if link and link.isdigit() else extract_cid(link) for link in links]
+        return cids + [None] * (len(elements) - len(cids))
+
+    def known_entity(self, cid):
+        """Still-fresh cached fields for a place id"""
+        if not cid or not self.entity_store:
+            return {}
+        try:
+            return self.entity_store.get(cid, ENTITY_FIELD_TTLS)
+        except Exception as e:
+            logger.error(f"Error reading entity cache: {e}")
+            return {}
 
-        logger.info(f"Scraping completed. Found {len(businesses)} valid businesses")
-        return businesses if businesses else self.get_demo_data(city, keyword, limit)
+    def remember_entity(self, business_data):
+        """Store the fields just extracted for this place id"""
+        if not business_data.get('cid') or not self.entity_store:
+            return
+        try:
+            self.entity_store.put(business_data['cid'],
+                                  {field: business_data[field] for field in ENTITY_FIELD_TTLS if field in business_data})
+        except Exception as e:
+            logger.error(f"Error writing entity cache: {e}")
+
+    def apply_known_instagram(self, business_data, known, ctx):
+        """Attach fresh cached Instagram fields so the enrichment stage can skip the lookup"""
+        if all(field in known for field in INSTAGRAM_FIELDS):
+            business_data.update({field: known[field] for field in INSTAGRAM_FIELDS})
+            ctx.count('instagram_cache_hits')
+
+    def _click_through(self, driver, element, current_title, ctx, cid=None):
+        """Open one listing (place ``cid`` when known) and extract its details; returns (data or None, panel title)"""
+        with ctx.phase('click'):
+            # Scroll element into view (synchronous, no wait needed)
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+
+            # Try different click methods
+            clicked = self.click_business_element(driver, element)
+        if not clicked:
+            logger.warning("Failed to click business, skipping")
+            return None, current_title
+
+        # Wait for the details panel to switch to the clicked business
+        with ctx.phase('detail_wait'):
+            new_title = self.wait_for(driver, detail_panel_changed(current_title, cid), DETAIL_READY_TIMEOUT, ctx)
+        if not new_title:
+            # Extracting now would just re-read the previous business
+            logger.warning("Details panel did not update, skipping")
+            return None, current_title
+
+        with ctx.phase('detail_extraction'):
+            return self.extract_business_details(driver), new_title
+
+    def scroll_feed(self, driver, ctx, with_html=True):
+        """Yield each scroll of the results feed as {'cards', 'count', 'end'} until it ends or stops loading
+
+        Each round-trip returns only the cards rendered since the last one, then
+        scrolls, so Maps loads the next page while the caller works on these.
+        """
+        rendered = 0
+        stalls = 0
+        while not ctx.should_stop():
+            with ctx.phase('feed_scroll'):
+                page = driver.execute_script(FEED_SCROLL_SCRIPT, FEED_CARD_SELECTOR, rendered, FEED_END_SELECTOR,
+                                             with_html)
+            if not page:
+                return
+            rendered = page['count']
+            yield page
+            if page['end']:
+                return
+
+            with ctx.phase('feed_wait'):
+                grew = self.wait_for(driver, feed_grew(rendered), FEED_SCROLL_TIMEOUT, ctx)
+            if grew:
+                stalls = 0
+            else:
+                stalls += 1
+                if stalls > FEED_MAX_STALLS:
+                    logger.info("Results feed stopped loading after %d cards", rendered)
+                    return
+
+    def iter_feed_cards(self, driver, limit, ctx):
+        """Yield up to ``limit`` unique parsed result cards, scrolling the feed as they run out"""
+        seen = set()
+        found = 0
+        for page in self.scroll_feed(driver, ctx):
+            with ctx.phase('bulk_extraction'):
+                cards = []
+                for index, html in page['cards']:
+                    card = self.parse_card_html(html, index)
+                    if card is None or (card['cid'] and card['cid'] in seen):
+                        continue
+                    if card['cid']:
+                        seen.add(card['cid'])
+                    cards.append(card)
+                    if found + len(cards) >= limit:
+                        break
+            found += len(cards)
+            logger.debug("Feed page: %d new cards, %d rendered", len(cards), page['count'])
+            # Hand cards over one at a time; the next scroll only runs once these are processed
+            yield from cards
+            if found >= limit:
+                return
+        # The feed ran out before the limit
+        ctx.report_total(found)
+
+    def load_feed(self, driver, count, ctx):
+        """Scroll the results feed until ``count`` cards are rendered or it has no more"""
+        for page in self.scroll_feed(driver, ctx, with_html=False):
+            if page['count'] >= count:
+                break
+
+    def parse_card_html(self, html, index):
+        """Parse one result card's HTML, as returned by FEED_SCROLL_SCRIPT; None without a card anchor"""
+        anchor = BeautifulSoup(html or '', 'lxml').select_one(FEED_CARD_SELECTOR)
+        return self._parse_card(anchor, index) if anchor else None
+
+    def _parse_card(self, anchor, index):
+        """Card fields from a result anchor and the card container around it"""
+        href = anchor.get('href', '')
+        cid = anchor.get('data-cid') or extract_cid(href)
+
+        container = anchor.find_parent('div', class_='Nv2PK') or anchor.parent
+        name = (anchor.get('aria-label') or '').strip()
+        if not name:
+            title = container.select_one('.qBF1Pd, .fontHeadlineSmall')
+            name = title.get_text(strip=True) if title else ''
+
+        phone_el = container.select_one('.UsdlK')
+        phone = clean_phone(phone_el.get_text(' ', strip=True) if phone_el else '')
+
+        website = None
+        for link in container.select('a[data-value="Website"], a.lcr4fd, a[href^="http"]'):
+            website = clean_website(link.get('href'))
+            if website:
+                break
+
+        card = {
+            'index': index,
+            'name': name if len(name) > 2 and not name.lower().startswith('result') else "Unknown Business",
+            'phone': phone or "Not found",
+            'website': website or "Not found",
+            'cid': cid
+        }
+        rating = container.select_one(CARD_RATING_SELECTOR)
+        reviews = container.select_one(CARD_REVIEWS_SELECTOR)
+        card['fingerprint'] = card_fingerprint(card, rating.get_text(strip=True) if rating else '',
+                                               reviews.get_text(strip=True) if reviews else '')
+        return card
 
-    def find_business_listings(self, limit):
+    def find_business_listings(self, driver, limit, ctx=None):
         """Find business listing elements using multiple strategies"""
+        ctx = ctx or ScrapeContext()
         business_elements = []
+        business_listing_selectors = self.selectors.order('listing')
 
-        # Updated selectors for current Google Maps structure (2024/2025)
-        business_listing_selectors = [
-            'div[role="article"]',
-            'div[jsaction*="mouseover"]',
-            '.hfpxzc',
-            'div[data-result-index]',
-            '.Nv2PK.tH5CWc.ENn4tc',
-            'a[data-cid]',
-            '.bfdHYd',
-            '.lI9IFe',
-            '[data-result-index] > div',
-            'div[jsaction*="click"] > div'
-        ]
-
-        # Try each selector to find business listings
+        # One wait for any candidate instead of a full timeout per stale selector
+        if not self.wait_for(driver, element_present(', '.join(business_listing_selectors)), PAGE_READY_TIMEOUT, ctx):
+            logger.debug("No listing selector matched before timeout")
+            return business_elements
+
+        # Try each selector to find business listings, best recent performer first
         for selector in business_listing_selectors:
+            started = time.monotonic()
             try:
-                logger.info(f"Trying selector: {selector}")
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                )
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                logger.debug("Trying selector: %s", selector, extra=HOT)
+                elements = driver.find_elements(By.CSS_SELECTOR, selector)
 
                 # Filter out invalid elements
                 valid_elements = []
@@ -197,16 +1235,17 @@ class BusinessAnalyzer:
 
                 if valid_elements and len(valid_elements) >= 2:  # Make sure we have actual results
                     business_elements = valid_elements[:limit]
-                    logger.info(f"Found {len(business_elements)} valid businesses using selector: {selector}")
+                    logger.info("Found %d valid businesses using selector: %s", len(business_elements), selector)
+                    self.selectors.record('listing', selector, True, time.monotonic() - started)
                     break
 
             except Exception as e:
-                logger.debug(f"Selector {selector} failed: {e}")
-                continue
+                logger.debug("Selector %s failed: %s", selector, e, extra=HOT)
+            self.selectors.record('listing', selector, False, time.monotonic() - started)
 
         return business_elements
 
-    def click_business_element(self, element):
+    def click_business_element(self, driver, element):
         """Try multiple methods to click on business element"""
         try:
             # Method 1: Regular click
@@ -215,163 +1254,202 @@ class BusinessAnalyzer:
         except:
             try:
                 # Method 2: JavaScript click
-                self.driver.execute_script("arguments[0].click();", element)
+                driver.execute_script("arguments[0].click();", element)
                 return True
             except:
                 try:
                     # Method 3: Action chains
-                    ActionChains(self.driver).move_to_element(element).click().perform()
+                    selenium_api().ActionChains(driver).move_to_element(element).click().perform()
                     return True
                 except:
                     return False
 
-    def extract_business_details(self):
+    def extract_business_details(self, driver, mode=DETAIL_MODE):
         """Extract business details from Google Maps detail panel with updated selectors"""
+        if mode == 'script':
+            business_data = self._extract_details_script(driver)
+            if business_data is not None:
+                return business_data
+            logger.warning("Script extraction failed, falling back to selector cascade")
+        return self._extract_details_selectors(driver)
+
+    def _extract_details_script(self, driver):
+        """Evaluate every selector cascade in-page with a single execute_script round-trip"""
+        order = {cascade: self.selectors.order(cascade) for cascade in ('name', 'phone', 'website')}
+        try:
+            raw = driver.execute_script(DETAIL_EXTRACTION_SCRIPT, order)
+        except Exception as e:
+            logger.error(f"Error running detail extraction script: {e}")
+            return None
+        if not isinstance(raw, dict):
+            return None
+
+        logger.debug("Found %d H1 elements", len(raw.get('h1') or []), extra=HOT)
+
+        name = "Unknown Business"
+        name_selector = None
+        for selector, texts in zip(order['name'], raw.get('name') or []):
+            match = next((text.strip() for text in texts or [] if valid_name((text or '').strip())), None)
+            if match:
+                name = match
+                name_selector = selector
+                logger.debug("Found business name: '%s' using selector: %s", name, selector, extra=HOT)
+                break
+        self.selectors.record_cascade('name', order['name'], name_selector)
+
+        if name == "Unknown Business":
+            name = self._fallback_name(driver, raw.get('panel'))
+
+        phone = "Not found"
+        phone_selector = None
+        for selector, candidates in zip(order['phone'], raw.get('phone') or []):
+            for text, aria_label, data_value in candidates or []:
+                cleaned = clean_phone((text or '').strip() or aria_label or data_value or '')
+                if cleaned:
+                    phone = cleaned
+                    break
+            if phone != "Not found":
+                phone_selector = selector
+                logger.debug("Found phone: %s", phone, extra=HOT)
+                break
+        self.selectors.record_cascade('phone', order['phone'], phone_selector)
+
+        website = "Not found"
+        website_selector = None
+        for selector, candidates in zip(order['website'], raw.get('website') or []):
+            for href, text, data_value in candidates or []:
+                href = href or text or data_value or ''
+                if clean_website(href):
+                    website = href
+                    break
+            if website != "Not found":
+                website_selector = selector
+                logger.debug("Found website: %s", website, extra=HOT)
+                break
+        self.selectors.record_cascade('website', order['website'], website_selector)
+
+        business_data = {
+            'name': name,
+            'phone': phone,
+            'website': website
+        }
+
+        logger.debug("Final extracted business data: %s", business_data, extra=HOT)
+        return business_data
+
+    def _fallback_name(self, driver, panel_text=None):
+        """Name from page-source patterns or the panel's first line, else 'Unknown Business'"""
+        name = "Unknown Business"
         try:
-            # Wait a bit for the panel to fully load
-            time.sleep(3)
+            # Try getting from page source using regex
+            potential_name = scan_fallback_name(driver.page_source)
+            if potential_name:
+                name = potential_name
+                logger.debug("Found business name via regex: '%s'", name, extra=HOT)
+
+            # Last resort: try to get any meaningful text from the details panel
+            if name == "Unknown Business":
+                try:
+                    if panel_text is None:
+                        panel_text = driver.find_element(By.CSS_SELECTOR, '[role="main"], .siAUzd, .m6QErb').text
+                    lines = [line.strip() for line in panel_text.split('\n') if line.strip()]
+                    if lines:
+                        # First non-empty line is usually the business name
+                        potential_name = lines[0]
+                        if len(potential_name) > 2 and not potential_name.lower().startswith('result'):
+                            name = potential_name
+                            logger.debug("Found business name from panel text: '%s'", name, extra=HOT)
+                except:
+                    pass
+
+        except Exception as e:
+            logger.error(f"Error in alternative name extraction: {e}")
 
+        return name
+
+    def _panel_elements(self, driver, selector):
+        """find_elements(selector) minus matches inside the results feed, whose cards belong to other places"""
+        elements = driver.find_elements(By.CSS_SELECTOR, selector)
+        if not elements:
+            return elements
+        in_feed = driver.find_elements(By.CSS_SELECTOR, f'div[role="feed"] {selector}')
+        return [element for element in elements if element not in in_feed] if in_feed else elements
+
+    def _extract_details_selectors(self, driver):
+        """Walk the selector cascades with one find_elements call per selector"""
+        try:
             # Debug: Log all h1 elements found
-            h1_elements = self.driver.find_elements(By.TAG_NAME, 'h1')
-            logger.info(f"Found {len(h1_elements)} H1 elements")
-            for i, h1 in enumerate(h1_elements):
-                logger.info(f"H1 element {i}: '{h1.text.strip()}'")
-
-            # Updated CSS selectors for current Google Maps structure (2024/2025)
-            name_selectors = [
-                'h1[class*="DUwDvf"]',  # Main business name
-                'h1.fontHeadlineSmall',
-                '[data-attrid="title"] h1',
-                '.qBF1Pd.fontHeadlineSmall',
-                'h1[jsaction*="pane"]',
-                '[role="main"] h1',
-                '.x3AX1-LfntMc-header-title-title',
-                'div[data-value] h1',
-                'h1.Io6YTe',
-                '.P5Bobd h1',
-                'h1[data-attrid="title"]'
-            ]
+            if logger.isEnabledFor(logging.DEBUG):
+                # Each h1.text is a WebDriver round-trip, so only pay for it when debugging
+                h1_elements = driver.find_elements(By.TAG_NAME, 'h1')
+                logger.debug("Found %d H1 elements: %s", len(h1_elements), [h1.text.strip() for h1 in h1_elements],
+                             extra=HOT)
 
             name = "Unknown Business"
 
             # Try each selector until we find the business name
-            for selector in name_selectors:
+            for selector in self.selectors.order('name'):
+                started = time.monotonic()
                 try:
-                    name_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                    name_elements = self._panel_elements(driver, selector)
                     for element in name_elements:
                         text = element.text.strip()
-                        if text and len(text) > 2 and text != "Unknown Business" and not text.lower().startswith(
-                                'result'):
+                        if valid_name(text):
                             name = text
-                            logger.info(f"Found business name: '{name}' using selector: {selector}")
+                            logger.debug("Found business name: '%s' using selector: %s", name, selector, extra=HOT)
                             break
-                    if name != "Unknown Business":
-                        break
                 except Exception as e:
-                    logger.debug(f"Selector {selector} failed: {e}")
-                    continue
+                    logger.debug("Selector %s failed: %s", selector, e, extra=HOT)
+                found = name != "Unknown Business"
+                self.selectors.record('name', selector, found, time.monotonic() - started)
+                if found:
+                    break
 
             # If still no name found, try alternative approaches
             if name == "Unknown Business":
-                try:
-                    # Try getting from page source using regex
-                    page_source = self.driver.page_source
-
-                    # Look for business name patterns in the HTML
-                    name_patterns = [
-                        r'"([^"]*)",null,null,null,null,\[10,3\]',  # Google Maps data pattern
-                        r'<title>([^-|]+)[\-|]',  # From page title
-                        r'"name":"([^"]+)"',
-                        r'aria-label="([^"]*)"[^>]*class="[^"]*DUwDvf'
-                    ]
-
-                    for pattern in name_patterns:
-                        matches = re.findall(pattern, page_source)
-                        if matches:
-                            potential_name = matches[0].strip()
-                            if len(potential_name) > 2 and not potential_name.lower().startswith('result'):
-                                name = potential_name
-                                logger.info(f"Found business name via regex: '{name}'")
-                                break
-
-                    # Last resort: try to get any meaningful text from the details panel
-                    if name == "Unknown Business":
-                        try:
-                            panel_text = self.driver.find_element(By.CSS_SELECTOR,
-                                                                  '[role="main"], .siAUzd, .m6QErb').text
-                            lines = [line.strip() for line in panel_text.split('\n') if line.strip()]
-                            if lines:
-                                # First non-empty line is usually the business name
-                                potential_name = lines[0]
-                                if len(potential_name) > 2 and not potential_name.lower().startswith('result'):
-                                    name = potential_name
-                                    logger.info(f"Found business name from panel text: '{name}'")
-                        except:
-                            pass
-
-                except Exception as e:
-                    logger.error(f"Error in alternative name extraction: {e}")
+                name = self._fallback_name(driver)
 
             # Get phone number with updated selectors
             phone = "Not found"
-            phone_selectors = [
-                'button[data-item-id*="phone"] .Io6YTe',
-                'button[aria-label*="phone"] .Io6YTe',
-                '[data-value*="+91"]',
-                'button[jsaction*="phone"] span',
-                '.rogA2c .Io6YTe',
-                'button[data-item-id="phone:tel:"] span',
-                '[data-item-id*="phone"] span',
-                'button[data-value*="+"] span'
-            ]
-
-            for selector in phone_selectors:
+            for selector in self.selectors.order('phone'):
+                started = time.monotonic()
                 try:
-                    phone_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                    phone_elements = self._panel_elements(driver, selector)
                     for element in phone_elements:
                         phone_text = element.text.strip() or element.get_attribute(
                             'aria-label') or element.get_attribute('data-value') or ''
                         # Clean and validate phone number
-                        if phone_text and ('+' in phone_text or any(char.isdigit() for char in phone_text)):
-                            # Extract phone number using regex
-                            phone_match = re.search(r'[\+]?[\d\s\-\(\)]{7,}', phone_text)
-                            if phone_match:
-                                phone = phone_match.group().strip()
-                                logger.info(f"Found phone: {phone}")
-                                break
-                    if phone != "Not found":
-                        break
+                        cleaned = clean_phone(phone_text)
+                        if cleaned:
+                            phone = cleaned
+                            logger.debug("Found phone: %s", phone, extra=HOT)
+                            break
                 except Exception as e:
-                    logger.debug(f"Phone selector {selector} failed: {e}")
-                    continue
+                    logger.debug("Phone selector %s failed: %s", selector, e, extra=HOT)
+                found = phone != "Not found"
+                self.selectors.record('phone', selector, found, time.monotonic() - started)
+                if found:
+                    break
 
             # Get website with updated selectors
             website = "Not found"
-            website_selectors = [
-                'a[data-item-id*="authority"] .Io6YTe',
-                'button[data-item-id*="authority"] + a',
-                'a[data-value*="http"]:not([href*="google.com"])',
-                '.CsEnBe a[href*="http"]:not([href*="google.com"])',
-                'button[aria-label*="website"] + a',
-                '[data-item-id*="authority"] a',
-                'a[href*="http"]:not([href*="google"]):not([href*="maps"])'
-            ]
-
-            for selector in website_selectors:
+            for selector in self.selectors.order('website'):
+                started = time.monotonic()
                 try:
-                    website_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                    website_elements = self._panel_elements(driver, selector)
                     for element in website_elements:
                         href = element.get_attribute('href') or element.text or element.get_attribute(
                             'data-value') or ''
-                        if href and 'http' in href and 'google.com' not in href and 'maps' not in href:
+                        if clean_website(href):
                             website = href
-                            logger.info(f"Found website: {website}")
+                            logger.debug("Found website: %s", website, extra=HOT)
                             break
-                    if website != "Not found":
-                        break
                 except Exception as e:
-                    logger.debug(f"Website selector {selector} failed: {e}")
-                    continue
+                    logger.debug("Website selector %s failed: %s", selector, e, extra=HOT)
+                found = website != "Not found"
+                self.selectors.record('website', selector, found, time.monotonic() - started)
+                if found:
+                    break
 
             business_data = {
                 'name': name,
@@ -379,7 +1457,7 @@ class BusinessAnalyzer:
                 'website': website
             }
 
-            logger.info(f"Final extracted business data: {business_data}")
+            logger.debug("Final extracted business data: %s", business_data, extra=HOT)
             return business_data
 
         except Exception as e:
@@ -485,17 +1563,186 @@ class BusinessAnalyzer:
         return demo_businesses
 
     def cleanup(self):
-        """Close the selenium driver"""
-        if self.driver:
+        """Close all pooled selenium drivers and persist selector stats"""
+        self.selectors.flush()
+        if self.pool:
             try:
-                self.driver.quit()
-                logger.info("WebDriver closed successfully")
+                self.pool.close()
+                logger.info("WebDriver pool closed successfully")
             except Exception as e:
-                logger.error(f"Error closing WebDriver: {e}")
+                logger.error(f"Error closing WebDriver pool: {e}")
+
+
+class WorkerScrapeContext(ScrapeContext):
+    """ScrapeContext that also keeps every phase sample, so a worker can hand its timings back"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.phase_samples = []
+
+    def add_phase(self, name, elapsed):
+        super().add_phase(name, elapsed)
+        with self._lock:
+            self.phase_samples.append((name, elapsed))
+
+    def export(self):
+        with self._lock:
+            return {
+                'phase_samples': list(self.phase_samples),
+                'counters': dict(self.counters),
+                'demo_reason': self.demo_reason,
+                'budget_exhausted': self.budget_exhausted,
+                'bytes_transferred': self.bytes_transferred,
+                'browser_profile': BROWSER_PROFILE,
+                'changes': self.changes
+            }
+
+
+class ScrapeWorker:
+    """Runs searches inside a SCRAPE_WORKERS process, on that process's own analyzer and browsers"""
+
+    def __init__(self, worker_analyzer=None):
+        self.analyzer = worker_analyzer or analyzer
 
+    def run(self, task, emit, cancel_event):
+        request_id.set(task['request_id'])
+        ctx = WorkerScrapeContext(budget=task['budget'], on_total=lambda total: emit('total', total),
+                                  cancel_event=cancel_event)
+        try:
+            for business in self.analyzer.iter_google_maps_businesses(ctx=ctx, **task['search']):
+                emit('business', business)
+        finally:
+            emit('timings', ctx.export())
+
+    def close(self):
+        self.analyzer.cleanup()
+        instagram_enricher.shutdown()
+
+
+class ProcessScraper:
+    """BusinessAnalyzer's scrape methods, run on supervised worker processes
+
+    ``pool`` is the WorkerSupervisor, so capacity and status checks read as
+    they do for the in-process driver pool. A worker that hangs past the
+    scrape budget is killed; if it dies before yielding anything the search
+    falls back to demo data like any other failed scrape, and if it dies part
+    way the context is marked failed so the partial list is not cached.
+    """
+
+    def __init__(self, supervisor):
+        self.pool = supervisor
+
+    def scrape_google_maps_businesses(self, city, keyword, limit=10, ctx=None, mode=EXTRACTION_MODE, viewport=None,
+                                      delta=False):
+        businesses = list(self.iter_google_maps_businesses(city, keyword, limit, ctx=ctx, mode=mode,
+                                                           viewport=viewport, delta=delta))
+        logger.info(f"Scraping completed. Returning {len(businesses)} businesses")
+        return businesses
+
+    def iter_google_maps_businesses(self, city, keyword, limit=10, ctx=None, mode=EXTRACTION_MODE, viewport=None,
+                                    delta=False):
+        ctx = ctx or ScrapeContext()
+        task = {
+            'search': {'city': city, 'keyword': keyword, 'limit': limit, 'mode': mode, 'viewport': viewport,
+                       'delta': delta},
+            'budget': ctx.remaining(),
+            'request_id': request_id.get()
+        }
+        messages = self.pool.run(task, timeout=ctx.remaining() + WORKER_KILL_GRACE, cancel_event=ctx.cancel_event)
+        found = 0
+        try:
+            for kind, payload in messages:
+                if kind == 'business':
+                    found += 1
+                    yield payload
+                elif kind == 'total':
+                    ctx.report_total(payload)
+                elif kind == 'timings':
+                    ctx.merge(payload)
+        except WorkerError as e:
+            logger.error(f"Scrape worker failed after {found} businesses: {e}")
+            ctx.fail('worker_failed')
+            if not found and not ctx.cancelled():
+                ctx.use_demo_data('worker_failed')
+                yield from analyzer.get_demo_data(city, keyword, limit)
+        finally:
+            # Cancels the job in the worker when the caller stops early
+            messages.close()
 
-# Global analyzer instance
-analyzer = BusinessAnalyzer()
+    def cleanup(self):
+        self.pool.close()
+
+
+# Global analyzer instance, sharing the entity cache, Instagram stage and selector rankings across searches
+entity_store = EntityStore()
+instagram_enricher = InstagramEnricher(max_workers=INSTAGRAM_WORKERS, per_host_limit=INSTAGRAM_PER_HOST,
+                                       timeout=INSTAGRAM_TIMEOUT, base_url=INSTAGRAM_BASE_URL,
+                                       search_url=INSTAGRAM_SEARCH_URL,
+                                       page_cache=PageCache(max_entries=WEBSITE_CACHE_MAX_ENTRIES),
+                                       page_max_age=WEBSITE_CACHE_MAX_AGE, min_interval=WEBSITE_MIN_INTERVAL,
+                                       profile_cache_size=INSTAGRAM_PROFILE_CACHE_ENTRIES)
+selector_registry = SelectorRegistry(SELECTOR_CASCADES, store=SelectorStatsStore())
+snapshot_store = SnapshotStore()
+analyzer = BusinessAnalyzer(entity_store=entity_store, enricher=instagram_enricher, selectors=selector_registry,
+                            snapshot_store=snapshot_store)
+# Searches go through ``scraper``: the analyzer itself, or worker processes with SCRAPE_WORKERS
+if SCRAPE_WORKERS > 0:
+    scraper = ProcessScraper(WorkerSupervisor(ScrapeWorker, size=SCRAPE_WORKERS, max_rss=WORKER_MAX_RSS_MB * 2 ** 20,
+                                              max_jobs=WORKER_MAX_JOBS, check_interval=WORKER_CHECK_INTERVAL,
+                                              checkout_timeout=DRIVER_CHECKOUT_TIMEOUT))
+else:
+    scraper = analyzer
+
+# Background scrape jobs; one worker per pooled driver
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', DRIVER_POOL_SIZE))
+job_manager = JobManager(max_workers=JOB_WORKERS)
+
+# Search result cache: fresh for RESULT_CACHE_TTL, then served stale while it refreshes
+RESULT_CACHE_TTL = float(os.environ.get('RESULT_CACHE_TTL', 7 * 24 * 3600))
+RESULT_CACHE_STALE_TTL = float(os.environ.get('RESULT_CACHE_STALE_TTL', 7 * 24 * 3600))
+RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+result_cache = ResultCache(ttl=RESULT_CACHE_TTL, stale_ttl=RESULT_CACHE_STALE_TTL, max_bytes=RESULT_CACHE_MAX_BYTES)
+refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='cache-refresh')
+
+# Batch runs: workers per batch, retries per query and spacing of queries to Google
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', DRIVER_POOL_SIZE))
+BATCH_RETRIES = int(os.environ.get('BATCH_RETRIES', 2))
+BATCH_MIN_INTERVAL = float(os.environ.get('BATCH_MIN_INTERVAL', 2.0))
+batch_rate_limiter = RateLimiter(BATCH_MIN_INTERVAL)
+
+# Tiled searches: default grid, largest grid side and results per tile (one Maps search tops out near 120)
+TILE_ROWS = int(os.environ.get('TILE_ROWS', 3))
+TILE_COLS = int(os.environ.get('TILE_COLS', 3))
+TILE_MAX_GRID = int(os.environ.get('TILE_MAX_GRID', 8))
+TILE_LIMIT = int(os.environ.get('TILE_LIMIT', 120))
+geocoder = Geocoder(url=os.environ.get('GEOCODE_URL', GEOCODE_URL))
+
+# Result sets kept for export, oldest pruned first
+RESULT_STORE_MAX_RESULTS = int(os.environ.get('RESULT_STORE_MAX_RESULTS', 500))
+result_store = ResultStore(max_results=RESULT_STORE_MAX_RESULTS)
+# Rows per page of /results/<result_id>
+RESULTS_PAGE_SIZE = 100
+RESULTS_MAX_PAGE_SIZE = 500
+refresh_lock = threading.Lock()
+refreshing_searches = set()
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.monotonic()
+    # Correlation id for every log line of this request, including its jobs and lookups
+    request_id.set(request.headers.get('X-Request-ID') or uuid.uuid4().hex[:12])
+
+
+@app.after_request
+def record_request_metrics(response):
+    elapsed = time.monotonic() - g.pop('request_started', time.monotonic())
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    HTTP_REQUESTS.inc(method=request.method, endpoint=endpoint, status=response.status_code)
+    HTTP_SECONDS.observe(elapsed, method=request.method, endpoint=endpoint)
+    response.headers['Server-Timing'] = f'app;dur={elapsed * 1000:.1f}'
+    response.headers['X-Request-ID'] = request_id.get()
+    return response
 
 
 @app.route('/')
@@ -503,31 +1750,165 @@ def index():
     return render_template('index.html')
 
 
+def number_param(data, name, default, kind=int):
+    """``data[name]`` converted with ``kind``, or ``default`` when absent; raises ValueError naming the field"""
+    value = data.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        number = kind(value)
+    except (TypeError, ValueError):
+        number = None
+    if number is None or number != number or isinstance(value, bool):
+        raise ValueError(f"{name} must be {'an integer' if kind is int else 'a number'}")
+    return number
+
+
+def text_param(data, name):
+    """Stripped ``data[name]``, '' when absent; raises ValueError when it is not a string"""
+    value = data.get(name) or ''
+    if not isinstance(value, str):
+        raise ValueError(f"{name} must be a string")
+    return value.strip()
+
+
+def text_list_param(data, name):
+    """Stripped non-blank strings of the list ``data[name]``; raises ValueError unless it is a list of strings"""
+    values = data.get(name) or []
+    if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+        raise ValueError(f"{name} must be a list of strings")
+    return [value.strip() for value in values if value.strip()]
+
+
+def parse_scrape_params(data):
+    """Validate a scrape payload; returns (params, error message)"""
+    data = data or {}
+    try:
+        city = text_param(data, 'city')
+        keyword = text_param(data, 'keyword')
+        limit = number_param(data, 'limit', 10)
+        budget = number_param(data, 'budget', SCRAPE_BUDGET, float)
+    except ValueError as e:
+        return None, str(e)
+
+    if not city or not keyword:
+        return None, 'City and keyword are required'
+
+    if limit < 1 or limit > MAX_LIMIT:
+        limit = 10
+
+    mode = data.get('mode', EXTRACTION_MODE)
+    if mode not in EXTRACTION_MODES:
+        return None, f'Unknown mode: {mode}'
+
+    return {
+        'city': city,
+        'keyword': keyword,
+        'limit': limit,
+        'mode': mode,
+        'budget': min(budget, SCRAPE_BUDGET),
+        # Skip the result cache and scrape live
+        'refresh': str(data.get('refresh', '')).lower() in ('1', 'true', 'yes'),
+        # Scrape live, re-extracting only places whose result card changed since the last delta run
+        'delta': str(data.get('delta', '')).lower() in ('1', 'true', 'yes')
+    }, None
+
+
+def cached_results(params):
+    """Cached (businesses, age) for a search, or None; stale hits trigger a background refresh"""
+    if params['refresh'] or params['delta']:
+        return None
+
+    hit = result_cache.get(params['city'], params['keyword'], params['limit'])
+    if hit is None:
+        RESULT_CACHE_LOOKUPS.inc(result='miss')
+        return None
+
+    businesses, age, stale = hit
+    RESULT_CACHE_LOOKUPS.inc(result='stale' if stale else 'fresh')
+    if stale:
+        schedule_cache_refresh(params)
+    logger.info(f"Serving {'stale' if stale else 'fresh'} cached results ({age:.0f}s old)")
+    return businesses, age
+
+
+def cache_results(params, businesses, ctx):
+    """Store a finished scrape unless it was demo data or cut short"""
+    if ctx.demo_data or ctx.budget_exhausted or ctx.failed or ctx.cancelled():
+        return
+    try:
+        result_cache.put(params['city'], params['keyword'], params['limit'], businesses)
+    except Exception as e:
+        logger.error(f"Error caching results: {e}")
+
+
+def store_results(params, businesses):
+    """Persist a result set for server-side export; returns its id or None"""
+    try:
+        return result_store.save(businesses, city=params['city'], keyword=params['keyword'])
+    except Exception as e:
+        logger.error(f"Error storing results: {e}")
+        return None
+
+
+def schedule_cache_refresh(params):
+    """Re-scrape a stale search in the background, at most once at a time per key"""
+    key = normalize_query(params['city'], params['keyword']) + (params['limit'],)
+    with refresh_lock:
+        if key in refreshing_searches:
+            return
+        refreshing_searches.add(key)
+
+    def refresh():
+        try:
+            ctx = ScrapeContext()
+            businesses = scraper.scrape_google_maps_businesses(params['city'], params['keyword'], params['limit'],
+                                                               ctx=ctx, mode=params['mode'])
+            cache_results(params, businesses, ctx)
+        except Exception as e:
+            logger.error(f"Error refreshing cached search {key}: {e}")
+        finally:
+            with refresh_lock:
+                refreshing_searches.discard(key)
+
+    run_in_context(refresh_executor, refresh)
+
+
 @app.route('/scrape', methods=['POST'])
 def scrape_businesses():
     try:
-        data = request.json
-        city = data.get('city', '').strip()
-        keyword = data.get('keyword', '').strip()
-        limit = int(data.get('limit', 10))
+        params, error = parse_scrape_params(request.json)
+        if error:
+            return jsonify({'error': error}), 400
 
+        city, keyword, limit = params['city'], params['keyword'], params['limit']
         logger.info(f"Received scrape request: city='{city}', keyword='{keyword}', limit={limit}")
 
-        if not city or not keyword:
-            return jsonify({'error': 'City and keyword are required'}), 400
-
-        if limit < 1 or limit > 50:
-            limit = 10
+        # Scrape businesses within the request latency budget, unless the cache can answer
+        ctx = ScrapeContext(budget=params['budget'])
+        with ctx.phase('cache_lookup'):
+            cached = cached_results(params)
 
-        # Scrape businesses
-        businesses = analyzer.scrape_google_maps_businesses(city, keyword, limit)
+        if cached:
+            businesses, age = cached
+        else:
+            businesses = scraper.scrape_google_maps_businesses(city, keyword, limit, ctx=ctx, mode=params['mode'],
+                                                               delta=params['delta'])
+            cache_results(params, businesses, ctx)
+            age = 0
 
         logger.info(f"Returning {len(businesses)} businesses")
+        result_id = store_results(params, businesses)
 
         return jsonify({
             'success': True,
             'businesses': businesses,
             'count': len(businesses),
+            'result_id': result_id,
+            'cached': bool(cached),
+            'age': round(age, 1),
+            'changes': ctx.changes,
+            'timings': ctx.as_dict(),
             'message': f'Found {len(businesses)} businesses for "{keyword}" in {city}'
         })
 
@@ -536,8 +1917,392 @@ def scrape_businesses():
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 
+def sse_event(event, payload):
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@app.route('/scrape/stream')
+def scrape_stream():
+    """Stream businesses as Server-Sent Events while they are extracted"""
+    params, error = parse_scrape_params(request.args)
+    if error:
+        return jsonify({'error': error}), 400
+
+    city, keyword, limit = params['city'], params['keyword'], params['limit']
+    logger.info(f"Received stream request: city='{city}', keyword='{keyword}', limit={limit}")
+
+    stream_request_id = request_id.get()
+
+    def generate():
+        # The body is produced after the view returns; keep logging under this request's id
+        request_id.set(stream_request_id)
+        ctx = ScrapeContext(budget=params['budget'])
+        cached = cached_results(params)
+        if cached:
+            businesses, age = iter(cached[0]), cached[1]
+        else:
+            businesses, age = scraper.iter_google_maps_businesses(city, keyword, limit, ctx=ctx, mode=params['mode'],
+                                                                  delta=params['delta']), 0
+        collected = []
+        try:
+            for business in businesses:
+                collected.append(business)
+                yield sse_event('business', business)
+            if not cached:
+                cache_results(params, collected, ctx)
+            yield sse_event('done', {
+                'count': len(collected),
+                'result_id': store_results(params, collected),
+                'cached': bool(cached),
+                'age': round(age, 1),
+                'changes': ctx.changes,
+                'timings': ctx.as_dict(),
+                'message': f'Found {len(collected)} businesses for "{keyword}" in {city}'
+            })
+        except Exception as e:
+            logger.error(f"Error in scrape_stream: {e}")
+            yield sse_event('failed', {'error': str(e)})
+        finally:
+            # Client disconnects land here too; releases the pooled driver
+            if not cached:
+                businesses.close()
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def run_scrape_job(job):
+    """Job runner: each business is added to the job as soon as it is yielded"""
+    params = job.params
+    ctx = ScrapeContext(budget=params['budget'], on_total=job.set_total, cancel_event=job.cancel_event)
+    cached = cached_results(params)
+    if cached:
+        for business in cached[0]:
+            job.add_result(business)
+    else:
+        for business in scraper.iter_google_maps_businesses(params['city'], params['keyword'], params['limit'],
+                                                            ctx=ctx, mode=params['mode'], delta=params['delta']):
+            job.add_result(business)
+        cache_results(params, job.results, ctx)
+        job.changes = ctx.changes
+    job.result_id = store_results(params, job.results)
+    job.timings = ctx.as_dict()
+
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    try:
+        params, error = parse_scrape_params(request.json)
+        if error:
+            return jsonify({'error': error}), 400
+
+        job = job_manager.submit(run_scrape_job, params)
+        return jsonify({'success': True, 'job_id': job.id, 'status': job.status}), 202
+
+    except Exception as e:
+        logger.error(f"Error in create_job: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+def make_batch_query(batch_analyzer, delta=False, on_changes=None):
+    """Adapt an analyzer for BatchRunner; with a browser configured, a demo-data fallback is a failure
+
+    With ``delta`` each query is a delta scrape and ``on_changes(city, keyword, changes)``
+    receives its diff.
+    """
+    def scrape_query(city, keyword, limit):
+        ctx = ScrapeContext()
+        businesses = batch_analyzer.scrape_google_maps_businesses(city, keyword, limit, ctx=ctx, delta=delta)
+        if ctx.demo_data and batch_analyzer.pool:
+            raise RuntimeError('Google Maps scrape failed (demo data returned)')
+        if on_changes and ctx.changes is not None:
+            on_changes(city, keyword, ctx.changes)
+        return businesses
+    return scrape_query
+
+
+def run_batch_job(job):
+    """Job runner for /batch: merged businesses are added as each query finishes"""
+    params = job.params
+    job.set_total(None)
+    job.summary = []
+
+    def on_query_done(summary, new_businesses):
+        job.summary.append(summary)
+        for business in new_businesses:
+            job.add_result(business)
+
+    runner = BatchRunner(make_batch_query(scraper), workers=params['workers'], rate_limiter=batch_rate_limiter,
+                         retries=BATCH_RETRIES)
+    result = runner.run(params['cities'], params['keywords'], params['limit'],
+                        on_query_done=on_query_done, cancel_event=job.cancel_event)
+    job.result_id = store_results({'city': ', '.join(params['cities']), 'keyword': ', '.join(params['keywords'])},
+                                  result['businesses'])
+
+
+@app.route('/batch', methods=['POST'])
+def create_batch():
+    """Queue a cities x keywords batch as a background job"""
+    try:
+        data = request.json or {}
+        try:
+            cities = text_list_param(data, 'cities')
+            keywords = text_list_param(data, 'keywords')
+            limit = number_param(data, 'limit', 10)
+            workers = number_param(data, 'workers', BATCH_WORKERS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if not cities or not keywords:
+            return jsonify({'error': 'At least one city and one keyword are required'}), 400
+        if limit < 1 or limit > MAX_LIMIT:
+            limit = 10
+
+        # More workers than pooled browsers would only queue on checkout
+        max_workers = scraper.pool.size if scraper.pool else BATCH_WORKERS
+        workers = max(1, min(workers, max_workers))
+
+        job = job_manager.submit(run_batch_job, {
+            'cities': cities,
+            'keywords': keywords,
+            'limit': limit,
+            'workers': workers
+        })
+        return jsonify({'success': True, 'job_id': job.id, 'status': job.status,
+                        'queries': len(cities) * len(keywords)}), 202
+
+    except Exception as e:
+        logger.error(f"Error in create_batch: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+def make_tile_query(tile_analyzer, city):
+    """Adapt an analyzer for TiledSearch; as with batches, a demo-data fallback is a failure"""
+    def scrape_tile(tile, keyword, limit):
+        ctx = ScrapeContext()
+        businesses = tile_analyzer.scrape_google_maps_businesses(city, keyword, limit, ctx=ctx, viewport=tile)
+        if ctx.demo_data and tile_analyzer.pool:
+            raise RuntimeError('Google Maps scrape failed (demo data returned)')
+        return businesses
+    return scrape_tile
+
+
+def run_tiled_job(job):
+    """Job runner for /tiles: merged businesses are added as each tile finishes"""
+    params = job.params
+    job.set_total(None)
+    job.summary = []
+    bounds = params['bounds'] or geocoder.bounds(params['city'])
+
+    def on_tile_done(summary, new_businesses):
+        job.summary.append(summary)
+        for business in new_businesses:
+            job.add_result(business)
+
+    search = TiledSearch(make_tile_query(scraper, params['city']), workers=params['workers'],
+                         rate_limiter=batch_rate_limiter, retries=BATCH_RETRIES)
+    result = search.run(params['city'], params['keyword'], bounds, rows=params['rows'], cols=params['cols'],
+                        limit=params['limit'], on_tile_done=on_tile_done, cancel_event=job.cancel_event)
+    job.result_id = store_results(params, result['businesses'])
+
+
+@app.route('/tiles', methods=['POST'])
+def create_tiled_search():
+    """Queue a search of one city split into a rows x cols grid of map viewports"""
+    try:
+        data = request.json or {}
+        try:
+            city = text_param(data, 'city')
+            keyword = text_param(data, 'keyword')
+            rows = number_param(data, 'rows', TILE_ROWS)
+            cols = number_param(data, 'cols', TILE_COLS)
+            limit = number_param(data, 'limit', TILE_LIMIT)
+            workers = number_param(data, 'workers', BATCH_WORKERS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if not city or not keyword:
+            return jsonify({'error': 'City and keyword are required'}), 400
+
+        rows = max(1, min(rows, TILE_MAX_GRID))
+        cols = max(1, min(cols, TILE_MAX_GRID))
+        if limit < 1 or limit > MAX_LIMIT:
+            limit = TILE_LIMIT
+
+        # Optional [south, west, north, east]; otherwise the city is geocoded when the job starts
+        bounds = data.get('bounds')
+        if bounds is not None:
+            try:
+                bounds = [float(value) for value in bounds]
+            except (TypeError, ValueError):
+                bounds = []
+            if len(bounds) != 4 or not bounds[0] < bounds[2] or not bounds[1] < bounds[3]:
+                return jsonify({'error': 'bounds must be [south, west, north, east]'}), 400
+
+        max_workers = scraper.pool.size if scraper.pool else BATCH_WORKERS
+        workers = max(1, min(workers, max_workers))
+
+        job = job_manager.submit(run_tiled_job, {
+            'city': city,
+            'keyword': keyword,
+            'rows': rows,
+            'cols': cols,
+            'limit': limit,
+            'bounds': bounds,
+            'workers': workers
+        })
+        return jsonify({'success': True, 'job_id': job.id, 'status': job.status, 'tiles': rows * cols}), 202
+
+    except Exception as e:
+        logger.error(f"Error in create_tiled_search: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """Job status plus results from ``?since=<n>`` onward for incremental polling"""
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict(since=max(0, request.args.get('since', 0, type=int))))
+
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    job = job_manager.cancel(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job_id': job.id, 'status': job.status})
+
+
+def timed_export(chunks, export_format):
+    """Pass chunks through, recording the export time once the last one is sent"""
+    with EXPORT_SECONDS.time(format=export_format):
+        yield from chunks
+
+
+@app.route('/export/<result_id>')
+def export_results(result_id):
+    """Export a stored result set as ?format=csv (streamed), xlsx or parquet"""
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'Unsupported export format: {export_format}'}), 400
+
+    result = result_store.get(result_id)
+    if not result:
+        return jsonify({'error': 'Result not found'}), 404
+
+    spec = EXPORT_FORMATS[export_format]
+    download_name = f"business_analysis_{int(result['created'])}.{spec['extension']}"
+
+    try:
+        if export_format == 'csv':
+            # Rows flow from SQLite to the client in chunks
+            return Response(stream_with_context(timed_export(iter_csv(result_store.iter_rows(result_id)), 'csv')),
+                            mimetype=spec['mimetype'],
+                            headers={'Content-Disposition': f'attachment; filename={download_name}'})
+
+        # Binary formats are written to a temporary file, then streamed from disk
+        output = tempfile.TemporaryFile()
+        writer = write_xlsx if export_format == 'xlsx' else write_parquet
+        with EXPORT_SECONDS.time(format=export_format):
+            writer(result_store.iter_rows(result_id), output)
+        output.seek(0)
+        return send_file(output, mimetype=spec['mimetype'], as_attachment=True, download_name=download_name)
+
+    except ExportUnavailable as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in export_results: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Cursor from a previous page, or None; raises ValueError when malformed"""
+    if not cursor:
+        return None
+    values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if not isinstance(values, list) or not values:
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def query_flag(name):
+    return request.args.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+@app.route('/results', methods=['POST'])
+def save_results():
+    """Store rows the client already holds (a cancelled stream) so /export/<result_id> can serve them"""
+    data = request.get_json(silent=True) or {}
+    businesses = data.get('businesses')
+    if not isinstance(businesses, list) or not businesses or \
+            not all(isinstance(business, dict) for business in businesses):
+        return jsonify({'error': 'businesses must be a non-empty list of objects'}), 400
+    try:
+        city = text_param(data, 'city')
+        keyword = text_param(data, 'keyword')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    result_id = store_results({'city': city or None, 'keyword': keyword or None}, businesses)
+    if not result_id:
+        return jsonify({'error': 'Could not store results'}), 500
+    return jsonify({'success': True, 'result_id': result_id, 'count': len(businesses)}), 201
+
+
+@app.route('/results/<result_id>')
+def get_results(result_id):
+    """One page of a stored result set, filtered and sorted in SQLite
+
+    Query parameters: q (name or phone search), no_website, no_instagram,
+    sort (position or name), order (asc or desc), limit and cursor (the
+    next_cursor of the previous page). The first page also carries totals.
+    """
+    if not result_store.get(result_id):
+        return jsonify({'error': 'Result not found'}), 404
+
+    sort = request.args.get('sort', 'position')
+    if sort not in RESULT_SORTS:
+        return jsonify({'error': f'Unsupported sort: {sort}'}), 400
+    limit = max(1, min(request.args.get('limit', RESULTS_PAGE_SIZE, type=int), RESULTS_MAX_PAGE_SIZE))
+    try:
+        after = decode_cursor(request.args.get('cursor'))
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+
+    filters = {
+        'search': request.args.get('q', ''),
+        'no_website': query_flag('no_website'),
+        'no_instagram': query_flag('no_instagram')
+    }
+    if after is not None and not valid_cursor(sort, after):
+        return jsonify({'error': f"Cursor does not belong to sort '{sort}'"}), 400
+    try:
+        businesses, cursor = result_store.query(result_id, sort=sort, descending=request.args.get('order') == 'desc',
+                                                limit=limit, after=after, **filters)
+        payload = {
+            'result_id': result_id,
+            'businesses': businesses,
+            'count': len(businesses),
+            'next_cursor': encode_cursor(cursor) if cursor else None
+        }
+        if after is None:
+            payload['matched'] = result_store.count(result_id, **filters)
+            payload['summary'] = result_store.summary(result_id)
+        return jsonify(payload)
+
+    except Exception as e:
+        logger.error(f"Error in get_results: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/export_csv')
 def export_csv():
+    """Legacy export of a URL-encoded JSON payload; prefer /export/<result_id>"""
     try:
         businesses = request.args.get('data')
         if not businesses:
@@ -545,29 +2310,9 @@ def export_csv():
 
         business_data = json.loads(businesses)
 
-        # Create CSV
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # Write header
-        writer.writerow(
-            ['Business Name', 'Contact Number', 'Website', 'Instagram Handle', 'Instagram Bio', 'Followers'])
-
-        # Write data
-        for business in business_data:
-            writer.writerow([
-                business.get('name', ''),
-                business.get('phone', ''),
-                business.get('website', ''),
-                business.get('instagram_handle', ''),
-                business.get('instagram_bio', ''),
-                business.get('instagram_followers', '')
-            ])
-
         # Create file response
-        output.seek(0)
         return send_file(
-            io.BytesIO(output.getvalue().encode()),
+            io.BytesIO(''.join(iter_csv(business_data)).encode()),
             mimetype='text/csv',
             as_attachment=True,
             download_name=f'business_analysis_{int(time.time())}.csv'
@@ -584,7 +2329,9 @@ def test_endpoint():
     return jsonify({
         'status': 'OK',
         'selenium_available': SELENIUM_AVAILABLE,
-        'webdriver_status': 'Available' if analyzer.driver else 'Not Available',
+        'webdriver_status': analyzer.driver_status(),
+        'driver_pool': analyzer.pool.status() if analyzer.pool else None,
+        'scrape_workers': scraper.pool.status() if scraper is not analyzer else None,
         'timestamp': time.time()
     })
 
@@ -594,26 +2341,151 @@ def debug_endpoint():
     """Debug endpoint to check current state"""
     debug_info = {
         'selenium_available': SELENIUM_AVAILABLE,
-        'driver_status': 'Available' if analyzer.driver else 'Not Available',
+        'driver_status': analyzer.driver_status(),
         'businesses_count': len(analyzer.businesses)
     }
 
-    if analyzer.driver:
-        try:
-            debug_info['driver_title'] = analyzer.driver.title
-            debug_info['driver_url'] = analyzer.driver.current_url
-        except:
-            debug_info['driver_error'] = 'Driver not accessible'
+    if analyzer.pool:
+        debug_info['driver_pool'] = analyzer.pool.status()
+    if scraper is not analyzer:
+        debug_info['scrape_workers'] = scraper.pool.status()
+
+    debug_info['result_cache'] = result_cache.stats()
+    debug_info['entity_cache'] = entity_store.stats()
+    debug_info['result_store'] = result_store.stats()
+    debug_info['search_snapshots'] = snapshot_store.stats()
+    debug_info['instagram_enrichment'] = instagram_enricher.stats()
+    debug_info['selectors'] = selector_registry.snapshot()
 
     return jsonify(debug_info)
 
 
+def pool_events():
+    stats = analyzer.pool.stats if analyzer.pool else {}
+    return [({'event': event}, count) for event, count in sorted(stats.items())]
+
+
+def pool_drivers():
+    if not analyzer.pool:
+        return []
+    status = analyzer.pool.status()
+    return [({'state': 'idle'}, status['idle']), ({'state': 'in_use'}, status['in_use'])]
+
+
+def worker_events():
+    if scraper is analyzer:
+        return []
+    return [({'event': event}, count) for event, count in sorted(scraper.pool.stats.items())]
+
+
+def worker_processes():
+    if scraper is analyzer:
+        return []
+    status = scraper.pool.status()
+    return [({'state': 'idle'}, status['idle']), ({'state': 'in_use'}, status['in_use'])]
+
+
+def worker_rss():
+    if scraper is analyzer:
+        return []
+    return [({'pid': str(worker['pid'])}, worker['rss_mb'] * 2 ** 20) for worker in scraper.pool.status()['workers']
+            if worker['rss_mb'] is not None]
+
+
+def selector_attempts():
+    samples = []
+    for cascade, rows in selector_registry.snapshot().items():
+        for row in rows:
+            samples.append(({'cascade': cascade, 'selector': row['selector'], 'result': 'hit'}, row['hits']))
+            samples.append(({'cascade': cascade, 'selector': row['selector'], 'result': 'miss'}, row['misses']))
+    return samples
+
+
+def enrichment_events():
+    return [({'event': event}, count) for event, count in sorted(instagram_enricher.stats().items())
+            if isinstance(count, int)]
+
+
+metrics.collected('webdriver_pool_events_total', 'Driver pool lifecycle events; recycled and crashed are restarts',
+                  'counter', pool_events)
+metrics.collected('webdriver_pool_drivers', 'Live pooled drivers by state', 'gauge', pool_drivers)
+metrics.collected('scrape_worker_events_total', 'Worker process lifecycle events; recycled, killed and crashed '
+                  'are restarts', 'counter', worker_events)
+metrics.collected('scrape_workers', 'Live scrape worker processes by state', 'gauge', worker_processes)
+metrics.collected('scrape_worker_rss_bytes', 'Resident memory of each worker and its browsers at the last check',
+                  'gauge', worker_rss)
+metrics.collected('selector_attempts_total', 'Selector cascade attempts by outcome', 'counter', selector_attempts)
+metrics.collected('instagram_enrichment_events_total', 'Website and profile fetch outcomes', 'counter',
+                  enrichment_events)
+
+
+def start_driver_prewarm(count=DRIVER_PREWARM):
+    """Launch up to ``count`` pooled browsers (or worker processes) in the background; call when serving"""
+    if count > 0 and scraper.pool:
+        logger.info(f"Pre-warming {count} {'worker process' if scraper is not analyzer else 'WebDriver'}(s) "
+                    f"in the background")
+        return scraper.pool.warm_up_async(count)
+    return None
+
+
+_shutdown_lock = threading.Lock()
+_shut_down = False
+
+
+def shutdown():
+    """Stop background work and close every browser and worker process; safe to call repeatedly"""
+    global _shut_down
+    with _shutdown_lock:
+        if _shut_down:
+            return
+        _shut_down = True
+    logger.info("Shutting down: closing scrape workers and browsers")
+    job_manager.shutdown()
+    instagram_enricher.shutdown()
+    refresh_executor.shutdown(wait=False, cancel_futures=True)
+    if scraper is not analyzer:
+        scraper.cleanup()
+    analyzer.cleanup()
+
+
+def install_shutdown_handlers():
+    """Run shutdown() at exit and on SIGTERM/SIGINT before the handler already installed (e.g. the server's)"""
+    atexit.register(shutdown)
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        previous = signal.getsignal(signum)
+
+        def handler(received, frame, previous=previous):
+            shutdown()
+            if callable(previous):
+                previous(received, frame)
+            elif previous != signal.SIG_IGN:
+                raise SystemExit(128 + received)
+
+        try:
+            signal.signal(signum, handler)
+        except ValueError:
+            # Not the main thread; atexit still runs shutdown()
+            logger.warning("Signal handlers not installed outside the main thread")
+            return
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus text exposition of the counters and histograms above"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
 if __name__ == '__main__':
     try:
         logger.info("Starting Flask application...")
         logger.info(f"Selenium available: {SELENIUM_AVAILABLE}")
-        if analyzer.driver:
-            logger.info("WebDriver initialized successfully")
+        install_shutdown_handlers()
+        if scraper is not analyzer:
+            logger.info(f"Scraping in up to {SCRAPE_WORKERS} worker processes "
+                        f"(recycled at {WORKER_MAX_RSS_MB:.0f} MiB or {WORKER_MAX_JOBS} jobs)")
+        if analyzer.pool:
+            logger.info(f"WebDriver pool ready (size={analyzer.pool.size}, drivers start on first use)")
+            start_driver_prewarm()
         else:
             logger.warning("WebDriver not available - will use demo data")
 
@@ -623,4 +2495,4 @@ if __name__ == '__main__':
     except Exception as e:
         logger.error(f"Application error: {e}")
     finally:
-        analyzer.cleanup()
\ No newline at end of file
+        shutdown()
\ No newline at end of file
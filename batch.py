@@ -0,0 +1,198 @@
+# batch.py - Run many city x keyword searches across a bounded set of browser workers
+import sys
+import json
+import time
+import argparse
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from cleaning import normalize_phone
+from logging_config import run_in_context
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Enforces a minimum interval between requests to the same host across threads"""
+
+    def __init__(self, min_interval=2.0):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+def business_key(business):
+    """Identity used to merge the same place found by different queries
+
+    The place id when known, else the normalized phone; only places with
+    neither fall back to their name.
+    """
+    if business.get('cid'):
+        return ('cid', business['cid'])
+    phone = normalize_phone(business.get('phone'))
+    if phone:
+        return ('phone', phone)
+    return ('name', ' '.join((business.get('name') or '').lower().split()))
+
+
+class BatchRunner:
+    """Schedules a cities x keywords matrix over ``workers`` threads
+
+    ``scrape_query(city, keyword, limit)`` returns a list of businesses and
+    raises to signal a failed attempt; failed queries are retried with
+    linear backoff. Businesses are deduplicated across queries and tagged
+    with the queries that found them.
+    """
+
+    def __init__(self, scrape_query, workers=2, rate_limiter=None, retries=2, backoff=5.0, host='www.google.com'):
+        self.scrape_query = scrape_query
+        self.workers = max(1, int(workers))
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.retries = retries
+        self.backoff = backoff
+        self.host = host
+
+    def _run_query(self, city, keyword, limit, cancel_event=None):
+        started = time.monotonic()
+        error = None
+        for attempt in range(1, self.retries + 2):
+            if cancel_event is not None and cancel_event.is_set():
+                error = 'cancelled'
+                break
+            self.rate_limiter.wait(self.host)
+            try:
+                businesses = self.scrape_query(city, keyword, limit)
+                return {'city': city, 'keyword': keyword, 'status': 'ok', 'attempts': attempt,
+                        'count': len(businesses), 'seconds': round(time.monotonic() - started, 3)}, businesses
+            except Exception as e:
+                error = str(e)
+                logger.warning(f"Batch query '{keyword}' in '{city}' failed (attempt {attempt}): {e}")
+                if attempt <= self.retries:
+                    time.sleep(self.backoff * attempt)
+
+        return {'city': city, 'keyword': keyword, 'status': 'failed', 'attempts': attempt, 'error': error,
+                'count': 0, 'seconds': round(time.monotonic() - started, 3)}, []
+
+    def run(self, cities, keywords, limit=10, on_query_done=None, cancel_event=None):
+        """Run every pair; ``on_query_done(summary, new_businesses)`` fires as each finishes"""
+        started = time.monotonic()
+        merged = {}
+        queries = []
+        pairs = [(city, keyword) for city in cities for keyword in keywords]
+        logger.info(f"Starting batch of {len(pairs)} queries with {self.workers} workers")
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='batch') as executor:
+            futures = [run_in_context(executor, self._run_query, city, keyword, limit, cancel_event)
+                       for city, keyword in pairs]
+            for future in as_completed(futures):
+                summary, businesses = future.result()
+                source = f"{summary['keyword']} in {summary['city']}"
+                new_businesses = []
+                for business in businesses:
+                    key = business_key(business)
+                    if key in merged:
+                        merged[key]['sources'].append(source)
+                    else:
+                        merged[key] = dict(business, sources=[source])
+                        new_businesses.append(merged[key])
+                queries.append(summary)
+                if on_query_done:
+                    on_query_done(summary, new_businesses)
+
+        return {
+            'queries': queries,
+            'businesses': list(merged.values()),
+            'count': len(merged),
+            'seconds': round(time.monotonic() - started, 3)
+        }
+
+
+def write_output(result, path):
+    """Write combined businesses to .json, .csv, .xlsx or .parquet"""
+    from exports import iter_csv, write_xlsx, write_parquet
+
+    extension = path.rsplit('.', 1)[-1].lower()
+    if extension == 'json':
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    elif extension == 'csv':
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            for chunk in iter_csv(result['businesses']):
+                f.write(chunk)
+    elif extension in ('xlsx', 'parquet'):
+        writer = write_xlsx if extension == 'xlsx' else write_parquet
+        with open(path, 'wb') as f:
+            writer(result['businesses'], f)
+    else:
+        raise ValueError(f"Unsupported output format: {extension}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scrape every city x keyword pair and merge the results')
+    parser.add_argument('--cities', nargs='+', required=True, help='City names (or @file with one per line)')
+    parser.add_argument('--keywords', nargs='+', required=True, help='Business keywords (or @file)')
+    parser.add_argument('--limit', type=int, default=10, help='Results per query (up to MAX_LIMIT, default 500)')
+    parser.add_argument('--workers', type=int, default=2, help='Concurrent browser workers')
+    parser.add_argument('--min-interval', type=float, default=2.0, help='Seconds between queries to Google')
+    parser.add_argument('--retries', type=int, default=2, help='Retries per failed query')
+    parser.add_argument('--output', default='batch_results.json', help='Output file (.json, .csv, .xlsx, .parquet)')
+    parser.add_argument('--delta', action='store_true',
+                        help='Only re-extract places whose result card changed since the last --delta run')
+    parser.add_argument('--clean', action='store_true',
+                        help='Normalize phones, websites and Instagram handles, then merge duplicates sharing one')
+    args = parser.parse_args(argv)
+
+    def expand(values):
+        items = []
+        for value in values:
+            if value.startswith('@'):
+                with open(value[1:], encoding='utf-8') as f:
+                    items.extend(line.strip() for line in f if line.strip())
+            else:
+                items.append(value)
+        return items
+
+    # Imported here so --help works without starting the app
+    import app
+
+    analyzer = app.BusinessAnalyzer(pool_size=args.workers, entity_store=app.entity_store,
+                                    enricher=app.instagram_enricher, selectors=app.selector_registry,
+                                    snapshot_store=app.snapshot_store)
+    changes = {}
+
+    def on_changes(city, keyword, diff):
+        changes[f"{city} / {keyword}"] = diff
+
+    try:
+        runner = BatchRunner(app.make_batch_query(analyzer, delta=args.delta, on_changes=on_changes),
+                             workers=args.workers, rate_limiter=RateLimiter(args.min_interval), retries=args.retries)
+        result = runner.run(expand(args.cities), expand(args.keywords), max(1, min(args.limit, app.MAX_LIMIT)))
+        if args.delta:
+            result['changes'] = changes
+        if args.clean:
+            from cleaning import clean_businesses
+            result['businesses'] = clean_businesses(result['businesses'])
+            result['count'] = len(result['businesses'])
+        result['result_id'] = app.result_store.save(result['businesses'])
+        write_output(result, args.output)
+        failed = sum(1 for query in result['queries'] if query['status'] != 'ok')
+        logger.info(f"Batch finished: {result['count']} unique businesses from {len(result['queries'])} queries "
+                    f"({failed} failed) in {result['seconds']}s, written to {args.output}")
+        return 1 if failed else 0
+    finally:
+        analyzer.cleanup()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+# bench_cleaning.py - Vectorized result cleaning against the per-row Python path
+#
+#   python benchmarks/bench_cleaning.py [--sizes 10000 100000 1000000] [--duplicates 0.3]
+#                                       [--runs 1] [--output results.json]
+#
+# Generates get_demo_data-style businesses scaled up, with phones, websites
+# and Instagram handles written in the mixed forms scrapes return and
+# --duplicates of the rows repeating an earlier place in another form, as
+# merged multi-query results do. Each size is cleaned by cleaning.clean_rows
+# and cleaning.clean_businesses (pandas); the report shows both timings and
+# checks that both paths produce the same businesses. clean_businesses runs
+# row by row below CLEAN_VECTORIZE_MIN_ROWS; set it to 0 to time the pandas
+# path at every size.
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cleaning  # noqa: E402
+
+CITIES = ['Pune', 'Mumbai', 'Delhi', 'Bangalore', 'Chennai']
+PREFIXES = ['Royal', 'Golden', 'Premium', 'Classic', 'Modern', 'Elite']
+SUFFIXES = ['Bistro', 'Kitchen', 'Cafe', 'Coffee House', 'Roasters', 'Hotel', 'Clinic', 'Store', 'Outlet']
+
+PHONE_FORMS = [
+    lambda d: f"+91-{d[:5]}-{d[5:]}",
+    lambda d: f"0{d[:5]} {d[5:]}",
+    lambda d: f"+91 {d[:5]} {d[5:]}",
+    lambda d: d,
+    lambda d: f"0091 {d[:5]} {d[5:]}",
+    lambda d: "Not found"
+]
+WEBSITE_FORMS = [
+    lambda host: f"https://www.{host}/",
+    lambda host: f"http://{host}",
+    lambda host: f"https://{host.upper()}/",
+    lambda host: f"www.{host}/#contact",
+    lambda host: "Not found"
+]
+HANDLE_FORMS = [
+    lambda handle: f"@{handle}",
+    lambda handle: handle.title(),
+    lambda handle: f"https://www.instagram.com/{handle}/?hl=en",
+    lambda handle: "Not found"
+]
+
+
+def make_businesses(count, duplicates=0.3, seed=25):
+    """``count`` businesses where ``duplicates`` of them re-list an earlier place in other forms"""
+    rng = random.Random(seed)
+    places = []
+    businesses = []
+    for i in range(count):
+        if places and rng.random() < duplicates:
+            place = rng.choice(places)
+            cid = None
+        else:
+            name = f"{rng.choice(PREFIXES)} {rng.choice(SUFFIXES)} {rng.choice(CITIES)} {i}"
+            slug = name.lower().replace(' ', '')
+            place = {'name': name, 'digits': str(rng.randint(7 * 10 ** 9, 10 ** 10 - 1)),
+                     'host': f"{slug[-24:]}.{rng.choice(['com', 'in'])}", 'handle': slug[-20:]}
+            places.append(place)
+            cid = str(10 ** 17 + i)
+        businesses.append({
+            'name': place['name'],
+            'phone': rng.choice(PHONE_FORMS)(place['digits']),
+            'website': rng.choice(WEBSITE_FORMS)(place['host']),
+            'cid': cid,
+            'instagram_handle': rng.choice(HANDLE_FORMS)(place['handle']),
+            'instagram_bio': f"Welcome to {place['name']}!",
+            'instagram_followers': str(rng.randint(100, 50000)),
+            'sources': [f"{rng.choice(SUFFIXES).lower()} in {rng.choice(CITIES)}"]
+        })
+    return businesses, len(places)
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark vectorized result cleaning against per-row cleaning')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--duplicates', type=float, default=0.3, help='Fraction of rows repeating an earlier place')
+    parser.add_argument('--runs', type=int, default=1)
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args(argv)
+
+    # Load pandas and pyarrow compute kernels before timing anything
+    cleaning.clean_businesses(make_businesses(100)[0])
+    cases = []
+    for size in args.sizes:
+        businesses, places = make_businesses(size, args.duplicates)
+        for _ in range(args.runs):
+            rows, rows_seconds = timed(cleaning.clean_rows, businesses)
+            frame, frame_seconds = timed(cleaning.clean_businesses, businesses)
+            case = {
+                'rows': size,
+                'places': places,
+                'unique': len(frame),
+                'rows_seconds': round(rows_seconds, 3),
+                'pandas_seconds': round(frame_seconds, 3),
+                'speedup': round(rows_seconds / frame_seconds, 2),
+                'results_match': rows == frame
+            }
+            cases.append(case)
+            print(f"rows {size:>8}  unique {case['unique']:>8}/{places:<8} per-row {rows_seconds:7.2f}s  "
+                  f"pandas {frame_seconds:6.2f}s  x{case['speedup']:<5}  "
+                  f"match {case['results_match']}",
+                  file=sys.stderr)
+
+    report = {
+        'benchmark': 'result_cleaning',
+        'created': time.time(),
+        'duplicates': args.duplicates,
+        'cases': cases
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+# bench_delta.py - Delta re-scrapes against a full re-scrape of a changed search
+#
+#   python benchmarks/bench_delta.py [--sizes 100 300] [--churn 0 0.05 0.2]
+#                                    [--latency-ms 2] [--page-size 20] [--output results.json]
+#
+# For each size a baseline delta run stores snapshot A of a generated search.
+# Snapshot B then re-rates some places and gives them a new phone, drops some
+# and inserts new ones (--churn is the changed fraction; half as many are
+# removed and added). B is scraped both in full and as a delta run against
+# A, reporting wall time, detail panel clicks and Instagram lookups. The
+# delta run's added/changed/removed diff is checked against the churn that
+# was applied and its businesses against the full run's.
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app  # noqa: E402
+from storage import SnapshotStore  # noqa: E402
+from replay_driver import ReplayDriver, make_places, render_fixture, churn_places  # noqa: E402
+
+
+class CountingAnalyzer(app.BusinessAnalyzer):
+    """BusinessAnalyzer that counts the Instagram lookups it starts"""
+
+    lookups = 0
+
+    def _submit_instagram(self, business_data, ctx):
+        if not all(field in business_data for field in app.INSTAGRAM_FIELDS):
+            self.lookups += 1
+        return super()._submit_instagram(business_data, ctx)
+
+
+def run_case(fixture, limit, latency, page_size, snapshot_store=None, delta=False):
+    drivers = []
+
+    def factory():
+        driver = ReplayDriver(fixture, latency=latency, page_size=page_size)
+        drivers.append(driver)
+        return driver
+
+    analyzer = CountingAnalyzer(driver_factory=factory, pool_size=1, snapshot_store=snapshot_store)
+    ctx = app.ScrapeContext()
+    started = time.perf_counter()
+    try:
+        businesses = analyzer.scrape_google_maps_businesses('Pune', 'cafe', limit, ctx=ctx, mode='bulk', delta=delta)
+    finally:
+        analyzer.cleanup()
+    return {
+        'businesses': businesses,
+        'seconds': round(time.perf_counter() - started, 3),
+        'clicks': sum(driver.calls['click'] for driver in drivers),
+        'instagram_lookups': analyzer.lookups,
+        'unchanged': ctx.counters.get('delta_unchanged', 0),
+        'changes': ctx.changes
+    }
+
+
+def contacts(businesses):
+    return {business['cid']: (business['name'], business['phone'], business['website']) for business in businesses}
+
+
+def run_size(size, churn, latency, page_size, directory):
+    places = make_places(size)
+    later, truth = churn_places(places, changed=churn, removed=churn / 2, added=churn / 2)
+    limit = max(size, len(later))
+    store = SnapshotStore(os.path.join(directory, f'snapshots-{size}-{churn}.sqlite3'))
+
+    baseline = run_case(render_fixture(places), limit, latency, page_size, store, delta=True)
+    full = run_case(render_fixture(later), limit, latency, page_size)
+    delta = run_case(render_fixture(later), limit, latency, page_size, store, delta=True)
+
+    changes = delta['changes']
+    found = {kind: {entry['cid'] for entry in changes[kind]} for kind in ('added', 'changed', 'removed')}
+    return {
+        'size': size,
+        'churn': churn,
+        'applied': {kind: len(cids) for kind, cids in truth.items()},
+        'baseline_seconds': baseline['seconds'],
+        'full': {key: full[key] for key in ('seconds', 'clicks', 'instagram_lookups')},
+        'delta': {key: delta[key] for key in ('seconds', 'clicks', 'instagram_lookups', 'unchanged')},
+        'diff': {kind: len(cids) for kind, cids in found.items()},
+        'diff_matches': found == truth,
+        'results_match': contacts(delta['businesses']) == contacts(full['businesses']),
+        'speedup': round(full['seconds'] / delta['seconds'], 2) if delta['seconds'] else None
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark delta re-scrapes against full re-scrapes')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 300])
+    parser.add_argument('--churn', type=float, nargs='+', default=[0.0, 0.05, 0.2],
+                        help='Fraction of places changed between snapshots')
+    parser.add_argument('--latency-ms', type=float, default=2.0, help='Simulated WebDriver round-trip per call')
+    parser.add_argument('--page-size', type=int, default=20, help='Cards revealed per feed scroll')
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+    # Keep runs offline and comparable: no entity cache, simulated Instagram lookups
+    app.INSTAGRAM_LOOKUP = 'simulated'
+
+    cases = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            for churn in args.churn:
+                case = run_size(size, churn, args.latency_ms / 1000, args.page_size, directory)
+                cases.append(case)
+                full, delta, diff = case['full'], case['delta'], case['diff']
+                print(f"size {size:<4} churn {churn:<5} full {full['seconds']:6.2f}s {full['clicks']:>4} clicks "
+                      f"{full['instagram_lookups']:>4} lookups | delta {delta['seconds']:6.2f}s {delta['clicks']:>4} "
+                      f"clicks {delta['instagram_lookups']:>4} lookups | +{diff['added']} ~{diff['changed']} "
+                      f"-{diff['removed']}  diff ok {case['diff_matches']}  results ok {case['results_match']}",
+                      file=sys.stderr)
+
+    report = {
+        'benchmark': 'delta_rescrape',
+        'created': time.time(),
+        'latency_ms': args.latency_ms,
+        'page_size': args.page_size,
+        'cases': cases
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
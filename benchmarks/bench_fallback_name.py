@@ -0,0 +1,91 @@
+# bench_fallback_name.py - Fallback business-name scan over Maps-sized page_source
+#
+#   python benchmarks/bench_fallback_name.py [--size-mb 3] [--repeat 5]
+#
+# Pages are generated to resemble a Maps place page: a long run of inline
+# script data made of quoted strings, nulls and nested arrays, with the name
+# markers placed where Maps puts them. Compares the previous findall-per-
+# pattern implementation with app.scan_fallback_name and checks both agree.
+# The first scenario puts the place record deep inside the blob, the
+# others have no place record so every higher-priority pattern misses.
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import FALLBACK_NAME_PATTERNS, scan_fallback_name  # noqa: E402
+
+
+def legacy_fallback_name(page_source):
+    """The pre-compiled-pattern implementation, kept for comparison"""
+    for pattern, _, _ in FALLBACK_NAME_PATTERNS:
+        matches = re.findall(pattern.pattern, page_source)
+        if matches:
+            potential_name = matches[0].strip()
+            if len(potential_name) > 2 and not potential_name.lower().startswith('result'):
+                return potential_name
+    return None
+
+
+def script_noise(rng, size):
+    words = ['0x3bc2c1', 'Pune', 'Maharashtra', 'en', 'IN', 'cafe', 'SearchResult', 'https://lh5.googleusercontent.com/p/AF1Q']
+    parts = []
+    total = 0
+    while total < size:
+        chunk = '[' + ','.join(rng.choice([
+            'null', str(rng.randint(0, 99999)), f'"{rng.choice(words)}{rng.randint(0, 999)}"',
+            f'[{rng.random():.6f},{rng.random():.6f}]', '"' + 'x' * rng.randint(5, 60) + '"'
+        ]) for _ in range(rng.randint(5, 30))) + ']'
+        parts.append(chunk)
+        total += len(chunk) + 1
+    return ','.join(parts)
+
+
+def make_page(rng, size, scenario):
+    title = '<title>Blue Tokai Coffee Roasters - Google Maps</title>' if scenario != 'no_match' else '<title>Google Maps</title>'
+    head = f'<html><head>{title}<script>window.APP_INITIALIZATION_STATE=['
+    body = script_noise(rng, size)
+    marker = ''
+    if scenario == 'place_data':
+        # Maps puts the place record deep inside the initialization blob
+        cut = int(len(body) * 0.6)
+        body = body[:cut] + ',"Blue Tokai Coffee Roasters",null,null,null,null,[10,3],' + body[cut:]
+    elif scenario == 'aria_label':
+        marker = '<h1 aria-label="Blue Tokai Coffee Roasters" class="DUwDvf lfPIob">Blue Tokai</h1>'
+    return f'{head}{body}];</script></head><body><div role="main">{marker}</div></body></html>'
+
+
+def timed(fn, page, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(page)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size-mb', type=float, default=3.0, help='Approximate page_source size')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per case (best is reported)')
+    args = parser.parse_args(argv)
+
+    rng = random.Random(14)
+    size = int(args.size_mb * 1024 * 1024)
+    print(f"{'scenario':<12} {'bytes':>9} {'legacy ms':>10} {'scan ms':>9} {'speedup':>8}  result")
+    for scenario in ('place_data', 'title', 'aria_label', 'no_match'):
+        page = make_page(rng, size, scenario)
+        legacy_time, legacy_result = timed(legacy_fallback_name, page, args.repeat)
+        scan_time, scan_result = timed(scan_fallback_name, page, args.repeat)
+        assert legacy_result == scan_result, (scenario, legacy_result, scan_result)
+        print(f"{scenario:<12} {len(page):>9} {legacy_time * 1000:>10.2f} {scan_time * 1000:>9.2f} "
+              f"{legacy_time / scan_time:>7.1f}x  {scan_result!r}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+# bench_logging.py - Logging cost per scraped business under each logging setup
+#
+#   python benchmarks/bench_logging.py [--businesses 100] [--repeat 3]
+#
+# Scrapes the demo path and a replayed click-through path with logging off,
+# then with each handler setup, and reports the extra time per business on
+# the scraping thread. Queue setups hand records to a listener thread, so
+# their formatting and file I/O are not on that thread. Setups are run
+# round-robin with the garbage collector paused, keeping the best of each.
+import gc
+import os
+import sys
+import time
+import queue
+import logging
+import argparse
+import tempfile
+from logging.handlers import QueueListener
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app  # noqa: E402
+from logging_config import ContextFilter, SamplingFilter, JsonFormatter, DeferredQueueHandler, TEXT_FORMAT  # noqa: E402
+from replay_driver import ReplayDriver, make_fixture  # noqa: E402
+
+# (name, level, queued, formatter)
+SETUPS = [
+    ('sync-text-info', logging.INFO, False, 'text'),
+    ('queue-text-info', logging.INFO, True, 'text'),
+    ('queue-json-info', logging.INFO, True, 'json'),
+    ('queue-json-debug', logging.DEBUG, True, 'json')
+]
+
+
+def install(level, queued, fmt, path):
+    """Replace the root handlers; returns a callable that flushes and removes them"""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(level)
+    if level > logging.CRITICAL:
+        return lambda: None
+
+    target = logging.FileHandler(path, mode='w', encoding='utf-8')
+    target.setFormatter(JsonFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT))
+    if not queued:
+        target.addFilter(SamplingFilter())
+        target.addFilter(ContextFilter())
+        root.addHandler(target)
+        return lambda: (root.removeHandler(target), target.close())
+
+    log_queue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter())
+    handler.addFilter(ContextFilter())
+    root.addHandler(handler)
+    listener = QueueListener(log_queue, target, respect_handler_level=True)
+    listener.start()
+    return lambda: (root.removeHandler(handler), listener.stop(), target.close())
+
+
+def per_business(path_name, fixture, count):
+    gc.collect()
+    gc.disable()
+    try:
+        return _per_business(path_name, fixture, count)
+    finally:
+        gc.enable()
+
+
+def _per_business(path_name, fixture, count):
+    if path_name == 'demo':
+        analyzer = app.BusinessAnalyzer()
+        analyzer.pool = None
+        started = time.perf_counter()
+        scraped = sum(len(analyzer.scrape_google_maps_businesses('Pune', 'cafe', 50)) for _ in range(count // 50 or 1))
+        return (time.perf_counter() - started) / scraped
+
+    analyzer = app.BusinessAnalyzer(driver_factory=lambda: ReplayDriver(fixture), pool_size=1)
+    try:
+        started = time.perf_counter()
+        scraped = len(analyzer.scrape_google_maps_businesses('Pune', 'cafe', count, mode='click'))
+        return (time.perf_counter() - started) / scraped
+    finally:
+        analyzer.cleanup()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure logging overhead per scraped business')
+    parser.add_argument('--businesses', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5, help='Rounds over all setups (best is reported)')
+    args = parser.parse_args(argv)
+
+    app.INSTAGRAM_LOOKUP = 'simulated'
+    fixture = make_fixture(args.businesses)
+    log_path = os.path.join(tempfile.mkdtemp(), 'bench.log')
+
+    setups = [('off', logging.CRITICAL + 1, False, None)] + SETUPS
+    for path_name in ('demo', 'click'):
+        per_business(path_name, fixture, args.businesses)  # warm-up
+        results = {}
+        sizes = {}
+        for _ in range(args.repeat):
+            for name, level, queued, fmt in setups:
+                remove = install(level, queued, fmt, log_path)
+                try:
+                    seconds = per_business(path_name, fixture, args.businesses)
+                finally:
+                    remove()
+                results[name] = min(results.get(name, seconds), seconds)
+                sizes[name] = os.path.getsize(log_path) if name != 'off' else 0
+
+        for name, _, _, _ in setups:
+            overhead = (results[name] - results['off']) * 1e6
+            print(f"{path_name:<6} {name:<17} {results[name] * 1e6:>9.1f}us/business "
+                  f"overhead {overhead:>8.1f}us  log {sizes[name]:>8} bytes")
+
+
+if __name__ == '__main__':
+    main()
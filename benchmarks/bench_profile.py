@@ -0,0 +1,196 @@
+# bench_profile.py - Page weight and load time of the standard and lean browser profiles
+#
+#   python benchmarks/bench_profile.py [--limit 20] [--runs 3] [--latency-ms 5] [--bandwidth-mbps 20]
+#                                      [--chrome] [--server-delay-ms 20] [--output results.json]
+#
+# Replay cases run full scrapes against ReplayDriver with a results page that
+# references a desktop Maps page's subresources (scripts, tiles, photos,
+# fonts, analytics). The driver honours the profile's CDP URL blocking and
+# page load strategy, so they report bytes transferred and navigation time.
+#
+# With --chrome, each profile also loads the same page in a real Chrome from
+# a local fixture server, reporting navigation time, transferred bytes and
+# the RSS of the browser's process tree. Chrome cases are skipped when no
+# browser can be started.
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import itertools
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app  # noqa: E402
+from workers import process_tree_rss  # noqa: E402
+from replay_driver import ReplayDriver, make_fixture, make_page_resources  # noqa: E402
+
+CONTENT_TYPES = {
+    'script': 'application/javascript', 'analytics': 'application/javascript', 'stylesheet': 'text/css',
+    'font': 'font/woff2', 'tile': 'image/png', 'image': 'image/jpeg', 'icon': 'image/png', 'media': 'video/mp4',
+    'ping': 'image/gif', 'xhr': 'application/json'
+}
+
+
+def run_replay(fixture, profile, limit, latency, bandwidth):
+    def factory():
+        driver = ReplayDriver(fixture, latency=latency, page_size=20, bandwidth=bandwidth,
+                              page_load_strategy='eager' if profile == 'lean' else 'normal')
+        app.configure_browser_network(driver, profile)
+        return driver
+
+    analyzer = app.BusinessAnalyzer(driver_factory=factory, pool_size=1, browser_profile=profile)
+    ctx = app.ScrapeContext()
+    started = time.perf_counter()
+    try:
+        businesses = analyzer.scrape_google_maps_businesses('Pune', 'cafe', limit, ctx=ctx)
+    finally:
+        analyzer.cleanup()
+    timings = ctx.as_dict()
+    return {
+        'profile': profile,
+        'businesses': len(businesses),
+        'seconds': round(time.perf_counter() - started, 3),
+        'navigation_seconds': timings['phases'].get('navigation', {}).get('total'),
+        'bytes_transferred': timings['bytes_transferred']
+    }
+
+
+def fixture_page(fixture):
+    """The fixture's results page with tags that make a browser request every listed resource"""
+    tags = []
+    for index, resource in enumerate(fixture['resources']):
+        kind, url = resource['kind'], resource['url']
+        if kind in ('script', 'analytics'):
+            tags.append(f'<script src="{url}"></script>')
+        elif kind == 'stylesheet':
+            tags.append(f'<link rel="stylesheet" href="{url}">')
+        elif kind == 'font':
+            tags.append(f'<style>@font-face {{font-family: f{index}; src: url("{url}")}}</style>'
+                        f'<span style="font-family: f{index}">Aa</span>')
+        elif kind == 'media':
+            tags.append(f'<video src="{url}" preload="auto" muted></video>')
+        elif kind == 'xhr':
+            tags.append(f'<script>fetch("{url}")</script>')
+        else:
+            tags.append(f'<img src="{url}" width="1" height="1">')
+    return fixture['results'].replace('</body>', ''.join(tags) + '</body>')
+
+
+def start_fixture_server(fixture, delay):
+    page = fixture_page(fixture).encode('utf-8')
+    sizes = {resource['url']: (resource['bytes'], CONTENT_TYPES[resource['kind']]) for resource in fixture['resources']}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            if self.path.startswith('/maps/search/'):
+                body, content_type = page, 'text/html; charset=utf-8'
+            elif self.path in sizes:
+                size, content_type = sizes[self.path]
+                body = b'/' * size
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_chrome(url, profile):
+    analyzer = app.BusinessAnalyzer(driver_factory=lambda: None, browser_profile=profile)
+    driver = analyzer.setup_selenium()
+    if driver is None:
+        return None
+    try:
+        ctx = app.ScrapeContext()
+        started = time.perf_counter()
+        driver.get(url)
+        analyzer.wait_for(driver, app.element_present(app.RESULTS_READY_SELECTOR), app.PAGE_READY_TIMEOUT, ctx)
+        seconds = time.perf_counter() - started
+        # Let anything the eager load left running finish before measuring
+        time.sleep(2)
+        return {
+            'profile': profile,
+            'navigation_seconds': round(seconds, 3),
+            'bytes_transferred': driver.execute_script(app.TRANSFER_SIZE_SCRIPT),
+            'browser_rss_bytes': process_tree_rss(driver.service.process.pid)
+        }
+    finally:
+        driver.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the standard and lean browser profiles')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='Simulated WebDriver round-trip per call')
+    parser.add_argument('--bandwidth-mbps', type=float, default=20.0, help='Simulated link speed for replay cases')
+    parser.add_argument('--chrome', action='store_true', help='Also load a local fixture server in real Chrome')
+    parser.add_argument('--server-delay-ms', type=float, default=20.0, help='Fixture server delay per request')
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+    app.INSTAGRAM_LOOKUP = 'simulated'
+
+    fixture = make_fixture(max(args.limit, 20))
+    fixture['resources'] = make_page_resources()
+    cases = []
+    for profile in app.BROWSER_PROFILES:
+        for _ in range(args.runs):
+            case = run_replay(fixture, profile, args.limit, args.latency_ms / 1000, args.bandwidth_mbps * 125_000)
+            case['driver'] = 'replay'
+            cases.append(case)
+            print(f"replay {profile:<8} navigation {case['navigation_seconds']:6.2f}s  total {case['seconds']:6.2f}s  "
+                  f"{case['bytes_transferred'] / 1024:8.0f} KiB", file=sys.stderr)
+
+    if args.chrome:
+        server = start_fixture_server(fixture, args.server_delay_ms / 1000)
+        url = f'http://127.0.0.1:{server.server_port}/maps/search/cafe+in+Pune'
+        try:
+            for profile, _ in itertools.product(app.BROWSER_PROFILES, range(args.runs)):
+                case = run_chrome(url, profile)
+                if case is None:
+                    print('Chrome could not be started, skipping browser cases', file=sys.stderr)
+                    break
+                case['driver'] = 'chrome'
+                cases.append(case)
+                print(f"chrome {profile:<8} navigation {case['navigation_seconds']:6.2f}s  "
+                      f"{case['bytes_transferred'] / 1024:8.0f} KiB  rss {case['browser_rss_bytes'] / 2 ** 20:6.0f} MiB",
+                      file=sys.stderr)
+        finally:
+            server.shutdown()
+
+    report = {
+        'benchmark': 'browser_profiles',
+        'created': time.time(),
+        'limit': args.limit,
+        'latency_ms': args.latency_ms,
+        'bandwidth_mbps': args.bandwidth_mbps,
+        'cases': cases
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# bench_results.py - Latency of paged, filtered result queries as stored result sets grow
+#
+#   python benchmarks/bench_results.py [--sizes 1000 10000 100000] [--pages 20]
+#
+# Stores a generated result set of each size in a temporary database and
+# times ResultStore.query over the first and the deepest pages for each
+# filter/sort combination the /results endpoint offers, plus count().
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import ResultStore  # noqa: E402
+
+WORDS = ['Blue', 'Tokai', 'Roasters', 'Corner', 'House', 'Third', 'Wave', 'Kitchen', 'Garden', 'Brew']
+
+CASES = [
+    ('all', {}),
+    ('no_website', {'no_website': True}),
+    ('name_sort', {'sort': 'name'}),
+    ('name_desc_no_ig', {'sort': 'name', 'descending': True, 'no_instagram': True}),
+    ('search_name', {'search': 'Garden Wave'}),
+    ('search_phone', {'search': '98765 4'})
+]
+
+
+def generate(count, seed=20):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            'name': f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i + 1}",
+            'phone': f"+91-98{rng.randint(100, 999)}-{rng.randint(10000, 99999)}",
+            'website': rng.choice(['Not found', f'https://site{i}.example.com']),
+            'instagram_handle': rng.choice(['Not found', f'@biz{i}'])
+        }
+
+
+def page_times(store, result_id, pages, **kwargs):
+    """Milliseconds for the first page and the average of the following ``pages`` pages"""
+    started = time.perf_counter()
+    _, cursor = store.query(result_id, limit=100, **kwargs)
+    first = time.perf_counter() - started
+    seconds, fetched = 0.0, 0
+    while cursor and fetched < pages:
+        started = time.perf_counter()
+        _, cursor = store.query(result_id, limit=100, after=cursor, **kwargs)
+        seconds += time.perf_counter() - started
+        fetched += 1
+    return first * 1000, (seconds / fetched * 1000) if fetched else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark server-side result paging')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--pages', type=int, default=20, help='Pages to follow after the first')
+    args = parser.parse_args(argv)
+
+    store = ResultStore(path=os.path.join(tempfile.mkdtemp(), 'bench_results.sqlite3'))
+    print(f"full-text search: {store.full_text}")
+    for size in args.sizes:
+        result_id = store.save(generate(size))
+        for name, kwargs in CASES:
+            first, later = page_times(store, result_id, args.pages, **kwargs)
+            filters = {key: value for key, value in kwargs.items() if key in ('search', 'no_website', 'no_instagram')}
+            started = time.perf_counter()
+            matched = store.count(result_id, **filters)
+            count_ms = (time.perf_counter() - started) * 1000
+            later_text = f"{later:7.2f}ms" if later is not None else '      -  '
+            print(f"rows={size:<7} {name:<16} first {first:7.2f}ms  next {later_text}  "
+                  f"count {count_ms:7.2f}ms ({matched} matched)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+# bench_scrape.py - Offline scraper benchmark over replayed Maps pages
+#
+#   python benchmarks/bench_scrape.py [--limits 10 50 500] [--modes bulk click]
+#                                     [--fixture DIR] [--latency-ms 0] [--page-size 20]
+#                                     [--output results.json]
+#
+# Runs BusinessAnalyzer end to end against benchmarks/replay_driver.py and
+# reports wall time, per-phase timings, WebDriver call counts and peak
+# traced memory per (mode, limit). Results are written as JSON so runs can
+# be compared across commits.
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app  # noqa: E402
+from replay_driver import ReplayDriver, load_fixture, make_fixture  # noqa: E402
+
+
+def run_case(fixture, mode, limit, latency, page_size=None):
+    drivers = []
+
+    def factory():
+        driver = ReplayDriver(fixture, latency=latency, page_size=page_size)
+        drivers.append(driver)
+        return driver
+
+    analyzer = app.BusinessAnalyzer(driver_factory=factory, pool_size=1)
+    ctx = app.ScrapeContext()
+    started = time.perf_counter()
+    try:
+        businesses = analyzer.scrape_google_maps_businesses('Pune', 'cafe', limit, ctx=ctx, mode=mode)
+    finally:
+        analyzer.cleanup()
+    seconds = time.perf_counter() - started
+
+    calls = {}
+    for driver in drivers:
+        for name, count in driver.calls.items():
+            calls[name] = calls.get(name, 0) + count
+    timings = ctx.as_dict()
+    return {
+        'mode': mode,
+        'limit': limit,
+        'businesses': len(businesses),
+        'demo_data': timings['demo_data'],
+        'seconds': round(seconds, 4),
+        'phases': timings['phases'],
+        'counters': timings['counters'],
+        'driver_calls': calls,
+        'driver_calls_total': sum(calls.values())
+    }
+
+
+def peak_memory(fixture, mode, limit, latency, page_size=None):
+    """Peak Python allocation during a second, traced run (tracing slows it, so it is not timed)"""
+    tracemalloc.start()
+    try:
+        run_case(fixture, mode, limit, latency, page_size)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the scraper against replayed Maps pages')
+    parser.add_argument('--limits', type=int, nargs='+', default=[10, 50, 500])
+    parser.add_argument('--modes', nargs='+', default=list(app.EXTRACTION_MODES), choices=app.EXTRACTION_MODES)
+    parser.add_argument('--fixture', help='Recorded fixture directory (default: generated pages)')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Simulated WebDriver round-trip per call')
+    parser.add_argument('--page-size', type=int, help='Cards revealed per feed scroll (default: all at once)')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the traced memory run')
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+    # Keep runs offline and comparable: no entity cache, simulated Instagram lookups
+    app.INSTAGRAM_LOOKUP = 'simulated'
+
+    recorded = load_fixture(args.fixture) if args.fixture else None
+    cases = []
+    for limit in args.limits:
+        fixture = recorded or make_fixture(limit)
+        for mode in args.modes:
+            case = run_case(fixture, mode, limit, args.latency_ms / 1000, args.page_size)
+            if not args.no_memory:
+                case['peak_memory_bytes'] = peak_memory(fixture, mode, limit, args.latency_ms / 1000, args.page_size)
+            cases.append(case)
+            print(f"{mode:<6} limit={limit:<4} businesses={case['businesses']:<4} {case['seconds']:>8.3f}s "
+                  f"driver_calls={case['driver_calls_total']:<5} "
+                  f"peak={case.get('peak_memory_bytes', 0) / 1024 / 1024:.1f}MB", file=sys.stderr)
+
+    report = {
+        'benchmark': 'scrape_replay',
+        'created': time.time(),
+        'python': platform.python_version(),
+        'fixture': args.fixture or 'generated',
+        'latency_ms': args.latency_ms,
+        'page_size': args.page_size,
+        'cases': cases
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# bench_startup.py - Cold import time and memory of the app module
+#
+#   python benchmarks/bench_startup.py [--runs 5] [--output results.json]
+#
+# Imports app in fresh interpreters, as a server worker would on boot, and
+# reports wall time and peak RSS per run. Each child also checks that the
+# import loaded no selenium modules and launched no browsers: Chrome starts
+# on the first scrape, or in the background when DRIVER_PREWARM is set.
+# Children run in an empty directory, which must still be empty after the
+# import: the SQLite stores create their database on first use.
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = '''
+import os, sys, time, json
+sys.path.insert(0, sys.argv[1])
+started = time.perf_counter()
+import app
+seconds = time.perf_counter() - started
+stats = app.analyzer.pool.status() if app.analyzer.pool else {'created': 0, 'live': 0}
+print(json.dumps({
+    'import_seconds': seconds,
+    'selenium_loaded': any(name == 'selenium' or name.startswith('selenium.') for name in sys.modules),
+    'drivers_created': stats['created'],
+    'drivers_live': stats['live'],
+    'files_created': sorted(os.listdir('.'))
+}))
+'''
+
+
+def run_once():
+    """Import app in a child interpreter; returns its report plus wall time and peak RSS"""
+    before = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as directory:
+        output = subprocess.run([sys.executable, '-c', CHILD, ROOT], cwd=directory, check=True, capture_output=True,
+                                text=True, env=dict(os.environ, DRIVER_PREWARM='0')).stdout
+    wall = time.perf_counter() - started
+    # ru_maxrss is the largest child so far (KiB on Linux), so it only reads correctly while it grows
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    report = json.loads(output.strip().splitlines()[-1])
+    report['wall_seconds'] = wall
+    report['peak_rss_mb'] = round(peak / 1024, 1) if peak >= before else None
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark cold start of the app module')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args(argv)
+
+    runs = [run_once() for _ in range(args.runs)]
+    for run in runs:
+        assert not run['selenium_loaded'], 'importing app loaded selenium'
+        assert run['drivers_created'] == 0 and run['drivers_live'] == 0, 'importing app started a browser'
+        assert not run['files_created'], f"importing app created {run['files_created']}"
+        print(f"import {run['import_seconds'] * 1000:7.1f}ms  process {run['wall_seconds'] * 1000:7.1f}ms  "
+              f"peak rss {run['peak_rss_mb']}MB", file=sys.stderr)
+
+    imports = sorted(run['import_seconds'] for run in runs)
+    report = {
+        'benchmark': 'startup',
+        'created': time.time(),
+        'runs': args.runs,
+        'median_import_ms': round(imports[len(imports) // 2] * 1000, 1),
+        'peak_rss_mb': max((run['peak_rss_mb'] or 0) for run in runs),
+        'cases': runs
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
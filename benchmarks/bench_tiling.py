@@ -0,0 +1,96 @@
+# bench_tiling.py - Coverage and throughput of tiled city searches over a replayed map
+#
+#   python benchmarks/bench_tiling.py [--places 1500] [--grids 1 2 3 4] [--workers 1 2 4]
+#                                     [--latency-ms 5] [--page-size 20] [--output results.json]
+#
+# Scatters --places businesses over a city-sized box and serves every search
+# through a ViewportReplayDriver, which, like Maps, returns at most 120
+# places for the viewport in the URL. Each grid x workers case reports how
+# many distinct places were found and how fast.
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app  # noqa: E402
+from batch import RateLimiter  # noqa: E402
+from tiling import TiledSearch  # noqa: E402
+from replay_driver import ViewportReplayDriver, make_city_fixture  # noqa: E402
+
+# Roughly the extent of Pune
+CITY_BOUNDS = (18.43, 73.74, 18.63, 73.98)
+
+
+def run_case(fixture, grid, workers, latency, page_size):
+    analyzer = app.BusinessAnalyzer(
+        driver_factory=lambda: ViewportReplayDriver(fixture, latency=latency, page_size=page_size),
+        pool_size=workers)
+    search = TiledSearch(app.make_tile_query(analyzer, 'Pune'), workers=workers, rate_limiter=RateLimiter(0),
+                         retries=0)
+    started = time.perf_counter()
+    try:
+        result = search.run('Pune', 'cafe', CITY_BOUNDS, rows=grid, cols=grid, limit=app.TILE_LIMIT)
+    finally:
+        analyzer.cleanup()
+    seconds = time.perf_counter() - started
+
+    cids = {business.get('cid') for business in result['businesses']}
+    scraped = sum(summary['count'] for summary in result['queries'])
+    return {
+        'grid': f'{grid}x{grid}',
+        'workers': workers,
+        'businesses': result['count'],
+        'coverage': round(len(cids & set(fixture['places'])) / len(fixture['places']), 3),
+        'duplicates_merged': scraped - result['count'],
+        'failed_tiles': sum(1 for summary in result['queries'] if summary['status'] != 'ok'),
+        'seconds': round(seconds, 3),
+        'businesses_per_second': round(scraped / seconds, 1) if seconds else None
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark tiled searches against a replayed city')
+    parser.add_argument('--places', type=int, default=1500)
+    parser.add_argument('--grids', type=int, nargs='+', default=[1, 2, 3, 4], help='Grid side lengths')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='Simulated WebDriver round-trip per call')
+    parser.add_argument('--page-size', type=int, default=20, help='Cards revealed per feed scroll')
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+    app.INSTAGRAM_LOOKUP = 'simulated'
+
+    fixture = make_city_fixture(args.places, CITY_BOUNDS)
+    cases = []
+    for grid in args.grids:
+        for workers in args.workers:
+            case = run_case(fixture, grid, workers, args.latency_ms / 1000, args.page_size)
+            cases.append(case)
+            print(f"grid={case['grid']:<4} workers={workers:<2} businesses={case['businesses']:<5} "
+                  f"coverage={case['coverage']:.0%} {case['seconds']:>7.2f}s "
+                  f"{case['businesses_per_second']:>7.1f}/s", file=sys.stderr)
+
+    report = {
+        'benchmark': 'tiling_replay',
+        'created': time.time(),
+        'places': args.places,
+        'latency_ms': args.latency_ms,
+        'page_size': args.page_size,
+        'cases': cases
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
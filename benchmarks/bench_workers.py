@@ -0,0 +1,139 @@
+# bench_workers.py - Supervised scrape workers under hangs, crashes and memory growth
+#
+#   python benchmarks/bench_workers.py [--scenarios steady hang crash balloon] [--jobs 12]
+#                                      [--workers 2] [--max-rss-mb 256] [--output results.json]
+#
+# Each scenario runs --jobs searches through app.ProcessScraper on worker
+# processes that replay a fixture instead of driving Chrome. Some searches
+# are made to misbehave inside the worker: 'hang' blocks forever like a stuck
+# driver.get, 'crash' exits the process and 'balloon' keeps 64 MiB per job.
+# Every search must still return (real or demo results). The report shows
+# the supervisor's kills, restarts and recycles and the web process's RSS.
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import resource
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app  # noqa: E402
+from workers import WorkerSupervisor  # noqa: E402
+from replay_driver import ReplayDriver, make_fixture  # noqa: E402
+
+BALLOON_BYTES = 64 * 2 ** 20
+
+# Which jobs misbehave in each scenario: job index -> keyword the fake worker acts on
+SCENARIOS = {
+    'steady': lambda index: 'cafe',
+    'hang': lambda index: 'hang' if index % 3 == 1 else 'cafe',
+    'crash': lambda index: 'crash' if index % 3 == 1 else 'cafe',
+    'balloon': lambda index: 'balloon'
+}
+
+
+class FaultyWorker(app.ScrapeWorker):
+    """ScrapeWorker on a replayed fixture that hangs, crashes or leaks when the keyword says so"""
+
+    def __init__(self):
+        fixture = make_fixture(30)
+        super().__init__(app.BusinessAnalyzer(driver_factory=lambda: ReplayDriver(fixture, page_size=20),
+                                              pool_size=1))
+        self.ballast = []
+
+    def run(self, task, emit, cancel_event):
+        keyword = task['search']['keyword']
+        if keyword == 'hang':
+            time.sleep(3600)
+        elif keyword == 'crash':
+            os._exit(3)
+        elif keyword == 'balloon':
+            self.ballast.append(b'x' * BALLOON_BYTES)
+        super().run(task, emit, cancel_event)
+
+
+def run_scenario(name, jobs, workers, max_rss, budget):
+    supervisor = WorkerSupervisor(FaultyWorker, size=workers, max_rss=max_rss, max_jobs=50, check_interval=0.25,
+                                  stop_grace=5)
+    scraper = app.ProcessScraper(supervisor)
+    pick = SCENARIOS[name]
+    peak_worker_rss = 0
+
+    def search(index):
+        ctx = app.ScrapeContext(budget=budget)
+        started = time.perf_counter()
+        businesses = scraper.scrape_google_maps_businesses('Pune', pick(index), 10, ctx=ctx)
+        return {'businesses': len(businesses), 'demo_data': ctx.demo_data, 'seconds': time.perf_counter() - started}
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(search, index) for index in range(jobs)]
+            while not all(future.done() for future in futures):
+                for worker in supervisor.status()['workers']:
+                    peak_worker_rss = max(peak_worker_rss, worker['rss_mb'] or 0)
+                time.sleep(0.1)
+            results = [future.result() for future in futures]
+    finally:
+        scraper.cleanup()
+    seconds = time.perf_counter() - started
+
+    status = supervisor.status()
+    return {
+        'scenario': name,
+        'jobs': jobs,
+        'answered': sum(1 for result in results if result['businesses']),
+        'demo_fallbacks': sum(1 for result in results if result['demo_data']),
+        'seconds': round(seconds, 2),
+        'slowest_job_seconds': round(max(result['seconds'] for result in results), 2),
+        'peak_worker_rss_mb': peak_worker_rss,
+        'web_process_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'supervisor': {key: value for key, value in status.items() if key != 'workers'}
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark supervised scrape workers with injected faults')
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--jobs', type=int, default=12)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--max-rss-mb', type=float, default=256)
+    parser.add_argument('--budget', type=float, default=3.0, help='Scrape budget; hung jobs die 1s after it')
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+    app.INSTAGRAM_LOOKUP = 'simulated'
+    app.WORKER_KILL_GRACE = 1.0
+
+    cases = []
+    for name in args.scenarios:
+        case = run_scenario(name, args.jobs, args.workers, args.max_rss_mb * 2 ** 20, args.budget)
+        cases.append(case)
+        stats = case['supervisor']
+        print(f"{name:<8} answered {case['answered']}/{case['jobs']}  demo {case['demo_fallbacks']:<2} "
+              f"{case['seconds']:6.2f}s  started {stats['started']:<2} killed {stats['killed_timeout']}+"
+              f"{stats['killed_rss']}  crashed {stats['crashed']}  recycled {stats['recycled_rss']}  "
+              f"peak worker {case['peak_worker_rss_mb']:.0f} MiB", file=sys.stderr)
+
+    report = {
+        'benchmark': 'scrape_workers',
+        'created': time.time(),
+        'workers': args.workers,
+        'max_rss_mb': args.max_rss_mb,
+        'cases': cases
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
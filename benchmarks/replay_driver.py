@@ -0,0 +1,442 @@
+# replay_driver.py - Offline stand-in for a Chrome WebDriver that replays saved Maps pages
+#
+# A fixture is a results page plus one detail panel per place id:
+#
+#   <dir>/results.html
+#   <dir>/details/<cid>.html
+#
+# record_fixture() saves one from a live search; make_fixture() generates one
+# with the same markup for any number of results.
+import os
+import re
+import math
+import time
+import random
+import fnmatch
+from collections import Counter
+
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from tiling import viewport_bounds
+from app import (DETAIL_EXTRACTION_SCRIPT, LISTING_CID_SCRIPT, FEED_SCROLL_SCRIPT, FEED_STATE_SCRIPT,
+                 FEED_CARD_ELEMENT_SCRIPT, FEED_CARD_SELECTOR, FEED_END_SELECTOR, TRANSFER_SIZE_SCRIPT, extract_cid)
+
+
+def load_fixture(directory):
+    with open(os.path.join(directory, 'results.html'), encoding='utf-8') as f:
+        results = f.read()
+    details = {}
+    details_dir = os.path.join(directory, 'details')
+    for filename in os.listdir(details_dir):
+        if filename.endswith('.html'):
+            with open(os.path.join(details_dir, filename), encoding='utf-8') as f:
+                details[filename[:-5]] = f.read()
+    return {'results': results, 'details': details}
+
+
+def save_fixture(fixture, directory):
+    os.makedirs(os.path.join(directory, 'details'), exist_ok=True)
+    with open(os.path.join(directory, 'results.html'), 'w', encoding='utf-8') as f:
+        f.write(fixture['results'])
+    for cid, html in fixture['details'].items():
+        with open(os.path.join(directory, 'details', f'{cid}.html'), 'w', encoding='utf-8') as f:
+            f.write(html)
+
+
+def record_fixture(driver, url, directory, limit=50, settle=2.0):
+    """Save a live results page and the detail panel of its first ``limit`` cards"""
+    driver.get(url)
+    time.sleep(settle)
+    fixture = {'results': driver.page_source, 'details': {}}
+    for element in driver.find_elements(By.CSS_SELECTOR, FEED_CARD_SELECTOR)[:limit]:
+        cid = element.get_attribute('data-cid') or extract_cid(element.get_attribute('href'))
+        if not cid:
+            continue
+        driver.execute_script("arguments[0].click();", element)
+        time.sleep(settle)
+        panel = driver.find_element(By.CSS_SELECTOR, '[role="main"]')
+        fixture['details'][cid] = panel.get_attribute('outerHTML')
+    save_fixture(fixture, directory)
+    return fixture
+
+
+WORDS = ['Blue', 'Tokai', 'Roasters', 'Corner', 'House', 'Third', 'Wave', 'Kitchen', 'Garden', 'Brew',
+         'Royal', 'Golden', 'Urban', 'Spice', 'Leaf', 'Mill', 'Bean', 'Table', 'Street', 'Studio']
+
+
+def make_places(count, seed=15, missing_phone=0.2, missing_website=0.3, start=0):
+    """``count`` generated places, as dicts of what their card and detail panel show"""
+    rng = random.Random(seed)
+    places = []
+    for i in range(start, start + count):
+        name = f"{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.choice(WORDS)} {i + 1}"
+        cid = str(10 ** 17 + rng.randrange(10 ** 17))
+        phone = f"+91 20 {rng.randint(1000, 9999)} {rng.randint(1000, 9999)}"
+        website = f"https://{name.lower().replace(' ', '-')}.example.com/" if rng.random() > missing_website else None
+        rating = f"{rng.uniform(3.5, 5):.1f}"
+        filler = ''.join(f'<span class="W4Efsd" aria-hidden="true">{rng.choice(WORDS)} · Open ⋅ Closes 11 pm</span>'
+                         for _ in range(rng.randint(3, 8)))
+        reviews = rng.randint(5, 3000)
+        places.append({'name': name, 'cid': cid, 'phone': phone, 'website': website, 'rating': rating,
+                       'reviews': reviews, 'filler': filler, 'card_phone': rng.random() >= missing_phone})
+    return places
+
+
+def render_fixture(places):
+    """Results page and detail panels showing ``places`` in order"""
+    cards = []
+    details = {}
+    for i, place in enumerate(places):
+        name, cid, phone, website = place['name'], place['cid'], place['phone'], place['website']
+        href = f"https://www.google.com/maps/place/{name.replace(' ', '+')}/data=!4m7!3m6!1s0x3bc2c0:{int(cid):#x}!8m2"
+        cards.append(
+            f'<div class="Nv2PK tH5CWc ENn4tc" role="article" jsaction="mouseover:pane.wfvdle{i}">'
+            f'<a class="hfpxzc" aria-label="{name}" href="{href}" jsaction="pane.wfvdle{i}"></a>'
+            f'<div class="bfdHYd"><div class="qBF1Pd fontHeadlineSmall">{name}</div>'
+            f'<span class="MW4etd">{place["rating"]}</span><span class="UY7F9">({place["reviews"]})</span>'
+            f'{place["filler"]}'
+            + (f'<span class="UsdlK">{phone}</span>' if place['card_phone'] else '')
+            + (f'<a class="lcr4fd" data-value="Website" href="{website}"></a>' if website else '')
+            + '</div></div>')
+        details[cid] = (
+            f'<div role="main" class="m6QErb" aria-label="{name}">'
+            f'<h1 class="DUwDvf lfPIob">{name}</h1><div class="F7nice"><span>{place["rating"]}</span></div>'
+            + (f'<a data-item-id="authority" href="{website}"><div class="Io6YTe">{website[8:-1]}</div></a>' if website else '')
+            + f'<button data-item-id="phone:tel:{phone.replace(" ", "")}" aria-label="Phone: {phone}">'
+            f'<div class="Io6YTe">{phone}</div></button>{place["filler"]}</div>')
+
+    results = ('<html><head><title>Google Maps</title></head><body><h1>Results</h1>'
+               f'<div role="feed">{"".join(cards)}</div></body></html>')
+    return {'results': results, 'details': details}
+
+
+def make_fixture(count, seed=15, missing_phone=0.2, missing_website=0.3):
+    """Maps-like results page with ``count`` cards and a detail panel for each
+
+    ``missing_phone`` of the cards omit their phone so bulk extraction has to
+    open their detail panel, as it does on live pages.
+    """
+    return render_fixture(make_places(count, seed, missing_phone, missing_website))
+
+
+def churn_places(places, changed=0.05, removed=0.02, added=0.03, seed=24):
+    """A later snapshot of ``places``: some re-rated with a new phone, some gone, some new
+
+    Returns (places, truth) where truth holds the cids that were added,
+    changed and removed.
+    """
+    rng = random.Random(seed)
+    count = len(places)
+    gone = set(rng.sample(range(count), int(count * removed)))
+    kept = [dict(place) for i, place in enumerate(places) if i not in gone]
+    truth = {'removed': {places[i]['cid'] for i in gone}, 'changed': set(), 'added': set()}
+
+    for place in rng.sample(kept, int(count * changed)):
+        place['rating'] = f"{float(place['rating']) - 0.1:.1f}"
+        place['reviews'] += rng.randint(1, 20)
+        place['phone'] = f"+91 20 {rng.randint(1000, 9999)} {rng.randint(1000, 9999)}"
+        truth['changed'].add(place['cid'])
+
+    for place in make_places(int(count * added), seed=seed + 1, start=count):
+        kept.insert(rng.randint(0, len(kept)), place)
+        truth['added'].add(place['cid'])
+    return kept, truth
+
+
+# Requests a Maps search page makes besides its document: (kind, count, typical size in bytes, path).
+# Sizes are rough medians from DevTools captures of a desktop results page.
+PAGE_RESOURCES = [
+    ('script', 12, 180_000, '/maps/_/js/k=maps.m.en.{i}.js'),
+    ('stylesheet', 3, 40_000, '/maps/_/ss/k=maps.m.{i}.css'),
+    ('font', 6, 25_000, '/fonts.gstatic.com/s/roboto/v{i}.woff2'),
+    ('tile', 60, 18_000, '/maps/vt?pb=!1m5!1m4!1i14!2i{i}!3i7!4i256'),
+    ('image', 40, 30_000, '/lh5.googleusercontent.com/p/photo{i}=w80-h106-k-no'),
+    ('icon', 15, 2_000, '/maps/res/icons/marker{i}.png'),
+    ('media', 1, 400_000, '/maps/res/intro{i}.mp4'),
+    ('analytics', 2, 90_000, '/www.googletagmanager.com/gtag/js{i}'),
+    ('ping', 12, 500, '/gen_204?atyp=i&ei={i}'),
+    ('xhr', 2, 150_000, '/search?tbm=map&pb={i}')
+]
+# Resources the browser must fetch before DOMContentLoaded
+RENDER_BLOCKING = ('script', 'stylesheet')
+
+
+def make_page_resources(scale=1.0):
+    """Subresource manifest of a results page, as [{'kind', 'url', 'bytes'}]"""
+    return [{'kind': kind, 'url': path.format(i=i), 'bytes': int(size * scale)}
+            for kind, count, size, path in PAGE_RESOURCES for i in range(count)]
+
+
+def is_blocked(url, patterns):
+    """Whether Network.setBlockedURLs ``patterns`` ('*' wildcards) cancel a request to ``url``"""
+    return any(fnmatch.fnmatchcase(url, pattern) for pattern in patterns)
+
+
+class ReplayElement:
+    """WebElement over a BeautifulSoup tag"""
+
+    def __init__(self, driver, tag):
+        self.driver = driver
+        self.tag = tag
+
+    def __eq__(self, other):
+        # Like WebElement, equal when both refer to the same DOM node
+        return isinstance(other, ReplayElement) and other.tag is self.tag
+
+    def __hash__(self):
+        return id(self.tag)
+
+    @property
+    def text(self):
+        return self.tag.get_text('\n', strip=True)
+
+    @property
+    def tag_name(self):
+        return self.tag.name
+
+    def get_attribute(self, name):
+        value = self.tag.get(name)
+        return ' '.join(value) if isinstance(value, list) else value
+
+    def is_displayed(self):
+        return True
+
+    def click(self):
+        self.driver.calls['click'] += 1
+        self.driver.open_detail(self.tag)
+
+
+class ReplayDriver:
+    """Serves a fixture through the WebDriver calls BusinessAnalyzer makes, counting each one
+
+    ``latency`` seconds are slept per call to model the WebDriver round-trip.
+    With ``page_size`` the feed starts with that many cards and each scroll
+    reveals the next page, like the live infinite-scroll feed; the end marker
+    appears once every card is shown.
+
+    When the fixture lists page ``resources`` (make_page_resources), each
+    navigation downloads the ones not blocked through execute_cdp_cmd at
+    ``bandwidth`` bytes per second: all of them before get() returns with the
+    'normal' page load strategy, only the render-blocking ones with 'eager'.
+    """
+
+    def __init__(self, fixture, latency=0.0, page_size=None, page_load_strategy='normal', bandwidth=None):
+        self.fixture = fixture
+        self.latency = latency
+        self.page_size = page_size
+        self.page_load_strategy = page_load_strategy
+        self.bandwidth = bandwidth
+        self.blocked_urls = []
+        self._transferred = None
+        self.calls = Counter()
+        self.current_url = 'about:blank'
+        self.title = 'Google Maps'
+        self._load_results()
+        self._detail = None
+        self._detail_cid = None
+
+    def results_for(self, url):
+        """Results page served for a navigation to ``url``"""
+        return self.fixture['results']
+
+    def _load_results(self):
+        self._results = BeautifulSoup(self.results_for(self.current_url), 'lxml')
+        # Matches are computed once per selector, then extended as cards are revealed
+        self._results_matches = {}
+        self._feed = self._results.select_one('div[role="feed"]')
+        self._hidden = []
+        if self._feed is not None and self.page_size:
+            cards = [child for child in self._feed.find_all(recursive=False) if child.select_one(FEED_CARD_SELECTOR)]
+            self._hidden = [card.extract() for card in cards[self.page_size:]]
+        self._reveal(0)
+
+    def _reveal(self, count):
+        """Append the next ``count`` hidden cards to the feed, extending the cached matches"""
+        for card in self._hidden[:count]:
+            self._feed.append(card)
+            for selector, tags in self._results_matches.items():
+                if card.css.match(selector):
+                    tags.append(card)
+                tags.extend(card.select(selector))
+        del self._hidden[:count]
+        if self._feed is not None and not self._hidden and not self._results.select_one(FEED_END_SELECTOR):
+            end = self._results.new_tag('span', attrs={'class': 'HlvSq'})
+            end.string = "You've reached the end of the list."
+            self._feed.append(end)
+            self._results_matches = {}
+        self._source = None
+
+    def _call(self, name):
+        self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _select(self, selector):
+        if selector not in self._results_matches:
+            self._results_matches[selector] = self._results.select(selector)
+        tags = list(self._results_matches[selector])
+        if self._detail is not None:
+            tags += self._detail.select(selector)
+        return tags
+
+    def open_detail(self, tag):
+        link = tag if tag.name == 'a' and tag.get('href') else tag.select_one('a.hfpxzc, a[data-cid]')
+        cid = link and (link.get('data-cid') or extract_cid(link.get('href')))
+        if cid in self.fixture['details'] and cid != self._detail_cid:
+            self._detail = BeautifulSoup(self.fixture['details'][cid], 'lxml')
+            self._detail_cid = cid
+            # Like Maps, the URL switches to the opened place
+            self.current_url = link.get('href') or self.current_url
+
+    def get(self, url):
+        self._call('get')
+        self.current_url = url
+        self._load_results()
+        self._detail = None
+        self._detail_cid = None
+        self._load_resources()
+
+    def _load_resources(self):
+        resources = self.fixture.get('resources')
+        if resources is None:
+            return
+        loaded = [resource for resource in resources if not is_blocked(resource['url'], self.blocked_urls)]
+        document = len(self.fixture['results'].encode('utf-8'))
+        self._transferred = document + sum(resource['bytes'] for resource in loaded)
+        if self.bandwidth:
+            if self.page_load_strategy == 'eager':
+                loaded = [resource for resource in loaded if resource['kind'] in RENDER_BLOCKING]
+            time.sleep((document + sum(resource['bytes'] for resource in loaded)) / self.bandwidth)
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        self._call('execute_cdp_cmd')
+        if cmd == 'Network.setBlockedURLs':
+            self.blocked_urls = list(cmd_args['urls'])
+        return {}
+
+    @property
+    def page_source(self):
+        self._call('page_source')
+        if self._source is None:
+            self._source = str(self._results)
+        detail = self.fixture['details'][self._detail_cid] if self._detail_cid else ''
+        return self._source.replace('</body>', f'{detail}</body>')
+
+    def find_elements(self, by, value):
+        self._call('find_elements')
+        selector = value if by == By.CSS_SELECTOR else value.lower() if by == By.TAG_NAME else None
+        if selector is None:
+            raise NotImplementedError(f"ReplayDriver does not support locating by {by}")
+        return [ReplayElement(self, tag) for tag in self._select(selector)]
+
+    def find_element(self, by, value):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"No element matches {value}")
+        return elements[0]
+
+    def execute_script(self, script, *args):
+        self._call('execute_script')
+        if script == DETAIL_EXTRACTION_SCRIPT:
+            return self._detail_extraction(args[0])
+        if script == LISTING_CID_SCRIPT:
+            links = []
+            for element in args[0]:
+                tag = element.tag
+                link = tag if tag.name == 'a' else tag.select_one('a.hfpxzc, a[data-cid]')
+                links.append(link and (link.get('data-cid') or link.get('href')))
+            return links
+        if script == FEED_SCROLL_SCRIPT:
+            return self._scroll_feed(*args)
+        if script == FEED_STATE_SCRIPT:
+            count = len(self._feed.select(args[0])) if self._feed is not None else 0
+            return [count, self._results.select_one(args[1]) is not None]
+        if script == TRANSFER_SIZE_SCRIPT:
+            return self._transferred
+        if script == FEED_CARD_ELEMENT_SCRIPT:
+            tags = self._select(args[0])
+            return ReplayElement(self, tags[args[1]]) if args[1] < len(tags) else None
+        if script.startswith('arguments[0].click()'):
+            args[0].driver.open_detail(args[0].tag)
+        return None
+
+    def _scroll_feed(self, selector, start, end_selector, with_html):
+        if self._feed is None:
+            return None
+        anchors = self._feed.select(selector)
+        indexes = {id(tag): index for index, tag in enumerate(self._results.select(selector))}
+        cards = []
+        for anchor in anchors[start:]:
+            card = anchor.find_parent('div', class_='Nv2PK') or anchor.parent
+            cards.append([indexes[id(anchor)], str(card) if with_html else None])
+        page = {'cards': cards, 'count': len(anchors), 'end': self._results.select_one(end_selector) is not None}
+        self._reveal(self.page_size or 0)
+        return page
+
+    def _detail_extraction(self, selectors):
+        def text(tag):
+            return tag.get_text('\n', strip=True)
+
+        def collect(selector_list, read):
+            return [[read(tag) for tag in self._select(selector) if not tag.find_parent('div', role='feed')]
+                    for selector in selector_list]
+
+        panel = self._detail.select_one('[role="main"], .siAUzd, .m6QErb') if self._detail is not None else None
+        return {
+            'h1': [text(tag) for tag in self._select('h1')],
+            'name': collect(selectors['name'], text),
+            'phone': collect(selectors['phone'], lambda tag: [text(tag), tag.get('aria-label'), tag.get('data-value')]),
+            'website': collect(selectors['website'], lambda tag: [tag.get('href'), text(tag), tag.get('data-value')]),
+            'panel': text(panel) if panel else None
+        }
+
+    def quit(self):
+        self._call('quit')
+
+
+def make_city_fixture(count, bounds, seed=19, **kwargs):
+    """make_fixture() whose places are scattered over (south, west, north, east)"""
+    fixture = make_fixture(count, seed=seed, **kwargs)
+    rng = random.Random(seed)
+    south, west, north, east = bounds
+    fixture['places'] = {cid: (rng.uniform(south, north), rng.uniform(west, east)) for cid in fixture['details']}
+    return fixture
+
+
+VIEWPORT_URL = re.compile(r'/@(-?[\d.]+),(-?[\d.]+),([\d.]+)z')
+
+
+class ViewportReplayDriver(ReplayDriver):
+    """ReplayDriver over a make_city_fixture() that answers each search like Maps does for its viewport
+
+    A viewport URL (``/@lat,lng,zoomz``) lists only the places on screen,
+    nearest the centre first; any search returns at most ``cap`` of them.
+    """
+
+    def __init__(self, fixture, cap=120, **kwargs):
+        self.cap = cap
+        soup = BeautifulSoup(fixture['results'], 'lxml')
+        feed = soup.select_one('div[role="feed"]')
+        self._cards = {}
+        for card in feed.find_all(recursive=False):
+            anchor = card.select_one(FEED_CARD_SELECTOR)
+            cid = anchor and (anchor.get('data-cid') or extract_cid(anchor.get('href')))
+            if cid:
+                self._cards[cid] = str(card)
+        feed.clear()
+        self._page = str(soup)
+        super().__init__(fixture, **kwargs)
+
+    def results_for(self, url):
+        match = VIEWPORT_URL.search(url or '')
+        places = self.fixture['places']
+        cids = list(self._cards)
+        if match:
+            lat, lng, zoom = (float(value) for value in match.groups())
+            south, west, north, east = viewport_bounds(lat, lng, zoom)
+            cids = [cid for cid in cids if south <= places[cid][0] <= north and west <= places[cid][1] <= east]
+            cids.sort(key=lambda cid: math.hypot(places[cid][0] - lat, places[cid][1] - lng))
+        cards = ''.join(self._cards[cid] for cid in cids[:self.cap])
+        return self._page.replace('<div role="feed"></div>', f'<div role="feed">{cards}</div>')
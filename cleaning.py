@@ -0,0 +1,286 @@
+# cleaning.py - Normalize contact fields and merge duplicate businesses across result sets
+import gc
+import os
+import re
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Calling code and national number length assumed for phones written without one
+DEFAULT_CALLING_CODE = os.environ.get('PHONE_COUNTRY_CODE', '91')
+NATIONAL_NUMBER_LENGTH = int(os.environ.get('PHONE_NATIONAL_LENGTH', 10))
+# E.164 numbers have at most 15 digits; shorter than 8 is not a dialable business number
+MIN_PHONE_DIGITS = 8
+MAX_PHONE_DIGITS = 15
+
+# Placeholders the scraper writes for fields it could not find
+MISSING_VALUES = ('', 'Not found', 'Unknown Business')
+# Below this many businesses clean_businesses uses the per-row path, which is faster there
+CLEAN_VECTORIZE_MIN_ROWS = int(os.environ.get('CLEAN_VECTORIZE_MIN_ROWS', 50000))
+
+# scheme, host (without www.), path and query of a website; the fragment is dropped
+# Both are written in the subset of syntax shared by Python's re and RE2, which pyarrow uses
+WEBSITE_PATTERN = (r'^(?:(?P<scheme>[A-Za-z][A-Za-z0-9+.-]*)://)?(?:[Ww]{3}\d{0,3}\.)?'
+                   r'(?P<host>[^/?#\s]+\.[^/?#\s]+)(?P<path>[^?#\s]*)(?P<query>\?[^#\s]*)?')
+# Handle from '@name', 'name' or an instagram.com profile URL
+INSTAGRAM_PATTERN = (r'^(?:(?:https?://)?(?:www\.)?(?:instagram\.com|instagr\.am)/)?@?(?P<handle>[A-Za-z0-9._]{1,30})/?'
+                     r'(?:[?#]\S*)?$')
+
+WEBSITE_RE = re.compile(WEBSITE_PATTERN)
+INSTAGRAM_RE = re.compile(INSTAGRAM_PATTERN)
+NON_DIGITS_RE = re.compile(r'\D')
+
+
+def is_missing(value):
+    return value is None or value != value or str(value).strip() in MISSING_VALUES
+
+
+def normalize_phone(phone, calling_code=DEFAULT_CALLING_CODE):
+    """E.164 form of a scraped phone ('098765 43210' -> '+919876543210'), or None"""
+    if is_missing(phone):
+        return None
+    text = str(phone).strip()
+    digits = NON_DIGITS_RE.sub('', text)
+    if text.startswith('+'):
+        number = digits
+    elif digits.startswith('00'):
+        number = digits[2:]
+    elif len(digits) == NATIONAL_NUMBER_LENGTH:
+        number = calling_code + digits
+    elif len(digits) == NATIONAL_NUMBER_LENGTH + 1 and digits.startswith('0'):
+        number = calling_code + digits[1:]
+    elif len(digits) == NATIONAL_NUMBER_LENGTH + len(calling_code) and digits.startswith(calling_code):
+        number = digits
+    else:
+        return None
+    return '+' + number if MIN_PHONE_DIGITS <= len(number) <= MAX_PHONE_DIGITS else None
+
+
+def canonical_website(url):
+    """(url, key) for a website: lower-case scheme and host, no www. or trailing slash
+
+    The key drops the scheme too, so http and https forms of a site match.
+    Returns (None, None) for values that are not URLs.
+    """
+    if is_missing(url):
+        return None, None
+    match = WEBSITE_RE.match(str(url).strip())
+    if not match:
+        return None, None
+    scheme, host, path, query = match.group('scheme', 'host', 'path', 'query')
+    key = host.lower() + path.rstrip('/') + (query or '')
+    return f"{(scheme or 'http').lower()}://{key}", key
+
+
+def clean_instagram_handle(handle):
+    """'@name' from a handle or profile URL, or None"""
+    if is_missing(handle):
+        return None
+    match = INSTAGRAM_RE.match(str(handle).strip())
+    return '@' + match.group('handle').lower() if match else None
+
+
+def normalize_business(business, calling_code=DEFAULT_CALLING_CODE):
+    """Copy of ``business`` with normalized phone, website and Instagram handle"""
+    cleaned = dict(business)
+    cleaned['phone'] = normalize_phone(business.get('phone'), calling_code) or 'Not found'
+    cleaned['website'] = canonical_website(business.get('website'))[0] or 'Not found'
+    cleaned['instagram_handle'] = clean_instagram_handle(business.get('instagram_handle')) or 'Not found'
+    return cleaned
+
+
+def dedupe_businesses(businesses):
+    """Merge normalized businesses sharing a place id, phone or website, keeping first-seen order
+
+    Matches are transitive. Each field of a merged business is the first
+    non-missing value among its duplicates; ``sources`` lists are combined,
+    and left out when none of the duplicates had one.
+    """
+    parent = list(range(len(businesses)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    seen = {}
+    for i, business in enumerate(businesses):
+        keys = (('cid', business.get('cid')), ('phone', business.get('phone')),
+                ('website', canonical_website(business.get('website'))[1]))
+        for key in keys:
+            if is_missing(key[1]):
+                continue
+            if key in seen:
+                a, b = find(seen[key]), find(i)
+                if a != b:
+                    parent[max(a, b)] = min(a, b)
+            else:
+                seen[key] = i
+    return merge_groups(businesses, [find(i) for i in range(len(businesses))])
+
+
+def merge_groups(businesses, labels):
+    """Merge businesses by group label, where each label is the index of the group's first row
+
+    Each group's first dict is updated in place and returned, so callers pass copies.
+    """
+    merged = {}
+    for business, root in zip(businesses, labels):
+        if root not in merged:
+            merged[root] = business
+            if 'sources' in business:
+                if isinstance(business['sources'], list):
+                    business['sources'] = list(business['sources'])
+                else:
+                    del business['sources']
+            continue
+        target = merged[root]
+        for field, value in business.items():
+            if field == 'sources':
+                if isinstance(value, list):
+                    sources = target.setdefault('sources', [])
+                    sources.extend(source for source in value if source not in sources)
+            elif is_missing(target.get(field)) and not is_missing(value):
+                target[field] = value
+    return list(merged.values())
+
+
+def clean_rows(businesses, calling_code=DEFAULT_CALLING_CODE):
+    """Per-row normalize and dedupe; the reference for clean_businesses' pandas path"""
+    return dedupe_businesses([normalize_business(business, calling_code) for business in businesses])
+
+
+def string_dtype():
+    """pyarrow strings when installed, so .str methods (extract included) run in Arrow compute"""
+    import pandas as pd
+    try:
+        import pyarrow as pa
+        return pd.ArrowDtype(pa.string())
+    except ImportError:
+        return 'string'
+
+
+def normalize_frame(frame, calling_code=DEFAULT_CALLING_CODE):
+    """normalize_business over a DataFrame of businesses with vectorized string operations
+
+    Adds a ``_website_key`` column used by group_labels.
+    """
+    import pandas as pd
+
+    dtype = string_dtype()
+    frame = frame.copy()
+    for field in ('phone', 'website', 'instagram_handle'):
+        if field not in frame:
+            frame[field] = None
+
+    def strings(field):
+        values = frame[field].astype(dtype).str.strip()
+        return values.mask(values.isin(MISSING_VALUES))
+
+    phone = strings('phone')
+    digits = phone.str.replace(r'\D', '', regex=True)
+    length = digits.str.len()
+    national = NATIONAL_NUMBER_LENGTH
+    # Same cases, in the same order, as normalize_phone: the first that applies wins
+    cases = [
+        (phone.str.startswith('+'), digits),
+        (digits.str.startswith('00'), digits.str.slice(2)),
+        (length == national, calling_code + digits),
+        ((length == national + 1) & digits.str.startswith('0'), calling_code + digits.str.slice(1)),
+        ((length == national + len(calling_code)) & digits.str.startswith(calling_code), digits)
+    ]
+    number = pd.Series(pd.NA, index=frame.index, dtype=dtype)
+    for applies, value in reversed(cases):
+        number = value.where(applies.fillna(False).astype(bool), number)
+    valid = number.str.len().between(MIN_PHONE_DIGITS, MAX_PHONE_DIGITS).fillna(False).astype(bool)
+    frame['phone'] = ('+' + number).where(valid)
+
+    # Optional groups that did not match are '' with pyarrow and NA without
+    parts = strings('website').str.extract(WEBSITE_PATTERN)
+    key = parts['host'].str.lower() + parts['path'].str.rstrip('/') + parts['query'].fillna('')
+    scheme = parts['scheme'].str.lower()
+    scheme = scheme.where((scheme.str.len() > 0).fillna(False).astype(bool), 'http')
+    frame['website'] = scheme + '://' + key
+    frame['_website_key'] = key
+
+    handle = strings('instagram_handle').str.extract(INSTAGRAM_PATTERN)['handle']
+    frame['instagram_handle'] = '@' + handle.str.lower()
+    return frame
+
+
+def group_labels(frame):
+    """Index of each row's group's first row, for a normalized DataFrame with a default index
+
+    Groups are the same as dedupe_businesses finds, with labels propagated by
+    group minimums instead of a union-find.
+    """
+    import numpy as np
+    import pandas as pd
+
+    keys = []
+    for field in ('cid', 'phone', '_website_key'):
+        if field in frame:
+            values = frame[field].astype(string_dtype())
+            codes, uniques = pd.factorize(values.mask(values.isin(MISSING_VALUES)))
+            present = codes >= 0
+            keys.append((codes[present], len(uniques), present))
+
+    # Every row starts as its own group; rows sharing a key take the smallest
+    # label among them until no label changes, which links chains of matches
+    labels = np.arange(len(frame))
+    while True:
+        previous = labels.copy()
+        for codes, count, present in keys:
+            smallest = np.full(count, len(labels))
+            np.minimum.at(smallest, codes, labels[present])
+            labels[present] = smallest[codes]
+            labels = labels[labels]
+        if np.array_equal(labels, previous):
+            break
+    return labels
+
+
+@contextmanager
+def gc_paused():
+    """Hold off the cyclic garbage collector while building many acyclic objects
+
+    Every allocation of a million-row pass would otherwise count towards
+    collections that traverse all the dicts built so far and free nothing.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def clean_businesses(businesses, calling_code=DEFAULT_CALLING_CODE):
+    """clean_rows with the normalizing and matching vectorized, when pandas is installed
+
+    Lists shorter than CLEAN_VECTORIZE_MIN_ROWS are cleaned row by row, which
+    is faster than building the DataFrame for them.
+    """
+    if len(businesses) < CLEAN_VECTORIZE_MIN_ROWS:
+        return clean_rows(businesses, calling_code)
+    try:
+        import pandas as pd
+    except ImportError:
+        logger.warning("pandas is not installed, cleaning businesses row by row")
+        return clean_rows(businesses, calling_code)
+
+    # Only the matched fields go through pandas; the rest of each dict is copied as is
+    fields = ('cid', 'phone', 'website', 'instagram_handle')
+    with gc_paused():
+        frame = pd.DataFrame({field: [business.get(field) for business in businesses] for field in fields},
+                             dtype=object)
+        frame = normalize_frame(frame, calling_code)
+        labels = group_labels(frame).tolist()
+        columns = [frame[field].to_numpy(dtype=object, na_value=None).tolist() for field in fields[1:]]
+        normalized = [dict(business, phone=phone or 'Not found', website=website or 'Not found',
+                           instagram_handle=handle or 'Not found')
+                      for business, phone, website, handle in zip(businesses, *columns)]
+        return merge_groups(normalized, labels)
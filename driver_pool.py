@@ -0,0 +1,240 @@
+# driver_pool.py - Bounded pool of WebDriver sessions shared across request threads
+import threading
+import time
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class DriverUnavailable(Exception):
+    """Raised when the pool cannot hand out a driver"""
+
+
+class WebDriverPool:
+    """Thread-safe checkout/checkin pool of browser sessions
+
+    Drivers are created lazily by ``driver_factory`` (a callable returning a
+    WebDriver or None), health-checked on checkout via ``driver.title`` and
+    recycled after ``max_pages`` page loads or when a caller reports a crash.
+    After a failed launch, checkouts that would start a browser fail fast for
+    ``launch_backoff`` seconds instead of paying for another launch attempt.
+    """
+
+    def __init__(self, driver_factory, size=2, max_pages=50, checkout_timeout=120, launch_backoff=30):
+        self.driver_factory = driver_factory
+        self.size = max(1, int(size))
+        self.max_pages = max(1, int(max_pages))
+        self.checkout_timeout = checkout_timeout
+        self.launch_backoff = launch_backoff
+
+        self._cond = threading.Condition()
+        self._idle = []  # LIFO stack of idle drivers, warmest first
+        self._pages = {}  # id(driver) -> page loads served
+        self._checked_out = set()  # id(driver) of drivers currently lent out
+        self._created = 0  # live drivers, idle + checked out
+        self._closed = False
+        self._launch_retry_at = 0  # monotonic time before which no launch is attempted
+        self.last_launch_error = None  # why the latest launch failed; None once one succeeds
+
+        self.stats = {
+            'created': 0,
+            'recycled': 0,
+            'crashed': 0,
+            'health_failures': 0,
+            'factory_failures': 0,
+            'launch_backoffs': 0,
+            'checkouts': 0,
+            'rejected_checkins': 0,
+            'waits': 0
+        }
+
+    def _create_driver(self):
+        """Call the factory outside the lock; returns None on failure"""
+        error = "Driver factory returned no driver"
+        try:
+            driver = self.driver_factory()
+        except Exception as e:
+            logger.error(f"Driver factory failed: {e}")
+            driver = None
+            error = f"Driver factory failed: {e}"
+
+        with self._cond:
+            if driver is None:
+                self._created -= 1
+                self.stats['factory_failures'] += 1
+                self._launch_retry_at = time.monotonic() + self.launch_backoff
+                self.last_launch_error = error
+                self._cond.notify()
+            else:
+                self._pages[id(driver)] = 0
+                self.stats['created'] += 1
+                self._launch_retry_at = 0
+                self.last_launch_error = None
+        return driver
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"Error quitting pooled driver: {e}")
+
+    def _is_healthy(self, driver):
+        try:
+            driver.title
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled driver failed health check: {e}")
+            return False
+
+    def _discard(self, driver):
+        """Forget a driver and free its slot (caller holds no lock)"""
+        with self._cond:
+            self._pages.pop(id(driver), None)
+            self._created -= 1
+            self._cond.notify()
+        self._quit(driver)
+
+    def checkout(self, timeout=None):
+        """Borrow a driver, creating one if the pool has spare capacity"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise DriverUnavailable("Driver pool is closed")
+
+                while not self._idle and self._created >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise DriverUnavailable(f"No driver available after {timeout}s")
+                    self.stats['waits'] += 1
+                    self._cond.wait(remaining)
+                    if self._closed:
+                        raise DriverUnavailable("Driver pool is closed")
+
+                if self._idle:
+                    driver = self._idle.pop()
+                    fresh = False
+                elif time.monotonic() < self._launch_retry_at:
+                    self.stats['launch_backoffs'] += 1
+                    raise DriverUnavailable(f"Not retrying browser launch for another "
+                                            f"{self._launch_retry_at - time.monotonic():.1f}s: "
+                                            f"{self.last_launch_error}")
+                else:
+                    # Reserve the slot before releasing the lock to create
+                    self._created += 1
+                    driver = None
+                    fresh = True
+
+            if fresh:
+                driver = self._create_driver()
+                if driver is None:
+                    raise DriverUnavailable("Driver factory could not start a browser")
+            elif not self._is_healthy(driver):
+                with self._cond:
+                    self.stats['health_failures'] += 1
+                self._discard(driver)
+                continue
+
+            with self._cond:
+                self._checked_out.add(id(driver))
+                self.stats['checkouts'] += 1
+            return driver
+
+    def checkin(self, driver, pages=1, crashed=False):
+        """Return a driver, recycling it if it crashed or served too many pages
+
+        A driver that is not checked out (already returned, or from another
+        pool) is ignored, so it can never sit in the idle stack twice.
+        """
+        if driver is None:
+            return
+
+        with self._cond:
+            if id(driver) not in self._checked_out:
+                self.stats['rejected_checkins'] += 1
+                logger.warning("Ignoring checkin of a driver that is not checked out")
+                return
+            self._checked_out.discard(id(driver))
+            served = self._pages.get(id(driver), 0) + pages
+            self._pages[id(driver)] = served
+            closed = self._closed
+
+        if crashed or closed or served >= self.max_pages:
+            with self._cond:
+                if crashed:
+                    self.stats['crashed'] += 1
+                else:
+                    self.stats['recycled'] += 1
+            logger.info(f"Recycling pooled driver after {served} pages (crashed={crashed})")
+            self._discard(driver)
+            return
+
+        with self._cond:
+            self._idle.append(driver)
+            self._cond.notify()
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Context manager form of checkout/checkin
+
+        Yields a ``lease`` dict: the caller bumps ``lease['pages']`` for every
+        navigation so recycling tracks real usage, and may set
+        ``lease['crashed']``. Exceptions raised inside the block also mark the
+        driver as crashed.
+        """
+        driver = self.checkout(timeout)
+        lease = {'driver': driver, 'pages': 0, 'crashed': False}
+        try:
+            yield lease
+        except Exception:
+            self.checkin(driver, pages=lease['pages'], crashed=True)
+            raise
+        else:
+            self.checkin(driver, pages=lease['pages'], crashed=lease['crashed'])
+
+    def warm_up(self, count=1):
+        """Eagerly start up to ``count`` drivers so first requests skip launch time"""
+        started = []
+        for _ in range(min(count, self.size)):
+            try:
+                started.append(self.checkout(timeout=0))
+            except DriverUnavailable:
+                break
+        for driver in started:
+            self.checkin(driver, pages=0)
+        return len(started)
+
+    def warm_up_async(self, count=1):
+        """warm_up() on a daemon thread, so a server can start answering while browsers launch"""
+        thread = threading.Thread(target=self.warm_up, args=(count,), name='driver-prewarm', daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        """Quit all idle drivers; checked-out drivers are quit on checkin"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            for driver in idle:
+                self._pages.pop(id(driver), None)
+            self._cond.notify_all()
+        for driver in idle:
+            self._quit(driver)
+
+    def status(self):
+        """Snapshot of pool occupancy and counters"""
+        with self._cond:
+            return {
+                'size': self.size,
+                'live': self._created,
+                'idle': len(self._idle),
+                'in_use': self._created - len(self._idle),
+                'max_pages': self.max_pages,
+                'launch_backoff_remaining': round(max(0, self._launch_retry_at - time.monotonic()), 1),
+                'last_launch_error': self.last_launch_error,
+                **self.stats
+            }
@@ -0,0 +1,271 @@
+# enrichment.py - Concurrent Instagram lookups over a pooled HTTP session
+import re
+import time
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, quote_plus
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+from logging_config import run_in_context
+
+logger = logging.getLogger(__name__)
+
+NOT_FOUND = {
+    'instagram_handle': 'Not found',
+    'instagram_bio': 'Not found',
+    'instagram_followers': 'Not found'
+}
+
+# instagram.com/<handle> links, skipping non-profile paths
+INSTAGRAM_LINK = re.compile(r'instagram\.com/([A-Za-z0-9_.]{1,30})/?(?:[?#"&]|$)')
+RESERVED_PATHS = {'p', 'reel', 'reels', 'explore', 'accounts', 'stories', 'tv', 'about', 'developer', 'legal'}
+FOLLOWERS_PATTERN = re.compile(r'([\d.,]+[KkMm]?)\s+Followers')
+BIO_PATTERN = re.compile(r'on Instagram:\s*"(.*)"', re.S)
+
+# Business pages larger than this are truncated before parsing
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+              'Chrome/120.0.0.0 Safari/537.36')
+
+
+def make_session(pool_size=10):
+    """requests.Session whose keep-alive pool is sized for ``pool_size`` concurrent calls"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+def find_instagram_handles(html):
+    """Instagram profile handles linked from an HTML page, in order of appearance"""
+    handles = []
+    for match in INSTAGRAM_LINK.finditer(html or ''):
+        handle = match.group(1).rstrip('.')
+        if handle.lower() not in RESERVED_PATHS and handle not in handles:
+            handles.append(handle)
+    return handles
+
+
+def instagram_handles_from_html(html):
+    """Instagram handles linked from a page's <a> and <link> tags"""
+    soup = BeautifulSoup(html, 'lxml')
+    handles = []
+    for tag in soup.find_all(['a', 'link'], href=True):
+        for handle in find_instagram_handles(tag['href'].strip()):
+            if handle not in handles:
+                handles.append(handle)
+    return handles
+
+
+class HostLimiter:
+    """Caps concurrent requests per host and spaces them ``min_interval`` apart"""
+
+    def __init__(self, per_host=2, min_interval=0.0):
+        self.per_host = per_host
+        self.min_interval = min_interval
+        self._semaphores = {}
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def limit(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            semaphore = self._semaphores.setdefault(host, threading.BoundedSemaphore(self.per_host))
+        with semaphore:
+            if self.min_interval:
+                with self._lock:
+                    now = time.monotonic()
+                    slot = max(now, self._next_slot.get(host, now))
+                    self._next_slot[host] = slot + self.min_interval
+                if slot > now:
+                    time.sleep(slot - now)
+            yield
+
+
+class InstagramEnricher:
+    """Looks up Instagram profiles on a thread pool so the browser never waits on them
+
+    A handle is taken from the instagram.com links on the business website,
+    optionally falling back to searching ``search_url`` for the business
+    name; the profile page under ``base_url`` is then fetched for followers
+    and bio. Websites are cached in ``page_cache`` (a storage.PageCache):
+    pages younger than ``page_max_age`` are not refetched, older ones are
+    revalidated with ETag / Last-Modified. Parsed profiles are kept in memory
+    for ``page_max_age`` as well, up to ``profile_cache_size`` handles.
+    """
+
+    def __init__(self, max_workers=8, per_host_limit=2, timeout=10, session=None,
+                 base_url='https://www.instagram.com', search_url='https://www.google.com/search',
+                 page_cache=None, page_max_age=24 * 3600, min_interval=0.0, profile_cache_size=5000):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='instagram')
+        self.session = session or make_session(max_workers)
+        self.limiter = HostLimiter(per_host_limit, min_interval)
+        self.timeout = timeout
+        self.base_url = base_url.rstrip('/')
+        self.search_url = search_url
+        self.page_cache = page_cache
+        self.page_max_age = page_max_age
+        self.profile_cache_size = profile_cache_size
+        self._profiles = OrderedDict()  # handle -> (fetched, profile fields or None), least recently used first
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args):
+        return run_in_context(self.executor, fn, *args)
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def get(self, url, **kwargs):
+        """GET through the shared session, respecting the per-host limit"""
+        with self.limiter.limit(url):
+            return self.session.get(url, timeout=self.timeout, **kwargs)
+
+    def search_handle(self, business_name):
+        query = quote_plus(f'"{business_name}" site:instagram.com')
+        response = self.get(f'{self.search_url}?q={query}')
+        response.raise_for_status()
+        handles = find_instagram_handles(response.text)
+        return handles[0] if handles else None
+
+    def fetch_profile(self, handle):
+        """Followers and bio from a profile page's meta description"""
+        response = self.get(f'{self.base_url}/{handle}/')
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+
+        soup = BeautifulSoup(response.text, 'lxml')
+        description = ''
+        for attrs in ({'property': 'og:description'}, {'name': 'description'}):
+            meta = soup.find('meta', attrs=attrs)
+            if meta and meta.get('content'):
+                description = meta['content']
+                break
+
+        followers = FOLLOWERS_PATTERN.search(description)
+        bio = BIO_PATTERN.search(description)
+        return {
+            'instagram_handle': f'@{handle}',
+            'instagram_bio': bio.group(1).strip() if bio else 'Not found',
+            'instagram_followers': followers.group(1) if followers else 'Not found'
+        }
+
+    def website_handles(self, url):
+        """Instagram handles linked from a business website, using the page cache"""
+        cached = self.page_cache.get(url) if self.page_cache else None
+        if cached and time.time() - cached['fetched'] < self.page_max_age:
+            self.page_cache.touch(url)
+            self._count('page_cache_hits')
+            return cached['handles']
+
+        headers = {}
+        if cached and cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        with self.limiter.limit(url):
+            response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+            try:
+                if response.status_code == 304 and cached:
+                    self.page_cache.touch(url, revalidated=True)
+                    self._count('pages_not_modified')
+                    return cached['handles']
+                response.raise_for_status()
+                body = b''
+                for chunk in response.iter_content(64 * 1024):
+                    body += chunk
+                    if len(body) >= MAX_PAGE_BYTES:
+                        break
+            finally:
+                response.close()
+        self._count('pages_fetched')
+
+        content_hash = hashlib.sha256(body).hexdigest()
+        if cached and cached['content_hash'] == content_hash:
+            handles = cached['handles']
+            self._count('pages_unchanged')
+        else:
+            handles = instagram_handles_from_html(body)
+
+        if self.page_cache:
+            self.page_cache.put(url, handles, etag=response.headers.get('ETag'),
+                                last_modified=response.headers.get('Last-Modified'), content_hash=content_hash)
+        return handles
+
+    def cached_profile(self, handle):
+        """fetch_profile() answered from memory while younger than ``page_max_age``"""
+        with self._lock:
+            cached = self._profiles.get(handle)
+            if cached and time.time() - cached[0] < self.page_max_age:
+                self._profiles.move_to_end(handle)
+                self.counters['profile_cache_hits'] = self.counters.get('profile_cache_hits', 0) + 1
+                return dict(cached[1]) if cached[1] else None
+
+        profile = self.fetch_profile(handle)
+        self._count('profiles_fetched')
+        with self._lock:
+            self._profiles[handle] = (time.time(), profile)
+            self._profiles.move_to_end(handle)
+            while len(self._profiles) > self.profile_cache_size:
+                self._profiles.popitem(last=False)
+        return dict(profile) if profile else None
+
+    def profile(self, handle):
+        """Profile fields for a known handle; the handle is kept even if the page can't be read"""
+        try:
+            return self.cached_profile(handle) or dict(NOT_FOUND)
+        except requests.RequestException as e:
+            logger.warning(f"Instagram profile fetch failed for @{handle}: {e}")
+            return dict(NOT_FOUND, instagram_handle=f'@{handle}')
+
+    def lookup(self, business_name, website=None, search=True):
+        """Instagram fields for a business; 'Not found' values when nothing matches
+
+        The business ``website`` is checked first; ``search`` enables the
+        name search when the site links no profile.
+        """
+        handle = None
+        if website:
+            try:
+                handles = self.website_handles(website)
+                handle = handles[0] if handles else None
+            except requests.RequestException as e:
+                self._count('website_errors')
+                logger.warning(f"Website fetch failed for '{business_name}' ({website}): {e}")
+
+        if not handle and search:
+            try:
+                handle = self.search_handle(business_name)
+            except requests.RequestException as e:
+                logger.warning(f"Instagram search failed for '{business_name}': {e}")
+
+        if not handle:
+            return dict(NOT_FOUND)
+        return self.profile(handle)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        if self.page_cache:
+            stats['page_cache'] = self.page_cache.stats()
+        with self._lock:
+            stats['profile_cache'] = {'entries': len(self._profiles), 'max_entries': self.profile_cache_size}
+        return stats
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
@@ -0,0 +1,91 @@
+# exports.py - Streaming CSV / XLSX / Parquet writers for stored result sets
+import csv
+import io
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (business field, column header) in export order
+EXPORT_COLUMNS = [
+    ('name', 'Business Name'),
+    ('phone', 'Contact Number'),
+    ('website', 'Website'),
+    ('instagram_handle', 'Instagram Handle'),
+    ('instagram_bio', 'Instagram Bio'),
+    ('instagram_followers', 'Followers')
+]
+
+EXPORT_FORMATS = {
+    'csv': {'mimetype': 'text/csv', 'extension': 'csv'},
+    'xlsx': {'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'extension': 'xlsx'},
+    'parquet': {'mimetype': 'application/vnd.apache.parquet', 'extension': 'parquet'}
+}
+
+
+class ExportUnavailable(Exception):
+    """Raised when the optional library behind an export format is missing"""
+
+
+def export_row(business):
+    return [business.get(field, '') for field, _ in EXPORT_COLUMNS]
+
+
+def iter_csv(businesses, chunk_size=500):
+    """Yield CSV text in chunks of ``chunk_size`` rows"""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow([header for _, header in EXPORT_COLUMNS])
+
+    for i, business in enumerate(businesses, 1):
+        writer.writerow(export_row(business))
+        if i % chunk_size == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+
+    yield output.getvalue()
+
+
+def write_xlsx(businesses, fileobj):
+    """Write rows with openpyxl's write-only workbook, which streams to disk"""
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ExportUnavailable("XLSX export requires openpyxl")
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Businesses')
+    sheet.append([header for _, header in EXPORT_COLUMNS])
+    for business in businesses:
+        sheet.append(export_row(business))
+    workbook.save(fileobj)
+
+
+def write_parquet(businesses, fileobj, chunk_size=10000):
+    """Write rows as Parquet row groups of ``chunk_size`` via pandas + pyarrow"""
+    try:
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportUnavailable("Parquet export requires pandas and pyarrow")
+
+    columns = [header for _, header in EXPORT_COLUMNS]
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    writer = pq.ParquetWriter(fileobj, schema)
+
+    def flush(rows):
+        frame = pd.DataFrame(rows, columns=columns, dtype='string')
+        writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+
+    try:
+        rows = []
+        for business in businesses:
+            rows.append([None if value is None else str(value) for value in export_row(business)])
+            if len(rows) >= chunk_size:
+                flush(rows)
+                rows = []
+        if rows:
+            flush(rows)
+    finally:
+        writer.close()
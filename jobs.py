@@ -0,0 +1,133 @@
+# jobs.py - Background scrape jobs with progress polling and cancellation
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from logging_config import run_in_context
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+FINISHED_STATES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+
+class Job:
+    """State of one background scrape; results grow while it runs"""
+
+    def __init__(self, params):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.status = JOB_QUEUED
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.total = params.get('limit')
+        self.results = []
+        self.error = None
+        self.timings = None
+        self.result_id = None
+        self.summary = None
+        self.changes = None
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def add_result(self, business):
+        """Record one extracted business as soon as it is available"""
+        with self._lock:
+            self.results.append(business)
+
+    def set_total(self, total):
+        with self._lock:
+            self.total = total
+
+    def to_dict(self, since=0):
+        """Status snapshot including results from index ``since`` onward"""
+        with self._lock:
+            results = self.results[since:]
+            return {
+                'id': self.id,
+                'status': self.status,
+                'params': self.params,
+                'created': self.created,
+                'started': self.started,
+                'finished': self.finished,
+                'progress': {'processed': len(self.results), 'total': self.total},
+                'results': results,
+                'next': since + len(results),
+                'error': self.error,
+                'result_id': self.result_id,
+                'summary': self.summary,
+                'changes': self.changes,
+                'timings': self.timings
+            }
+
+
+class JobManager:
+    """Runs jobs on a bounded thread pool and keeps recent ones for polling"""
+
+    def __init__(self, max_workers=2, history=200):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scrape-job')
+        self.history = history
+        self.jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, runner, params):
+        """Queue ``runner(job)``; its return value becomes the final result list"""
+        job = Job(params)
+        with self._lock:
+            self.jobs[job.id] = job
+            self._prune()
+        run_in_context(self.executor, self._run, job, runner)
+        logger.info(f"Queued job {job.id} with {params}")
+        return job
+
+    def _run(self, job, runner):
+        if job.cancel_event.is_set():
+            job.status = JOB_CANCELLED
+            job.finished = time.time()
+            return
+
+        job.status = JOB_RUNNING
+        job.started = time.time()
+        try:
+            results = runner(job)
+            with job._lock:
+                if results is not None:
+                    job.results = list(results)
+                job.status = JOB_CANCELLED if job.cancel_event.is_set() else JOB_COMPLETED
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = JOB_FAILED
+        finally:
+            job.finished = time.time()
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Ask a job to stop; running scrapes stop before the next business"""
+        job = self.get(job_id)
+        if job and job.status not in FINISHED_STATES:
+            job.cancel_event.set()
+            logger.info(f"Cancellation requested for job {job_id}")
+        return job
+
+    def _prune(self):
+        # Drop the oldest finished jobs once history is exceeded
+        excess = len(self.jobs) - self.history
+        for job_id in [jid for jid, job in self.jobs.items() if job.status in FINISHED_STATES][:max(0, excess)]:
+            del self.jobs[job_id]
+
+    def shutdown(self):
+        for job in list(self.jobs.values()):
+            job.cancel_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
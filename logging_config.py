@@ -0,0 +1,126 @@
+# logging_config.py - Text or JSON logs written off the request thread, with request ids and sampling
+import os
+import sys
+import copy
+import json
+import time
+import queue
+import atexit
+import logging
+import itertools
+import contextvars
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')  # 'text' or 'json'
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+LOG_FILE = os.environ.get('LOG_FILE')  # stderr when unset
+# Share of hot-loop events (per element / per selector) that are kept
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 0.01))
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - [%(request_id)s] %(message)s'
+
+# Correlation id of the request (or job) being served; '-' outside of one
+request_id = contextvars.ContextVar('request_id', default='-')
+
+# extra= for per-element and per-selector events so they are sampled
+HOT = {'hot': True}
+
+# LogRecord attributes that are not user-supplied extras
+RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id', 'hot'}
+
+
+class ContextFilter(logging.Filter):
+    """Stamps records with the current request id
+
+    Must run on the thread that emits the record, before it is queued: the
+    listener thread does not see the caller's context and would stamp '-'.
+    """
+
+    def filter(self, record):
+        record.request_id = request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps every Nth record marked ``hot``, N = 1 / rate; other records pass"""
+
+    def __init__(self, rate=LOG_SAMPLE_RATE):
+        super().__init__()
+        self.every = 0 if rate <= 0 else max(1, round(1 / rate))
+        self._counter = itertools.count()
+
+    def filter(self, record):
+        if not getattr(record, 'hot', False):
+            return True
+        return self.every > 0 and next(self._counter) % self.every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; extras passed to the logger become fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', '-'),
+            'thread': record.threadName
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener's handler
+
+    The stock prepare() formats every record on the calling thread. This one
+    only merges the arguments into the message, so later changes to mutable
+    arguments do not show up in the log, and queues a copy of the record.
+    The queue is in-process, so exc_info is kept for the listener to format.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+_listener = None
+
+
+def configure_logging(fmt=LOG_FORMAT, level=LOG_LEVEL, path=LOG_FILE, sample_rate=LOG_SAMPLE_RATE):
+    """Route the root logger through a DeferredQueueHandler; a QueueListener thread does formatting and I/O"""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    target = logging.FileHandler(path, encoding='utf-8') if path else logging.StreamHandler(sys.stderr)
+    target.setFormatter(JsonFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(sample_rate))
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, target, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
+
+
+def run_in_context(executor, fn, *args):
+    """executor.submit that carries the caller's request id into the worker thread"""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
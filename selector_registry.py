@@ -0,0 +1,112 @@
+# selector_registry.py - Ranks CSS selector cascades by which selectors currently match
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Score given to selectors with no observations yet
+PRIOR_SCORE = 0.5
+
+
+class SelectorRegistry:
+    """Hit/miss/latency stats per selector, used to reorder cascades by recent success
+
+    ``cascades`` maps a cascade name to its selectors in their default order.
+    The score is an exponentially weighted success rate (``decay`` per
+    observation), so a selector that stops matching sinks within a few calls
+    and untried selectors are attempted before known misses. Stats are loaded
+    from ``store`` (a storage.SelectorStatsStore) on first use and written
+    back at most every ``flush_interval`` seconds.
+    """
+
+    def __init__(self, cascades, store=None, decay=0.2, flush_interval=30):
+        self.cascades = {name: list(selectors) for name, selectors in cascades.items()}
+        self.store = store
+        self.decay = decay
+        self.flush_interval = flush_interval
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._flushed = time.monotonic()
+        self._loaded = store is None
+
+    def _load(self):
+        """Read persisted stats once; the caller holds the lock"""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            rows = self.store.load()
+        except Exception as e:
+            logger.warning(f"Could not load selector stats: {e}")
+            return
+        for row in rows:
+            if row['selector'] in self.cascades.get(row['cascade'], ()):
+                self.stats[(row['cascade'], row['selector'])] = {
+                    key: row[key] for key in ('hits', 'misses', 'latency_total', 'latency_count', 'score')}
+
+    def order(self, cascade):
+        """Selectors of ``cascade``, best recent success first, ties in default order"""
+        selectors = self.cascades[cascade]
+        with self._lock:
+            self._load()
+            scores = [self.stats.get((cascade, selector), {}).get('score', PRIOR_SCORE) for selector in selectors]
+        ranked = sorted(range(len(selectors)), key=lambda i: (-scores[i], i))
+        return [selectors[i] for i in ranked]
+
+    def record(self, cascade, selector, hit, latency=None):
+        """Record one attempt; ``latency`` in seconds when it was measured on its own"""
+        with self._lock:
+            self._load()
+            entry = self.stats.setdefault((cascade, selector), {
+                'hits': 0, 'misses': 0, 'latency_total': 0.0, 'latency_count': 0, 'score': PRIOR_SCORE})
+            entry['hits' if hit else 'misses'] += 1
+            entry['score'] = entry['score'] * (1 - self.decay) + (self.decay if hit else 0.0)
+            if latency is not None:
+                entry['latency_total'] += latency
+                entry['latency_count'] += 1
+            self._dirty = True
+            due = time.monotonic() - self._flushed >= self.flush_interval
+        if due:
+            self.flush()
+
+    def record_cascade(self, cascade, tried, winner):
+        """Misses for every selector tried before ``winner`` (None when nothing matched), a hit for it"""
+        for selector in tried:
+            if selector == winner:
+                self.record(cascade, selector, True)
+                break
+            self.record(cascade, selector, False)
+
+    def flush(self):
+        with self._lock:
+            if self.store is None or not self._dirty:
+                return
+            rows = [dict(entry, cascade=cascade, selector=selector)
+                    for (cascade, selector), entry in self.stats.items()]
+            self._dirty = False
+            self._flushed = time.monotonic()
+        try:
+            self.store.save(rows)
+        except Exception as e:
+            logger.warning(f"Could not persist selector stats: {e}")
+
+    def snapshot(self):
+        """Per-cascade stats in the order selectors will next be tried"""
+        result = {}
+        for cascade in self.cascades:
+            rows = []
+            for selector in self.order(cascade):
+                with self._lock:
+                    entry = dict(self.stats.get((cascade, selector), {}))
+                rows.append({
+                    'selector': selector,
+                    'hits': entry.get('hits', 0),
+                    'misses': entry.get('misses', 0),
+                    'score': round(entry.get('score', PRIOR_SCORE), 3),
+                    'avg_latency_ms': round(1000 * entry['latency_total'] / entry['latency_count'], 1)
+                    if entry.get('latency_count') else None
+                })
+            result[cascade] = rows
+        return result
@@ -0,0 +1,542 @@
+# storage.py - SQLite-backed persistence for scrape results
+import os
+import json
+import time
+import sqlite3
+import threading
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+# One local database file holds every table below
+DATA_DB_PATH = os.environ.get('DATA_DB_PATH', 'analyzer_data.sqlite3')
+
+
+class SQLiteStore:
+    """Base class: per-thread connections to a shared SQLite file
+
+    Nothing touches the file until the first connect(), which creates the schema.
+    """
+
+    SCHEMA = ''
+
+    def __init__(self, path=DATA_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            # WAL lets readers proceed while a scrape is being written
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            with self._schema_lock:
+                if not self._schema_ready:
+                    self._create_schema(conn)
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self, conn):
+        with conn:
+            conn.executescript(self.SCHEMA)
+
+
+def normalize_query(city, keyword):
+    """Case- and whitespace-insensitive form of a search"""
+    return ' '.join(city.lower().split()), ' '.join(keyword.lower().split())
+
+
+class ResultCache(SQLiteStore):
+    """Whole-search result cache keyed by normalized (city, keyword, limit)
+
+    Entries younger than ``ttl`` are fresh; entries up to ``ttl + stale_ttl``
+    old may be served while a refresh runs in the background. Least recently
+    used entries are evicted once the payloads exceed ``max_bytes``.
+    """
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS result_cache (
+            city TEXT NOT NULL,
+            keyword TEXT NOT NULL,
+            result_limit INTEGER NOT NULL,
+            payload TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created REAL NOT NULL,
+            accessed REAL NOT NULL,
+            PRIMARY KEY (city, keyword, result_limit)
+        );
+        CREATE INDEX IF NOT EXISTS result_cache_accessed ON result_cache (accessed);
+    '''
+
+    def __init__(self, path=DATA_DB_PATH, ttl=7 * 24 * 3600, stale_ttl=7 * 24 * 3600, max_bytes=50 * 1024 * 1024):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        super().__init__(path)
+
+    def get(self, city, keyword, limit):
+        """Returns (businesses, age, stale) or None when missing or too old to serve"""
+        key = normalize_query(city, keyword) + (limit,)
+        now = time.time()
+        conn = self.connect()
+        row = conn.execute(
+            'SELECT payload, created FROM result_cache WHERE city = ? AND keyword = ? AND result_limit = ?',
+            key).fetchone()
+        if row is None:
+            return None
+
+        age = now - row['created']
+        if age > self.ttl + self.stale_ttl:
+            return None
+
+        with conn:
+            conn.execute('UPDATE result_cache SET accessed = ? WHERE city = ? AND keyword = ? AND result_limit = ?',
+                         (now,) + key)
+        return json.loads(row['payload']), age, age > self.ttl
+
+    def put(self, city, keyword, limit, businesses):
+        payload = json.dumps(businesses)
+        now = time.time()
+        conn = self.connect()
+        with self._lock, conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO result_cache (city, keyword, result_limit, payload, size, created, accessed) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                normalize_query(city, keyword) + (limit, payload, len(payload), now, now))
+            self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM result_cache').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        for row in conn.execute('SELECT rowid, size FROM result_cache ORDER BY accessed').fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute('DELETE FROM result_cache WHERE rowid = ?', (row['rowid'],))
+            total -= row['size']
+            evicted += 1
+        logger.info(f"Evicted {evicted} cached searches to stay under {self.max_bytes} bytes")
+
+    def stats(self):
+        row = self.connect().execute(
+            'SELECT COUNT(*) AS entries, COALESCE(SUM(size), 0) AS bytes FROM result_cache').fetchone()
+        return {'entries': row['entries'], 'bytes': row['bytes'], 'max_bytes': self.max_bytes,
+                'ttl': self.ttl, 'stale_ttl': self.stale_ttl}
+
+
+class EntityStore(SQLiteStore):
+    """Per-place field cache keyed by Google Maps cid, with per-field timestamps"""
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS entity_fields (
+            cid TEXT NOT NULL,
+            field TEXT NOT NULL,
+            value TEXT,
+            updated REAL NOT NULL,
+            PRIMARY KEY (cid, field)
+        );
+    '''
+
+    def get(self, cid, ttls):
+        """Fields of ``cid`` younger than their entry in ``ttls`` (field -> seconds)"""
+        now = time.time()
+        rows = self.connect().execute('SELECT field, value, updated FROM entity_fields WHERE cid = ?',
+                                      (cid,)).fetchall()
+        return {
+            row['field']: row['value'] for row in rows
+            if row['field'] in ttls and now - row['updated'] <= ttls[row['field']]
+        }
+
+    def put(self, cid, fields):
+        """Record freshly observed values for some fields of ``cid``"""
+        now = time.time()
+        conn = self.connect()
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO entity_fields (cid, field, value, updated) VALUES (?, ?, ?, ?)',
+                [(cid, field, value, now) for field, value in fields.items()])
+
+    def stats(self):
+        row = self.connect().execute(
+            'SELECT COUNT(DISTINCT cid) AS entities, COUNT(*) AS fields FROM entity_fields').fetchone()
+        return {'entities': row['entities'], 'fields': row['fields']}
+
+
+class SnapshotStore(SQLiteStore):
+    """Latest card fingerprint and business per place of each search, the baseline for delta re-scrapes"""
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS search_snapshots (
+            city TEXT NOT NULL,
+            keyword TEXT NOT NULL,
+            cid TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            fingerprint TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            updated REAL NOT NULL,
+            PRIMARY KEY (city, keyword, cid)
+        );
+    '''
+
+    def load(self, city, keyword):
+        """cid -> {'position', 'fingerprint', 'business'} from the last run of a search"""
+        rows = self.connect().execute(
+            'SELECT cid, position, fingerprint, payload FROM search_snapshots WHERE city = ? AND keyword = ?',
+            normalize_query(city, keyword)).fetchall()
+        return {row['cid']: {'position': row['position'], 'fingerprint': row['fingerprint'],
+                             'business': json.loads(row['payload'])} for row in rows}
+
+    def update(self, city, keyword, entries, removed=()):
+        """Upsert (cid, position, fingerprint, business) ``entries`` and drop the ``removed`` cids"""
+        key = normalize_query(city, keyword)
+        now = time.time()
+        conn = self.connect()
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO search_snapshots (city, keyword, cid, position, fingerprint, payload, updated) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [key + (cid, position, fingerprint, json.dumps(business), now)
+                 for cid, position, fingerprint, business in entries])
+            conn.executemany('DELETE FROM search_snapshots WHERE city = ? AND keyword = ? AND cid = ?',
+                             [key + (cid,) for cid in removed])
+
+    def stats(self):
+        row = self.connect().execute(
+            'SELECT COUNT(DISTINCT city || char(31) || keyword) AS searches, COUNT(*) AS places '
+            'FROM search_snapshots').fetchone()
+        return {'searches': row['searches'], 'places': row['places']}
+
+
+# Columns kept alongside each stored row's JSON so they can be queried directly
+RESULT_COLUMNS = ('name', 'phone', 'website', 'cid', 'instagram_handle', 'instagram_bio', 'instagram_followers')
+
+# Filter expressions, written exactly as in the indexes below so the planner can use them
+NO_WEBSITE = "(IFNULL(website, 'Not found') IN ('Not found', ''))"
+NO_INSTAGRAM = "(IFNULL(instagram_handle, 'Not found') IN ('Not found', ''))"
+PHONE_DIGITS = "REPLACE(REPLACE(REPLACE(REPLACE(REPLACE({}, ' ', ''), '-', ''), '+', ''), '(', ''), ')', '')"
+
+# Sort column and collation for ResultStore.query; each pairs with position for a stable keyset cursor
+RESULT_SORTS = {'position': ('position', ''), 'name': ('name', ' COLLATE NOCASE')}
+# Trigram search needs at least this many characters; shorter terms fall back to LIKE
+MIN_SEARCH_LENGTH = 3
+
+
+def valid_cursor(sort, after):
+    """Whether ``after`` has the shape ResultStore.query returns for ``sort``: [position] or [name, position]"""
+    if not isinstance(after, (list, tuple)) or len(after) != (1 if sort == 'position' else 2):
+        return False
+    position = after[-1]
+    if not isinstance(position, int) or isinstance(position, bool):
+        return False
+    return sort == 'position' or after[0] is None or isinstance(after[0], str)
+
+
+class ResultStore(SQLiteStore):
+    """Finished result sets addressable by id, written and read in chunks"""
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS results (
+            id TEXT PRIMARY KEY,
+            city TEXT,
+            keyword TEXT,
+            created REAL NOT NULL,
+            row_count INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS results_created ON results (created);
+        CREATE TABLE IF NOT EXISTS result_rows (
+            result_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            name TEXT,
+            phone TEXT,
+            website TEXT,
+            cid TEXT,
+            instagram_handle TEXT,
+            instagram_bio TEXT,
+            instagram_followers TEXT,
+            data TEXT NOT NULL,
+            PRIMARY KEY (result_id, position)
+        );
+        CREATE INDEX IF NOT EXISTS result_rows_name ON result_rows (result_id, name COLLATE NOCASE, position);
+        CREATE INDEX IF NOT EXISTS result_rows_no_website ON result_rows (result_id, {no_website}, position);
+        CREATE INDEX IF NOT EXISTS result_rows_no_instagram ON result_rows (result_id, {no_instagram}, position);
+    '''.format(no_website=NO_WEBSITE, no_instagram=NO_INSTAGRAM)
+
+    # Trigram index over name and phone (also without punctuation) for substring search
+    SEARCH_SCHEMA = '''
+        CREATE VIRTUAL TABLE result_rows_fts USING fts5(name, phone, digits, tokenize='trigram');
+        CREATE TRIGGER result_rows_fts_insert AFTER INSERT ON result_rows BEGIN
+            INSERT INTO result_rows_fts (rowid, name, phone, digits) VALUES (new.rowid, new.name, new.phone, {new_digits});
+        END;
+        CREATE TRIGGER result_rows_fts_delete AFTER DELETE ON result_rows BEGIN
+            DELETE FROM result_rows_fts WHERE rowid = old.rowid;
+        END;
+        INSERT INTO result_rows_fts (rowid, name, phone, digits) SELECT rowid, name, phone, {digits} FROM result_rows;
+    '''.format(new_digits=PHONE_DIGITS.format('new.phone'), digits=PHONE_DIGITS.format('phone'))
+
+    def __init__(self, path=DATA_DB_PATH, max_results=500, chunk_size=1000):
+        self.max_results = max_results
+        self.chunk_size = chunk_size
+        super().__init__(path)
+        self._full_text = None
+
+    @property
+    def full_text(self):
+        """Whether searches use the trigram index rather than LIKE"""
+        self.connect()
+        return self._full_text
+
+    def _create_schema(self, conn):
+        super()._create_schema(conn)
+        self._full_text = self._create_search_index(conn)
+
+    def _create_search_index(self, conn):
+        """Create and backfill the trigram index once; False when this SQLite has no FTS5 trigrams"""
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'result_rows_fts'").fetchone():
+            return True
+        try:
+            conn.executescript('BEGIN;' + self.SEARCH_SCHEMA + 'COMMIT;')
+            return True
+        except sqlite3.OperationalError as e:
+            if conn.in_transaction:
+                conn.rollback()
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'result_rows_fts'").fetchone():
+                # Another process created it first
+                return True
+            logger.warning(f"Full-text search unavailable, falling back to LIKE: {e}")
+            return False
+
+    def save(self, businesses, city=None, keyword=None):
+        """Store an iterable of business dicts; returns the new result id"""
+        result_id = uuid.uuid4().hex
+        conn = self.connect()
+        count = 0
+        with conn:
+            conn.execute('INSERT INTO results (id, city, keyword, created) VALUES (?, ?, ?, ?)',
+                         (result_id, city, keyword, time.time()))
+            for chunk in self._chunks(businesses):
+                conn.executemany(
+                    f'INSERT INTO result_rows (result_id, position, {", ".join(RESULT_COLUMNS)}, data) '
+                    f'VALUES ({", ".join("?" * (len(RESULT_COLUMNS) + 3))})',
+                    [(result_id, count + offset) + tuple(business.get(column) for column in RESULT_COLUMNS) +
+                     (json.dumps(business),) for offset, business in enumerate(chunk)])
+                count += len(chunk)
+            conn.execute('UPDATE results SET row_count = ? WHERE id = ?', (count, result_id))
+        self._prune()
+        return result_id
+
+    def _chunks(self, businesses):
+        chunk = []
+        for business in businesses:
+            chunk.append(business)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _prune(self):
+        conn = self.connect()
+        with self._lock, conn:
+            stale = [row['id'] for row in conn.execute(
+                'SELECT id FROM results ORDER BY created DESC LIMIT -1 OFFSET ?', (self.max_results,))]
+            for result_id in stale:
+                conn.execute('DELETE FROM result_rows WHERE result_id = ?', (result_id,))
+                conn.execute('DELETE FROM results WHERE id = ?', (result_id,))
+
+    def get(self, result_id):
+        """Metadata of a stored result set, or None"""
+        row = self.connect().execute('SELECT * FROM results WHERE id = ?', (result_id,)).fetchone()
+        return dict(row) if row else None
+
+    def iter_rows(self, result_id):
+        """Yield stored businesses in order without loading the whole set"""
+        cursor = self.connect().execute(
+            'SELECT data FROM result_rows WHERE result_id = ? ORDER BY position', (result_id,))
+        try:
+            while True:
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield json.loads(row['data'])
+        finally:
+            cursor.close()
+
+    def _where(self, result_id, search=None, no_website=False, no_instagram=False):
+        """WHERE clause and parameters selecting the filtered rows of one result set"""
+        clauses = ['result_id = ?']
+        params = [result_id]
+        if no_website:
+            clauses.append(f'{NO_WEBSITE} = 1')
+        if no_instagram:
+            clauses.append(f'{NO_INSTAGRAM} = 1')
+
+        search = (search or '').strip()
+        digits = ''.join(char for char in search if char.isdigit())
+        if search and self.full_text and len(search) >= MIN_SEARCH_LENGTH:
+            terms = ['"{}"'.format(search.replace('"', '""'))]
+            if len(digits) >= MIN_SEARCH_LENGTH and digits != search:
+                # "98765 43210" should find "+91-98765-43210"
+                terms.append(f'digits : "{digits}"')
+            clauses.append('rowid IN (SELECT rowid FROM result_rows_fts WHERE result_rows_fts MATCH ?)')
+            params.append(' OR '.join(terms))
+        elif search:
+            pattern = '%' + search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            clauses.append("(name LIKE ? ESCAPE '\\' OR phone LIKE ? ESCAPE '\\')")
+            params += [pattern, pattern]
+        return ' AND '.join(clauses), params
+
+    def query(self, result_id, search=None, no_website=False, no_instagram=False, sort='position',
+              descending=False, limit=100, after=None):
+        """One page of a result set; returns (businesses, cursor for the next page or None)
+
+        ``after`` is the cursor returned with the previous page, the sort
+        value and position of its last row, so every page is an index range
+        scan no matter how deep it is. Raises ValueError when ``after`` is not
+        a cursor of ``sort``.
+        """
+        if after is not None and not valid_cursor(sort, after):
+            raise ValueError(f"Invalid cursor for sort '{sort}'")
+        where, params = self._where(result_id, search, no_website, no_instagram)
+        column, collation = RESULT_SORTS[sort]
+        direction = 'DESC' if descending else 'ASC'
+        comparison = '<' if descending else '>'
+        if after is not None:
+            if sort == 'position':
+                where += f' AND position {comparison} ?'
+                params.append(after[-1])
+            else:
+                # Collating the parameter rather than the column keeps this an index range
+                where += f' AND ({column}, position) {comparison} (?{collation}, ?)'
+                params += list(after)
+
+        order = (f'position {direction}' if sort == 'position' else
+                 f'{column}{collation} {direction}, position {direction}')
+        rows = self.connect().execute(
+            f'SELECT position, name, data FROM result_rows WHERE {where} ORDER BY {order} LIMIT ?',
+            params + [limit + 1]).fetchall()
+
+        businesses = [json.loads(row['data']) for row in rows[:limit]]
+        cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            cursor = [last['position']] if sort == 'position' else [last['name'], last['position']]
+        return businesses, cursor
+
+    def count(self, result_id, search=None, no_website=False, no_instagram=False):
+        """Number of rows matching the filters"""
+        where, params = self._where(result_id, search, no_website, no_instagram)
+        return self.connect().execute(f'SELECT COUNT(*) FROM result_rows WHERE {where}', params).fetchone()[0]
+
+    def summary(self, result_id):
+        """Totals shown above the results table"""
+        row = self.connect().execute(
+            f'SELECT COUNT(*) AS total, COALESCE(SUM(NOT {NO_WEBSITE}), 0) AS with_website, '
+            f'COALESCE(SUM(NOT {NO_INSTAGRAM}), 0) AS with_instagram FROM result_rows WHERE result_id = ?',
+            (result_id,)).fetchone()
+        return dict(row)
+
+    def stats(self):
+        row = self.connect().execute(
+            'SELECT COUNT(*) AS results, COALESCE(SUM(row_count), 0) AS rows FROM results').fetchone()
+        return {'results': row['results'], 'rows': row['rows'], 'max_results': self.max_results}
+
+
+class PageCache(SQLiteStore):
+    """Validators and parsed Instagram handles of fetched business websites
+
+    Keyed by URL; keeps the ETag / Last-Modified for conditional requests and
+    a hash of the body so a changed response with identical content is not
+    re-parsed. Least recently used pages are dropped past ``max_entries``.
+    """
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS page_cache (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            content_hash TEXT,
+            handles TEXT NOT NULL,
+            fetched REAL NOT NULL,
+            accessed REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS page_cache_accessed ON page_cache (accessed);
+    '''
+
+    def __init__(self, path=DATA_DB_PATH, max_entries=5000):
+        self.max_entries = max_entries
+        super().__init__(path)
+
+    def get(self, url):
+        row = self.connect().execute('SELECT * FROM page_cache WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        entry['handles'] = json.loads(entry['handles'])
+        return entry
+
+    def put(self, url, handles, etag=None, last_modified=None, content_hash=None):
+        now = time.time()
+        conn = self.connect()
+        with self._lock, conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO page_cache (url, etag, last_modified, content_hash, handles, fetched, accessed) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, etag, last_modified, content_hash, json.dumps(handles), now, now))
+            conn.execute('DELETE FROM page_cache WHERE url IN '
+                         '(SELECT url FROM page_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)', (self.max_entries,))
+
+    def touch(self, url, revalidated=False):
+        """Mark ``url`` as used; ``revalidated`` also restarts its freshness window"""
+        now = time.time()
+        conn = self.connect()
+        with conn:
+            if revalidated:
+                conn.execute('UPDATE page_cache SET accessed = ?, fetched = ? WHERE url = ?', (now, now, url))
+            else:
+                conn.execute('UPDATE page_cache SET accessed = ? WHERE url = ?', (now, url))
+
+    def stats(self):
+        row = self.connect().execute('SELECT COUNT(*) AS entries FROM page_cache').fetchone()
+        return {'entries': row['entries'], 'max_entries': self.max_entries}
+
+
+class SelectorStatsStore(SQLiteStore):
+    """Persisted SelectorRegistry stats so selector rankings survive restarts"""
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS selector_stats (
+            cascade TEXT NOT NULL,
+            selector TEXT NOT NULL,
+            hits INTEGER NOT NULL,
+            misses INTEGER NOT NULL,
+            latency_total REAL NOT NULL,
+            latency_count INTEGER NOT NULL,
+            score REAL NOT NULL,
+            updated REAL NOT NULL,
+            PRIMARY KEY (cascade, selector)
+        );
+    '''
+
+    def load(self):
+        return [dict(row) for row in self.connect().execute('SELECT * FROM selector_stats')]
+
+    def save(self, rows):
+        now = time.time()
+        conn = self.connect()
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO selector_stats '
+                '(cascade, selector, hits, misses, latency_total, latency_count, score, updated) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(row['cascade'], row['selector'], row['hits'], row['misses'], row['latency_total'],
+                  row['latency_count'], row['score'], now) for row in rows])
@@ -0,0 +1,8 @@
+# conftest.py - Make the app's top-level modules and the benchmark fixtures importable from the tests
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# replay_driver (offline WebDriver over saved Maps pages) lives with the benchmarks
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
@@ -0,0 +1,118 @@
+# test_cleaning.py - Per-row cleaning rules and parity of the pandas path with them
+import copy
+import random
+
+import pytest
+
+import cleaning
+from cleaning import normalize_phone, canonical_website, clean_instagram_handle, clean_rows, clean_businesses
+
+
+@pytest.mark.parametrize('phone, expected', [
+    ('098765 43210', '+919876543210'),
+    ('+91-98765-43210', '+919876543210'),
+    ('0091 98765 43210', '+919876543210'),
+    ('9876543210', '+919876543210'),
+    ('919876543210', '+919876543210'),
+    ('+1 (415) 555-0100', '+14155550100'),
+    ('12345', None),
+    ('Not found', None),
+    (None, None)
+])
+def test_normalize_phone(phone, expected):
+    assert normalize_phone(phone) == expected
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://www.Example.com/', ('https://example.com', 'example.com')),
+    ('example.com/menu/#hours', ('http://example.com/menu', 'example.com/menu')),
+    ('HTTP://WWW.EXAMPLE.COM/a?b=1', ('http://example.com/a?b=1', 'example.com/a?b=1')),
+    ('not a url', (None, None)),
+    ('Not found', (None, None))
+])
+def test_canonical_website(url, expected):
+    assert canonical_website(url) == expected
+
+
+@pytest.mark.parametrize('handle, expected', [
+    ('@Cafe.Mocha', '@cafe.mocha'),
+    ('https://www.instagram.com/cafe_mocha/?hl=en', '@cafe_mocha'),
+    ('has spaces', None),
+    ('Not found', None)
+])
+def test_clean_instagram_handle(handle, expected):
+    assert clean_instagram_handle(handle) == expected
+
+
+def test_duplicates_merge_transitively_in_first_seen_order():
+    businesses = [
+        {'name': 'Cafe Mocha', 'phone': '098765 43210', 'website': 'Not found', 'sources': ['cafe in Pune']},
+        {'name': 'Zest', 'phone': '+91 91234 56789', 'website': 'zest.in'},
+        # Same phone as the first, same website as the fourth: all three are one place
+        {'name': 'Unknown Business', 'phone': '+91-98765-43210', 'website': 'https://mocha.com/',
+         'sources': ['coffee in Pune', 'cafe in Pune']},
+        {'name': 'Mocha', 'phone': 'Not found', 'website': 'http://www.mocha.com', 'cid': '42'}
+    ]
+
+    cleaned = clean_rows(businesses)
+
+    assert cleaned == [
+        {'name': 'Cafe Mocha', 'phone': '+919876543210', 'website': 'https://mocha.com', 'cid': '42',
+         'instagram_handle': 'Not found', 'sources': ['cafe in Pune', 'coffee in Pune']},
+        {'name': 'Zest', 'phone': '+919123456789', 'website': 'http://zest.in', 'instagram_handle': 'Not found'}
+    ]
+
+
+def make_businesses(count, seed=25):
+    """Businesses in mixed scraped forms where about a third repeat an earlier place"""
+    rng = random.Random(seed)
+    phones = [lambda d: f"+91-{d[:5]}-{d[5:]}", lambda d: f"0{d}", lambda d: d, lambda d: 'Not found',
+              lambda d: None]
+    websites = [lambda h: f"https://www.{h}/", lambda h: f"http://{h.upper()}", lambda h: f"{h}/#contact",
+                lambda h: 'Not found']
+    handles = [lambda h: f"@{h}", lambda h: f"https://instagram.com/{h}", lambda h: 'Not found']
+    places, businesses = [], []
+    for i in range(count):
+        if places and rng.random() < 0.35:
+            place = rng.choice(places)
+        else:
+            place = {'name': f"Place {i}", 'digits': str(rng.randint(7 * 10 ** 9, 10 ** 10 - 1)),
+                     'host': f"place{i}.com", 'cid': rng.choice([str(10 ** 17 + i), None])}
+            places.append(place)
+        business = {
+            'name': rng.choice([place['name'], 'Unknown Business']),
+            'phone': rng.choice(phones)(place['digits']),
+            'website': rng.choice(websites)(place['host']),
+            'cid': rng.choice([place['cid'], None]),
+            'instagram_handle': rng.choice(handles)(f"place_{place['digits'][:4]}"),
+            'instagram_followers': rng.choice([rng.randint(0, 5000), 'Not found'])
+        }
+        if rng.random() < 0.8:
+            business['sources'] = rng.choice([[f"query {rng.randint(0, 3)}"], [], None])
+        businesses.append(business)
+    return businesses
+
+
+@pytest.mark.parametrize('count', [0, 1, 50, 2000])
+def test_pandas_path_matches_row_path(monkeypatch, count):
+    pytest.importorskip('pandas')
+    monkeypatch.setattr(cleaning, 'CLEAN_VECTORIZE_MIN_ROWS', 0)
+    businesses = make_businesses(count)
+    original = copy.deepcopy(businesses)
+
+    assert clean_businesses(businesses) == clean_rows(businesses)
+    assert businesses == original
+
+
+@pytest.mark.parametrize('enabled', [True, False])
+def test_pandas_path_restores_the_garbage_collector(monkeypatch, enabled):
+    pytest.importorskip('pandas')
+    import gc
+    monkeypatch.setattr(cleaning, 'CLEAN_VECTORIZE_MIN_ROWS', 0)
+    was_enabled = gc.isenabled()
+    (gc.enable if enabled else gc.disable)()
+    try:
+        clean_businesses(make_businesses(50))
+        assert gc.isenabled() is enabled
+    finally:
+        (gc.enable if was_enabled else gc.disable)()
@@ -0,0 +1,160 @@
+import threading
+import time
+
+import pytest
+
+from driver_pool import DriverUnavailable, WebDriverPool
+
+
+class FakeDriver:
+    def __init__(self, number):
+        self.number = number
+        self.healthy = True
+        self.quit_calls = 0
+
+    @property
+    def title(self):
+        if not self.healthy:
+            raise RuntimeError('session deleted')
+        return 'Google Maps'
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class FakeFactory:
+    """Driver factory that counts launches and can be told to fail"""
+
+    def __init__(self):
+        self.drivers = []
+        self.failing = False
+
+    def __call__(self):
+        if self.failing:
+            raise RuntimeError('chrome not reachable')
+        driver = FakeDriver(len(self.drivers))
+        self.drivers.append(driver)
+        return driver
+
+
+@pytest.fixture
+def factory():
+    return FakeFactory()
+
+
+def test_checkout_waits_for_a_busy_pool(factory):
+    pool = WebDriverPool(factory, size=1)
+    driver = pool.checkout()
+
+    with pytest.raises(DriverUnavailable):
+        pool.checkout(timeout=0.05)
+
+    borrowed = []
+    waiter = threading.Thread(target=lambda: borrowed.append(pool.checkout(timeout=5)))
+    waiter.start()
+    time.sleep(0.05)
+    pool.checkin(driver)
+    waiter.join(5)
+
+    assert borrowed == [driver]
+    assert len(factory.drivers) == 1
+    assert pool.stats['waits'] >= 2
+
+
+def test_driver_is_recycled_after_max_pages(factory):
+    pool = WebDriverPool(factory, size=1, max_pages=3)
+
+    first = pool.checkout()
+    pool.checkin(first, pages=2)
+    assert pool.checkout() is first
+    pool.checkin(first, pages=1)
+
+    assert first.quit_calls == 1
+    assert pool.stats['recycled'] == 1
+    second = pool.checkout()
+    assert second is not first
+    assert pool.status()['live'] == 1
+
+
+def test_crashed_driver_is_replaced(factory):
+    pool = WebDriverPool(factory, size=1)
+
+    with pytest.raises(ValueError):
+        with pool.driver() as lease:
+            raise ValueError('page blew up')
+
+    assert lease['driver'].quit_calls == 1
+    assert pool.stats['crashed'] == 1
+    assert pool.checkout() is not lease['driver']
+
+
+def test_unhealthy_idle_driver_is_replaced_on_checkout(factory):
+    pool = WebDriverPool(factory, size=1)
+    stale = pool.checkout()
+    pool.checkin(stale)
+    stale.healthy = False
+
+    driver = pool.checkout()
+
+    assert driver is not stale
+    assert stale.quit_calls == 1
+    assert pool.stats['health_failures'] == 1
+    assert pool.status()['live'] == 1
+
+
+def test_failed_launch_backs_off(factory):
+    pool = WebDriverPool(factory, size=2, launch_backoff=0.2)
+    factory.failing = True
+
+    with pytest.raises(DriverUnavailable):
+        pool.checkout()
+    factory.failing = False
+    with pytest.raises(DriverUnavailable, match='Not retrying'):
+        pool.checkout()
+
+    status = pool.status()
+    assert status['factory_failures'] == 1
+    assert status['launch_backoffs'] == 1
+    assert status['live'] == 0
+    assert 'chrome not reachable' in status['last_launch_error']
+
+    time.sleep(0.25)
+    assert pool.checkout() is factory.drivers[0]
+    assert pool.status()['last_launch_error'] is None
+
+
+def test_backoff_does_not_block_idle_drivers(factory):
+    pool = WebDriverPool(factory, size=2, launch_backoff=60)
+    driver = pool.checkout()
+    pool.checkin(driver)
+    factory.failing = True
+
+    assert pool.checkout() is driver
+    with pytest.raises(DriverUnavailable):
+        pool.checkout()
+    with pytest.raises(DriverUnavailable, match='Not retrying'):
+        pool.checkout()
+
+
+def test_second_checkin_is_ignored(factory):
+    pool = WebDriverPool(factory, size=2)
+    driver = pool.checkout()
+
+    pool.checkin(driver)
+    pool.checkin(driver)
+
+    status = pool.status()
+    assert status['idle'] == 1
+    assert status['rejected_checkins'] == 1
+    assert pool.checkout() is driver
+    # The duplicate would otherwise have handed the same browser to a second caller
+    assert pool.checkout() is not driver
+
+
+def test_checkin_of_a_foreign_driver_is_ignored(factory):
+    pool = WebDriverPool(factory, size=1)
+
+    pool.checkin(FakeDriver(99))
+
+    assert pool.status()['idle'] == 0
+    assert pool.status()['rejected_checkins'] == 1
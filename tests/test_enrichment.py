@@ -0,0 +1,136 @@
+# test_enrichment.py - InstagramEnricher against a local HTTP server standing in for websites and Instagram
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip('requests')
+pytest.importorskip('bs4')
+
+from enrichment import InstagramEnricher  # noqa: E402
+from storage import PageCache  # noqa: E402
+
+SITE = '<html><body><a href="https://www.instagram.com/bluetokai/">Follow us</a></body></html>'
+PROFILE = ('<html><head><meta property="og:description" content="12.5K Followers, 80 Following, 300 Posts - '
+           'Blue Tokai on Instagram: &quot;Roasters since 2013&quot;"></head></html>')
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves a business site with an ETag and an Instagram profile page, counting requests"""
+
+    def do_GET(self):
+        server = self.server
+        server.requests[self.path] += 1
+        if self.path == '/site':
+            if server.etag and self.headers.get('If-None-Match') == server.etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.reply(SITE, etag=server.etag)
+        elif self.path == '/bluetokai/':
+            self.reply(PROFILE)
+        else:
+            self.send_error(404)
+
+    def reply(self, body, etag=None):
+        payload = body.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(payload)))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    httpd.requests = Counter()
+    httpd.etag = '"v1"'
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f'http://127.0.0.1:{httpd.server_address[1]}'
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_enricher(server, tmp_path, **kwargs):
+    return InstagramEnricher(max_workers=2, timeout=5, base_url=server.url,
+                             page_cache=PageCache(path=str(tmp_path / 'pages.sqlite3')), **kwargs)
+
+
+EXPECTED = {'instagram_handle': '@bluetokai', 'instagram_bio': 'Roasters since 2013', 'instagram_followers': '12.5K'}
+
+
+def test_stale_page_is_revalidated_with_its_etag(server, tmp_path):
+    enricher = make_enricher(server, tmp_path, page_max_age=0)
+    try:
+        assert enricher.lookup('Blue Tokai', f'{server.url}/site', search=False) == EXPECTED
+        assert enricher.lookup('Blue Tokai', f'{server.url}/site', search=False) == EXPECTED
+    finally:
+        enricher.shutdown()
+
+    assert server.requests['/site'] == 2
+    assert enricher.counters['pages_fetched'] == 1
+    assert enricher.counters['pages_not_modified'] == 1
+
+
+def test_unchanged_body_without_validators_is_not_reparsed(server, tmp_path):
+    server.etag = None
+    enricher = make_enricher(server, tmp_path, page_max_age=0)
+    try:
+        enricher.website_handles(f'{server.url}/site')
+        assert enricher.website_handles(f'{server.url}/site') == ['bluetokai']
+    finally:
+        enricher.shutdown()
+
+    assert enricher.counters['pages_fetched'] == 2
+    assert enricher.counters['pages_unchanged'] == 1
+
+
+def test_fresh_page_is_not_refetched(server, tmp_path):
+    enricher = make_enricher(server, tmp_path)
+    try:
+        handles = [enricher.website_handles(f'{server.url}/site') for _ in range(3)]
+    finally:
+        enricher.shutdown()
+
+    assert handles == [['bluetokai']] * 3
+    assert server.requests['/site'] == 1
+    assert enricher.counters['page_cache_hits'] == 2
+
+
+def test_fresh_lookups_fetch_nothing_again(server, tmp_path):
+    enricher = make_enricher(server, tmp_path)
+    try:
+        results = [enricher.lookup('Blue Tokai', f'{server.url}/site', search=False) for _ in range(3)]
+    finally:
+        enricher.shutdown()
+
+    assert results == [EXPECTED] * 3
+    # Both the website and the profile page come from the caches after the first lookup
+    assert server.requests == {'/site': 1, '/bluetokai/': 1}
+    assert enricher.counters['page_cache_hits'] == 2
+    assert enricher.counters['profile_cache_hits'] == 2
+
+
+def test_cached_profiles_are_copies_and_bounded(server, tmp_path):
+    enricher = make_enricher(server, tmp_path, profile_cache_size=1)
+    try:
+        first = enricher.profile('bluetokai')
+        first['instagram_bio'] = 'edited by caller'
+        assert enricher.profile('bluetokai') == EXPECTED
+        assert enricher.profile('missing') == {'instagram_handle': 'Not found', 'instagram_bio': 'Not found',
+                                               'instagram_followers': 'Not found'}
+        assert enricher.stats()['profile_cache']['entries'] == 1
+        enricher.profile('bluetokai')
+    finally:
+        enricher.shutdown()
+
+    assert server.requests['/bluetokai/'] == 2
@@ -0,0 +1,79 @@
+# test_result_cache.py - ResultCache freshness windows and LRU eviction
+import types
+
+import pytest
+
+import storage
+from storage import ResultCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Settable stand-in for time.time() inside storage"""
+    now = [1000.0]
+    monkeypatch.setattr(storage, 'time', types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def make_cache(tmp_path, **kwargs):
+    return ResultCache(path=str(tmp_path / 'cache.sqlite3'), **kwargs)
+
+
+def test_fresh_then_stale_then_expired(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl=100, stale_ttl=50)
+    cache.put('Pune', 'cafe', 10, [{'name': 'A'}])
+
+    clock[0] += 99
+    businesses, age, stale = cache.get('Pune', 'cafe', 10)
+    assert businesses == [{'name': 'A'}]
+    assert age == pytest.approx(99)
+    assert not stale
+
+    clock[0] += 2
+    assert cache.get('Pune', 'cafe', 10)[2]
+
+    clock[0] += 50
+    assert cache.get('Pune', 'cafe', 10) is None
+
+
+def test_key_is_normalized_query_and_limit(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.put('  Pune ', 'Coffee   Shop', 10, [{'name': 'A'}])
+
+    assert cache.get('pune', 'coffee shop', 10)[0] == [{'name': 'A'}]
+    assert cache.get('pune', 'coffee shop', 20) is None
+
+
+def test_put_replaces_entry_and_restarts_its_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl=100, stale_ttl=0)
+    cache.put('Pune', 'cafe', 10, [{'name': 'A'}])
+    clock[0] += 90
+    cache.put('Pune', 'cafe', 10, [{'name': 'B'}])
+    clock[0] += 90
+
+    businesses, age, stale = cache.get('Pune', 'cafe', 10)
+    assert businesses == [{'name': 'B'}]
+    assert age == pytest.approx(90)
+    assert not stale
+    assert cache.stats()['entries'] == 1
+
+
+def test_evicts_least_recently_used_past_max_bytes(tmp_path, clock):
+    businesses = [{'name': 'x' * 100}]
+    cache = make_cache(tmp_path)
+    cache.put('Pune', 'first', 10, businesses)
+    # Room for two entries, not three
+    cache.max_bytes = 2 * cache.stats()['bytes'] + 10
+
+    clock[0] += 1
+    cache.put('Pune', 'second', 10, businesses)
+    clock[0] += 1
+    # Reading 'first' makes 'second' the least recently used
+    assert cache.get('Pune', 'first', 10) is not None
+    clock[0] += 1
+    cache.put('Pune', 'third', 10, businesses)
+
+    assert cache.get('Pune', 'second', 10) is None
+    assert cache.get('Pune', 'first', 10) is not None
+    assert cache.get('Pune', 'third', 10) is not None
+    assert cache.stats()['bytes'] <= cache.max_bytes
@@ -0,0 +1,140 @@
+# test_result_store.py - ResultStore keyset paging, filters and the LIKE fallback for search
+import pytest
+
+from storage import ResultStore
+
+
+def make_businesses(count=230):
+    names = ['Cafe Mocha', 'bistro one', 'Cafe mocha', 'Zest Kitchen', 'alpha bakes']
+    return [{
+        'name': names[i % len(names)],
+        'phone': f"+91-98765-{i:05d}",
+        'website': 'Not found' if i % 3 == 0 else f"https://site{i}.com",
+        'instagram_handle': 'Not found' if i % 4 == 0 else f"@handle{i}",
+        'cid': str(i)
+    } for i in range(count)]
+
+
+@pytest.fixture(params=[True, False], ids=['fts', 'like'])
+def store(request, tmp_path, monkeypatch):
+    """A store with the trigram index, and one on a SQLite without it"""
+    if not request.param:
+        monkeypatch.setattr(ResultStore, '_create_search_index', lambda self, conn: False)
+    store = ResultStore(path=str(tmp_path / 'results.sqlite3'))
+    if request.param and not store.full_text:
+        pytest.skip('this SQLite has no FTS5 trigram tokenizer')
+    return store
+
+
+def page_all(store, result_id, page_size=40, **kwargs):
+    """Every row of a query, following cursors page by page"""
+    rows, cursor, pages = [], None, 0
+    while True:
+        page, cursor = store.query(result_id, limit=page_size, after=cursor, **kwargs)
+        rows += page
+        pages += 1
+        if cursor is None:
+            return rows, pages
+
+
+@pytest.mark.parametrize('sort, descending', [('position', False), ('position', True), ('name', False),
+                                              ('name', True)])
+def test_cursor_pages_cover_every_row_once_in_order(store, sort, descending):
+    businesses = make_businesses()
+    result_id = store.save(businesses, city='Pune', keyword='cafe')
+
+    rows, pages = page_all(store, result_id, sort=sort, descending=descending)
+
+    order = list(range(len(businesses)))
+    if sort == 'name':
+        order.sort(key=lambda i: (businesses[i]['name'].lower(), i))
+    if descending:
+        order.reverse()
+    assert rows == [businesses[i] for i in order]
+    assert pages == -(-len(businesses) // 40)
+
+
+def test_filters_apply_to_pages_and_counts(store):
+    businesses = make_businesses()
+    result_id = store.save(businesses)
+
+    rows, _ = page_all(store, result_id, no_website=True, no_instagram=True)
+
+    expected = [b for b in businesses if b['website'] == 'Not found' and b['instagram_handle'] == 'Not found']
+    assert rows == expected
+    assert store.count(result_id, no_website=True, no_instagram=True) == len(expected)
+    assert store.summary(result_id) == {'total': len(businesses),
+                                        'with_website': sum(b['website'] != 'Not found' for b in businesses),
+                                        'with_instagram': sum(b['instagram_handle'] != 'Not found'
+                                                              for b in businesses)}
+
+
+@pytest.mark.parametrize('search', ['mocha', 'CAFE', 'ze', '98765-00012'])
+def test_search_matches_name_or_phone_case_insensitively(store, search):
+    businesses = make_businesses()
+    result_id = store.save(businesses)
+
+    rows, _ = page_all(store, result_id, search=search, sort='name')
+
+    expected = [b for b in businesses if search.lower() in b['name'].lower() or search in b['phone']]
+    assert sorted(b['cid'] for b in rows) == sorted(b['cid'] for b in expected)
+    assert store.count(result_id, search=search) == len(expected)
+
+
+def test_search_ignores_other_result_sets(store):
+    first = store.save(make_businesses(10))
+    store.save(make_businesses(10))
+
+    assert store.count(first, search='mocha') == 4
+
+
+def test_full_text_search_matches_phone_digits_across_formatting(tmp_path):
+    store = ResultStore(path=str(tmp_path / 'results.sqlite3'))
+    if not store.full_text:
+        pytest.skip('this SQLite has no FTS5 trigram tokenizer')
+    result_id = store.save(make_businesses(20))
+
+    rows, _ = store.query(result_id, search='98765 00012')
+    assert [row['cid'] for row in rows] == ['12']
+
+
+@pytest.mark.parametrize('sort, after', [('name', [1]), ('position', ['Cafe', 1]), ('name', ['Cafe', '1']),
+                                         ('position', [True]), ('position', [])])
+def test_cursor_of_another_sort_is_rejected(tmp_path, sort, after):
+    store = ResultStore(path=str(tmp_path / 'results.sqlite3'))
+    result_id = store.save(make_businesses(5))
+
+    with pytest.raises(ValueError):
+        store.query(result_id, sort=sort, after=after)
+
+
+@pytest.mark.parametrize('query', ['cursor=WzFd&sort=name', 'cursor=WyJhIiwgMV0=', 'cursor=not-base64!',
+                                   'cursor=e30=', 'sort=name&cursor=WyJhIiwgIjEiXQ=='])
+def test_results_endpoint_answers_bad_cursors_with_400(tmp_path, monkeypatch, query):
+    app = pytest.importorskip('app')
+    store = ResultStore(path=str(tmp_path / 'results.sqlite3'))
+    monkeypatch.setattr(app, 'result_store', store)
+    result_id = store.save(make_businesses(5))
+
+    response = app.app.test_client().get(f'/results/{result_id}?{query}')
+
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_results_endpoint_cursors_follow_their_sort(tmp_path, monkeypatch):
+    app = pytest.importorskip('app')
+    store = ResultStore(path=str(tmp_path / 'results.sqlite3'))
+    monkeypatch.setattr(app, 'result_store', store)
+    businesses = make_businesses(7)
+    result_id = store.save(businesses)
+    client = app.app.test_client()
+
+    names, cursor = [], None
+    while True:
+        page = client.get(f'/results/{result_id}?sort=name&limit=3' + (f'&cursor={cursor}' if cursor else '')).get_json()
+        names += [business['name'] for business in page['businesses']]
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert names == sorted((b['name'] for b in businesses), key=str.lower)
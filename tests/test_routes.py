@@ -0,0 +1,97 @@
+import pytest
+
+
+@pytest.fixture
+def client():
+    app = pytest.importorskip('app')
+    return app.app.test_client()
+
+
+@pytest.mark.parametrize('payload', [
+    {'city': 'Austin', 'keyword': 'coffee', 'limit': 'ten'},
+    {'city': 'Austin', 'keyword': 'coffee', 'limit': [5]},
+    {'city': 'Austin', 'keyword': 'coffee', 'budget': 'soon'},
+    {'city': 'Austin', 'keyword': 'coffee', 'budget': 'nan'},
+    {'city': ['Austin'], 'keyword': 'coffee'},
+])
+@pytest.mark.parametrize('path', ['/scrape', '/jobs'])
+def test_scrape_routes_reject_malformed_params(client, path, payload):
+    response = client.post(path, json=payload)
+
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+@pytest.mark.parametrize('query', ['limit=abc', 'budget=1e', 'limit=2.5'])
+def test_stream_rejects_malformed_params(client, query):
+    response = client.get(f'/scrape/stream?city=Austin&keyword=coffee&{query}')
+
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+@pytest.mark.parametrize('field', ['limit', 'workers'])
+def test_batch_rejects_malformed_numbers(client, field):
+    response = client.post('/batch', json={'cities': ['Austin'], 'keywords': ['coffee'], field: 'many'})
+
+    assert response.status_code == 400
+    assert field in response.get_json()['error']
+
+
+@pytest.mark.parametrize('extra', [
+    {'rows': 'x'}, {'cols': 'y'}, {'limit': '1,000'}, {'workers': {}},
+    {'bounds': ['a', 'b', 'c', 'd']}, {'bounds': 'abcd'}, {'bounds': 5}, {'bounds': [1, 2, 0, 3]},
+])
+def test_tiles_rejects_malformed_params(client, extra):
+    response = client.post('/tiles', json={'city': 'Austin', 'keyword': 'coffee', **extra})
+
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+@pytest.fixture
+def stored_client(tmp_path, monkeypatch):
+    app = pytest.importorskip('app')
+    from storage import ResultStore
+    monkeypatch.setattr(app, 'result_store', ResultStore(path=str(tmp_path / 'results.sqlite3')))
+    return app.app.test_client()
+
+
+def test_received_rows_are_stored_for_export(stored_client):
+    # Far more than fits in a request line, which is why the rows travel in the body
+    businesses = [{'name': f'Cafe {i}', 'phone': f'+1 512 555 {i:04d}', 'website': 'Not found',
+                   'instagram_handle': 'Not found', 'notes': 'x' * 200} for i in range(200)]
+
+    response = stored_client.post('/results', json={'businesses': businesses, 'city': 'Austin', 'keyword': 'cafe'})
+
+    assert response.status_code == 201
+    result_id = response.get_json()['result_id']
+    export = stored_client.get(f'/export/{result_id}?format=csv')
+    assert export.status_code == 200
+    lines = export.get_data(as_text=True).strip().splitlines()
+    assert len(lines) == 1 + len(businesses)
+    assert 'Cafe 199' in lines[-1]
+
+
+@pytest.mark.parametrize('payload', [{}, {'businesses': []}, {'businesses': 'rows'}, {'businesses': [1, 2]},
+                                     {'businesses': [{'name': 'a'}], 'city': 5}])
+def test_storing_rows_rejects_malformed_payloads(stored_client, payload):
+    response = stored_client.post('/results', json=payload)
+
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+@pytest.mark.parametrize('payload', [
+    {'cities': 'Austin', 'keywords': ['coffee']},
+    {'cities': ['Austin'], 'keywords': 'coffee'},
+    {'cities': ['Austin', 5], 'keywords': ['coffee']},
+    {'cities': ['Austin'], 'keywords': [None]},
+    {'cities': {'Austin': 1}, 'keywords': ['coffee']},
+    {'cities': ['  '], 'keywords': ['coffee']},
+])
+def test_batch_requires_lists_of_strings(client, payload):
+    response = client.post('/batch', json=payload)
+
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
@@ -0,0 +1,111 @@
+# test_scraping.py - Scrapes against ReplayDriver fixtures of Maps result pages
+import time
+
+import pytest
+
+pytest.importorskip('selenium')
+pytest.importorskip('bs4')
+
+import app  # noqa: E402
+from replay_driver import ReplayDriver, make_fixture, make_places, render_fixture  # noqa: E402
+
+
+def scrape(fixture, limit, mode, **kwargs):
+    """Businesses scraped from ``fixture`` and the drivers used"""
+    drivers = []
+
+    def factory():
+        drivers.append(ReplayDriver(fixture, **kwargs))
+        return drivers[-1]
+
+    analyzer = app.BusinessAnalyzer(driver_factory=factory, pool_size=1)
+    try:
+        return analyzer.scrape_google_maps_businesses('Pune', 'cafe', limit, mode=mode), drivers
+    finally:
+        analyzer.cleanup()
+
+
+@pytest.mark.parametrize('mode', ['click', 'bulk'])
+def test_neighbours_sharing_a_name_each_get_their_own_details(monkeypatch, mode):
+    monkeypatch.setattr(app, 'DETAIL_READY_TIMEOUT', 2)
+    # No card shows a phone, so every listing is opened
+    places = make_places(6, missing_phone=1.0)
+    for place in places[1:4]:
+        place['name'] = 'Starbucks Coffee'
+
+    started = time.monotonic()
+    businesses, _ = scrape(render_fixture(places), 6, mode)
+
+    assert [(b['name'], b['phone'], b['cid']) for b in businesses] == \
+        [(p['name'], p['phone'], p['cid']) for p in places]
+    # None of them waited out the detail panel timeout
+    assert time.monotonic() - started < app.DETAIL_READY_TIMEOUT
+
+
+def expected_card(place):
+    """What a result card for ``place`` shows without opening its detail panel"""
+    return {'name': place['name'], 'phone': place['phone'] if place['card_phone'] else 'Not found',
+            'website': place['website'] or 'Not found', 'cid': place['cid']}
+
+
+def test_cards_parse_from_feed_html():
+    places = make_places(25)
+    driver = ReplayDriver(render_fixture(places))
+    analyzer = app.BusinessAnalyzer(driver_factory=lambda: driver, pool_size=1)
+
+    page = driver.execute_script(app.FEED_SCROLL_SCRIPT, app.FEED_CARD_SELECTOR, 0, app.FEED_END_SELECTOR, True)
+    cards = [analyzer.parse_card_html(html, index) for index, html in page['cards']]
+
+    assert page['end']
+    assert [card['index'] for card in cards] == list(range(len(places)))
+    assert [{key: card[key] for key in ('name', 'phone', 'website', 'cid')} for card in cards] == \
+        [expected_card(place) for place in places]
+    assert analyzer.parse_card_html('<div class="Nv2PK">Sponsored</div>', 0) is None
+
+
+def test_bulk_mode_clicks_only_cards_missing_fields():
+    places = make_places(20)
+    fixture = render_fixture(places)
+    missing = sum(not place['card_phone'] for place in places)
+
+    bulk, (bulk_driver,) = scrape(fixture, 20, 'bulk')
+    _, (click_driver,) = scrape(fixture, 20, 'click')
+
+    # Opened cards take the phone from their detail panel
+    assert [(b['name'], b['phone'], b['website'], b['cid']) for b in bulk] == \
+        [(p['name'], p['phone'], p['website'] or 'Not found', p['cid']) for p in places]
+    assert bulk_driver.calls['click'] == missing < click_driver.calls['click'] == 20
+    assert sum(bulk_driver.calls.values()) * 2 < sum(click_driver.calls.values())
+
+
+def test_bulk_mode_needs_no_clicks_when_cards_are_complete():
+    _, (driver,) = scrape(make_fixture(30, missing_phone=0.0), 30, 'bulk')
+
+    assert driver.calls['click'] == 0
+    # One scroll returns the whole feed; no per-card lookups
+    assert driver.calls['execute_script'] <= 2
+    assert driver.calls['find_elements'] <= 1
+
+
+def open_panel(driver, index):
+    driver.find_elements(app.By.CSS_SELECTOR, app.FEED_CARD_SELECTOR)[index].click()
+    driver.calls.clear()
+
+
+def test_detail_script_reads_a_panel_in_one_round_trip():
+    places = make_places(8, missing_website=0.5)
+    driver = ReplayDriver(render_fixture(places))
+    analyzer = app.BusinessAnalyzer(driver_factory=lambda: driver, pool_size=1)
+
+    for index, place in enumerate(places):
+        open_panel(driver, index)
+        details = analyzer.extract_business_details(driver, mode='script')
+        assert dict(driver.calls) == {'execute_script': 1}
+
+        open_panel(driver, index)
+        assert analyzer.extract_business_details(driver, mode='selectors') == details
+        assert driver.calls['find_elements'] >= 3  # at least one per cascade
+
+        # Cards in the feed show other places' websites; a panel without one must not borrow theirs
+        assert (details['name'], details['phone'], details['website']) == \
+            (place['name'], place['phone'], place['website'] or 'Not found')
@@ -0,0 +1,81 @@
+# test_search_delta.py - SearchDelta over two snapshots of the same generated search
+import pytest
+
+pytest.importorskip('selenium')
+pytest.importorskip('bs4')
+
+import app  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+from replay_driver import churn_places, make_places, render_fixture  # noqa: E402
+
+
+def feed_cards(places):
+    """Parsed result cards of a results page showing ``places``"""
+    analyzer = app.BusinessAnalyzer(driver_factory=lambda: None, pool_size=1)
+    soup = BeautifulSoup(render_fixture(places)['results'], 'lxml')
+    return [analyzer._parse_card(anchor, index) for index, anchor in enumerate(soup.select(app.FEED_CARD_SELECTOR))]
+
+
+def run(previous, places, limit):
+    """One delta run over ``places``; returns the delta and the snapshot it leaves behind"""
+    by_cid = {place['cid']: place for place in places}
+    delta = app.SearchDelta(previous)
+    statuses = {}
+    for card in feed_cards(places)[:limit]:
+        statuses[card['cid']] = delta.check(card)
+        if statuses[card['cid']] == 'unchanged':
+            business = delta.previous_business(card['cid'])
+        else:
+            place = by_cid[card['cid']]
+            business = {'name': place['name'], 'phone': place['phone'], 'website': place['website'] or 'Not found',
+                        'cid': card['cid']}
+        delta.record(business)
+    snapshot = {cid: {'position': position, 'fingerprint': fingerprint, 'business': business}
+                for cid, position, fingerprint, business in delta.entries()}
+    return delta, statuses, snapshot
+
+
+def test_second_snapshot_reports_added_changed_and_removed():
+    places = make_places(100)
+    first, statuses, snapshot = run({}, places, limit=200)
+    assert set(statuses.values()) == {'added'}
+    assert first.changes(200)['baseline'] is False
+
+    later, truth = churn_places(places, changed=0.1, removed=0.05, added=0.05)
+    second, statuses, _ = run(snapshot, later, limit=200)
+    changes = second.changes(200)
+
+    assert changes['baseline'] is True
+    assert {entry['cid'] for entry in changes['added']} == truth['added']
+    assert {entry['cid'] for entry in changes['changed']} == truth['changed']
+    assert {entry['cid'] for entry in changes['removed']} == truth['removed']
+    assert changes['unchanged'] == len(later) - len(truth['added']) - len(truth['changed'])
+    # churn_places gives every changed place a new phone
+    assert all('phone' in entry['fields'] for entry in changes['changed'])
+    assert {cid for cid, status in statuses.items() if status == 'unchanged'} == \
+        {place['cid'] for place in later} - truth['added'] - truth['changed']
+
+
+def test_unchanged_cards_are_reused_from_the_snapshot():
+    places = make_places(20)
+    _, _, snapshot = run({}, places, limit=20)
+    later, truth = churn_places(places, changed=0.2, removed=0, added=0)
+
+    delta, _, _ = run(snapshot, later, limit=20)
+
+    reused = {cid for cid, business in delta.businesses.items() if delta.reused(business)}
+    assert reused == {place['cid'] for place in later} - truth['changed']
+    assert not delta.reused({'cid': None, 'name': 'No place id'})
+
+
+def test_places_past_the_limit_are_not_reported_removed():
+    places = make_places(30)
+    _, _, snapshot = run({}, places, limit=30)
+
+    # Only the first ten cards are read, so the other twenty are just unseen
+    delta, _, _ = run(snapshot, places, limit=10)
+    assert delta.changes(10)['removed'] == []
+
+    # A place that ranked inside the limit and is gone now was removed
+    delta, _, _ = run(snapshot, places[1:], limit=10)
+    assert [entry['cid'] for entry in delta.changes(10)['removed']] == [places[0]['cid']]
@@ -0,0 +1,56 @@
+# test_workers.py - WorkerSupervisor job timeouts, kills and replacement workers
+import time
+
+import pytest
+
+from workers import WorkerSupervisor, WorkerTimeout, WorkerError
+
+
+class SleepyHandler:
+    """Emits ``count`` businesses, then sleeps ``hang`` seconds without checking for cancellation"""
+
+    def run(self, task, emit, cancel_event):
+        for i in range(task.get('count', 0)):
+            emit('business', {'name': f"Business {i}"})
+        if task.get('fail'):
+            raise ValueError('no results feed')
+        time.sleep(task.get('hang', 0))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def supervisor():
+    supervisor = WorkerSupervisor(SleepyHandler, size=1, max_rss=None, check_interval=60, stop_grace=2)
+    yield supervisor
+    supervisor.close()
+
+
+def test_job_past_its_timeout_is_killed_and_the_worker_replaced(supervisor):
+    received = []
+    started = time.monotonic()
+    with pytest.raises(WorkerTimeout):
+        for message in supervisor.run({'count': 2, 'hang': 60}, timeout=1.5):
+            received.append(message)
+
+    assert time.monotonic() - started < 15
+    assert [kind for kind, _ in received] == ['business', 'business']
+    status = supervisor.status()
+    assert status['killed_timeout'] == 1
+    assert status['live'] == 0
+
+    assert list(supervisor.run({'count': 1}, timeout=30)) == [('business', {'name': 'Business 0'})]
+    assert supervisor.status()['started'] == 2
+
+
+def test_completed_and_failed_jobs_keep_their_worker(supervisor):
+    assert len(list(supervisor.run({'count': 3}, timeout=30))) == 3
+    with pytest.raises(WorkerError, match='no results feed'):
+        list(supervisor.run({'fail': True}, timeout=30))
+    assert len(list(supervisor.run({'count': 1}, timeout=30))) == 1
+
+    status = supervisor.status()
+    assert status['started'] == 1
+    assert status['jobs'] == 3
+    assert status['killed_timeout'] == 0
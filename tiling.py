@@ -0,0 +1,133 @@
+# tiling.py - Split a city into a grid of map viewports searched as separate sub-queries
+import math
+import threading
+import logging
+
+import requests
+
+from batch import BatchRunner
+
+logger = logging.getLogger(__name__)
+
+# Browser viewport in pixels (matches --window-size in BusinessAnalyzer.setup_selenium)
+VIEWPORT_WIDTH = 1920
+VIEWPORT_HEIGHT = 1080
+# Web Mercator tiles are 256px wide; zooms outside this range stop being useful searches
+MIN_ZOOM = 10
+MAX_ZOOM = 18
+
+GEOCODE_URL = 'https://nominatim.openstreetmap.org/search'
+GEOCODE_USER_AGENT = 'Application-Analyzer/1.0 (business tiling)'
+
+
+class GeocodeUnavailable(Exception):
+    """Raised when a city's bounding box cannot be looked up"""
+
+
+def viewport_zoom(lat, lat_span, lng_span):
+    """Largest zoom at which a VIEWPORT_WIDTH x VIEWPORT_HEIGHT map still shows the whole span"""
+    lng_zoom = math.log2(VIEWPORT_WIDTH * 360 / (256 * max(lng_span, 1e-6)))
+    lat_zoom = math.log2(VIEWPORT_HEIGHT * 360 * math.cos(math.radians(lat)) / (256 * max(lat_span, 1e-6)))
+    return round(min(max(min(lng_zoom, lat_zoom), MIN_ZOOM), MAX_ZOOM), 2)
+
+
+def viewport_bounds(lat, lng, zoom):
+    """(south, west, north, east) shown by a map centred on lat/lng at ``zoom``"""
+    lng_span = VIEWPORT_WIDTH * 360 / (256 * 2 ** zoom)
+    lat_span = VIEWPORT_HEIGHT * 360 * math.cos(math.radians(lat)) / (256 * 2 ** zoom)
+    return lat - lat_span / 2, lng - lng_span / 2, lat + lat_span / 2, lng + lng_span / 2
+
+
+def split_bounds(bounds, rows, cols):
+    """Grid of tiles covering (south, west, north, east), row by row from the south-west corner"""
+    south, west, north, east = bounds
+    lat_step = (north - south) / rows
+    lng_step = (east - west) / cols
+    tiles = []
+    for row in range(rows):
+        for col in range(cols):
+            lat = south + (row + 0.5) * lat_step
+            lng = west + (col + 0.5) * lng_step
+            tiles.append({
+                'row': row,
+                'col': col,
+                'lat': round(lat, 6),
+                'lng': round(lng, 6),
+                'zoom': viewport_zoom(lat, lat_step, lng_step)
+            })
+    return tiles
+
+
+def tile_label(city, tile):
+    return f"{city} [{tile['row']},{tile['col']}]"
+
+
+class Geocoder:
+    """City name -> bounding box through a Nominatim-compatible API, cached per process"""
+
+    def __init__(self, url=GEOCODE_URL, timeout=10, session=None):
+        self.url = url
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.session.headers.setdefault('User-Agent', GEOCODE_USER_AGENT)
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def bounds(self, city):
+        """(south, west, north, east) of ``city``; raises GeocodeUnavailable"""
+        key = ' '.join(city.lower().split())
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+
+        try:
+            response = self.session.get(self.url, params={'q': city, 'format': 'json', 'limit': 1},
+                                        timeout=self.timeout)
+            response.raise_for_status()
+            places = response.json()
+        except Exception as e:
+            raise GeocodeUnavailable(f"Geocoding '{city}' failed: {e}")
+        if not places or 'boundingbox' not in places[0]:
+            raise GeocodeUnavailable(f"No bounding box found for '{city}'")
+
+        # Nominatim orders the box as [south, north, west, east]
+        south, north, west, east = (float(value) for value in places[0]['boundingbox'])
+        bounds = (south, west, north, east)
+        with self._lock:
+            self._cache[key] = bounds
+        return bounds
+
+
+class TiledSearch:
+    """Runs one keyword over a rows x cols grid of viewports and merges the results
+
+    ``scrape_tile(tile, keyword, limit)`` returns a list of businesses for one
+    viewport. Tiles are scheduled with BatchRunner, so they share its worker
+    bound, rate limiting, retries and merging by business_key: place id, else
+    normalized phone, else name.
+    """
+
+    def __init__(self, scrape_tile, workers=2, rate_limiter=None, retries=2):
+        self.scrape_tile = scrape_tile
+        self.workers = workers
+        self.rate_limiter = rate_limiter
+        self.retries = retries
+
+    def run(self, city, keyword, bounds, rows=3, cols=3, limit=120, on_tile_done=None, cancel_event=None):
+        """Search every tile; ``on_tile_done(summary, new_businesses)`` fires as each finishes"""
+        tiles = {tile_label(city, tile): tile for tile in split_bounds(bounds, rows, cols)}
+        logger.info(f"Tiling '{keyword}' in '{city}' into {rows}x{cols} viewports")
+
+        def scrape_query(label, query_keyword, query_limit):
+            return self.scrape_tile(tiles[label], query_keyword, query_limit)
+
+        def on_query_done(summary, new_businesses):
+            summary.update(tiles[summary['city']])
+            if on_tile_done:
+                on_tile_done(summary, new_businesses)
+
+        runner = BatchRunner(scrape_query, workers=self.workers, rate_limiter=self.rate_limiter,
+                             retries=self.retries)
+        result = runner.run(list(tiles), [keyword], limit, on_query_done=on_query_done, cancel_event=cancel_event)
+        result['tiles'] = len(tiles)
+        return result
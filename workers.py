@@ -0,0 +1,461 @@
+# workers.py - Supervised worker processes that run scrapes away from the web process
+import os
+import time
+import signal
+import logging
+import threading
+import multiprocessing
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerError(Exception):
+    """Raised when a job ends without the worker reporting it done"""
+
+
+class WorkerTimeout(WorkerError):
+    """The job outlived its hard timeout and the worker was killed"""
+
+
+class WorkerCrashed(WorkerError):
+    """The worker process died, or was killed for memory, while running the job"""
+
+
+def process_tree_rss(pid):
+    """Resident memory of ``pid`` and all its descendants in bytes, or None without /proc"""
+    if not os.path.isdir('/proc'):
+        return None
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        pending.extend(children.get(current, []))
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+        except OSError:
+            continue
+    return total
+
+
+def _exit_on_signal(signum, frame):
+    raise SystemExit(128 + signum)
+
+
+def _worker_main(handler_factory, conn, cancel_event):
+    """Child process loop: run each task received on ``conn`` until told to stop"""
+    if hasattr(os, 'setpgrp'):
+        # Browsers started by this worker join its process group, so a kill takes them too
+        os.setpgrp()
+    signal.signal(signal.SIGTERM, _exit_on_signal)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    def emit(kind, payload):
+        conn.send((kind, payload))
+
+    handler = None
+    try:
+        handler = handler_factory()
+        while True:
+            task = conn.recv()
+            if task is None:
+                break
+            try:
+                handler.run(task, emit, cancel_event)
+                emit('done', None)
+            except Exception as e:
+                emit('error', f"{type(e).__name__}: {e}")
+    except EOFError:
+        # The supervisor went away
+        pass
+    finally:
+        if handler is not None:
+            handler.close()
+
+
+class Worker:
+    """Supervisor-side handle of one worker process"""
+
+    def __init__(self, process, conn, cancel_event):
+        self.process = process
+        self.conn = conn
+        self.cancel_event = cancel_event
+        self.jobs = 0
+        self.rss = None
+        self.busy = False
+        self.recycle = None  # reason to retire once the current job ends
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    def kill(self, close=True):
+        """SIGKILL the worker and everything in its process group"""
+        try:
+            if hasattr(os, 'killpg'):
+                os.killpg(self.pid, signal.SIGKILL)
+            else:
+                self.process.kill()
+        except (ProcessLookupError, PermissionError, OSError):
+            self.process.kill()
+        self.process.join(5)
+        if close:
+            self.conn.close()
+
+    def stop(self, grace):
+        """Ask the worker to exit (closing its browsers), escalating to SIGTERM and SIGKILL"""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(grace)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(grace)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class WorkerSupervisor:
+    """Bounded set of worker processes, each running one job at a time
+
+    Each worker calls the picklable ``handler_factory`` once and then
+    ``handler.run(task, emit, cancel_event)`` per job; ``handler.close()``
+    runs when it exits, including on SIGTERM. Workers start on demand, up to
+    ``size``. The supervisor kills a worker whose job outlives its timeout
+    or whose process tree grows past ``hard_rss``. It retires a worker after
+    ``max_jobs`` jobs, or once it passes ``max_rss`` bytes, and starts
+    replacements in the background so capacity stays up.
+    """
+
+    def __init__(self, handler_factory, size=2, max_rss=1024 * 2 ** 20, hard_rss=None, max_jobs=200,
+                 check_interval=5.0, stop_grace=10.0, checkout_timeout=120, start_method='spawn'):
+        self.handler_factory = handler_factory
+        self.size = max(1, int(size))
+        self.max_rss = max_rss
+        self.hard_rss = hard_rss or (2 * max_rss if max_rss else None)
+        self.max_jobs = max_jobs
+        self.check_interval = check_interval
+        self.stop_grace = stop_grace
+        self.checkout_timeout = checkout_timeout
+        self._mp = multiprocessing.get_context(start_method)
+
+        self._cond = threading.Condition()
+        self._idle = []
+        self._workers = set()
+        self._starting = 0
+        self._wanted = 0  # workers to keep running: the most that have been in use at once
+        self._closed = False
+        self._watchdog = None
+        self._stopping = threading.Event()
+
+        self.stats = {
+            'started': 0,
+            'jobs': 0,
+            'failed_starts': 0,
+            'recycled_jobs': 0,
+            'recycled_rss': 0,
+            'killed_rss': 0,
+            'killed_timeout': 0,
+            'crashed': 0,
+            'exited': 0,
+            'waits': 0
+        }
+
+    def _spawn(self):
+        """Start one worker process (slot already reserved in ``_starting``)"""
+        try:
+            parent_conn, child_conn = self._mp.Pipe()
+            cancel_event = self._mp.Event()
+            process = self._mp.Process(target=_worker_main, args=(self.handler_factory, child_conn, cancel_event),
+                                       name='scrape-worker', daemon=True)
+            process.start()
+            child_conn.close()
+            worker = Worker(process, parent_conn, cancel_event)
+        except Exception as e:
+            logger.error(f"Could not start worker process: {e}")
+            with self._cond:
+                self._starting -= 1
+                self.stats['failed_starts'] += 1
+                self._cond.notify()
+            return None
+
+        with self._cond:
+            self._starting -= 1
+            self._workers.add(worker)
+            self.stats['started'] += 1
+        logger.info(f"Started scrape worker pid={worker.pid}")
+        self._ensure_watchdog()
+        return worker
+
+    def _ensure_watchdog(self):
+        with self._cond:
+            if self._watchdog is not None or self._closed:
+                return
+            self._watchdog = threading.Thread(target=self._watch, name='worker-watchdog', daemon=True)
+        self._watchdog.start()
+
+    def _forget(self, worker):
+        with self._cond:
+            self._workers.discard(worker)
+            if worker in self._idle:
+                self._idle.remove(worker)
+            self._cond.notify()
+
+    def _retire(self, worker, reason):
+        """Stop a worker in the background; the watchdog starts its replacement"""
+        logger.info(f"Retiring scrape worker pid={worker.pid} ({reason})")
+        self._forget(worker)
+        threading.Thread(target=worker.stop, args=(self.stop_grace,), name='worker-stop', daemon=True).start()
+
+    def _kill(self, worker, stat, close=True):
+        with self._cond:
+            self.stats[stat] += 1
+        self._forget(worker)
+        # A job still reading from the pipe closes it once it sees the worker gone
+        worker.kill(close=close)
+
+    def checkout(self, timeout=None):
+        """Reserve an idle worker, starting one if below ``size``; raises WorkerError"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while not self._idle and len(self._workers) + self._starting >= self.size:
+                    if self._closed:
+                        raise WorkerError("Worker supervisor is closed")
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise WorkerError(f"No scrape worker available after {timeout}s")
+                    self.stats['waits'] += 1
+                    self._cond.wait(remaining)
+                if self._closed:
+                    raise WorkerError("Worker supervisor is closed")
+                if self._idle:
+                    worker = self._idle.pop()
+                else:
+                    self._starting += 1
+                    worker = None
+                busy = len(self._workers) + self._starting - len(self._idle)
+                self._wanted = max(self._wanted, busy)
+
+            if worker is None:
+                worker = self._spawn()
+                if worker is None:
+                    raise WorkerError("Could not start a scrape worker")
+            elif not worker.process.is_alive():
+                with self._cond:
+                    self.stats['crashed'] += 1
+                self._forget(worker)
+                continue
+
+            worker.busy = True
+            worker.cancel_event.clear()
+            return worker
+
+    def checkin(self, worker):
+        """Return a worker after a completed job, retiring it if it is due"""
+        worker.busy = False
+        worker.jobs += 1
+        with self._cond:
+            self.stats['jobs'] += 1
+            closed = self._closed
+        if self.max_jobs and worker.jobs >= self.max_jobs and not worker.recycle:
+            worker.recycle = f"{worker.jobs} jobs"
+            with self._cond:
+                self.stats['recycled_jobs'] += 1
+        if closed or worker.recycle:
+            self._retire(worker, 'supervisor closed' if closed else worker.recycle)
+            return
+        with self._cond:
+            self._idle.append(worker)
+            self._cond.notify()
+
+    def run(self, task, timeout, cancel_event=None):
+        """Run ``task`` on a worker, yielding the (kind, payload) messages it emits
+
+        Raises WorkerTimeout once ``timeout`` seconds pass (the worker is
+        killed), WorkerCrashed if the worker dies, and WorkerError if the job
+        raised. Setting ``cancel_event`` or closing the generator cancels the
+        job in the worker.
+        """
+        worker = self.checkout(min(timeout, self.checkout_timeout))
+        deadline = time.monotonic() + timeout
+        finished = False
+        try:
+            worker.conn.send(task)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.error(f"Scrape worker pid={worker.pid} exceeded {timeout:.0f}s, killing it")
+                    self._kill(worker, 'killed_timeout')
+                    raise WorkerTimeout(f"Job exceeded {timeout:.0f}s")
+                if cancel_event is not None and cancel_event.is_set():
+                    worker.cancel_event.set()
+                try:
+                    if not worker.conn.poll(min(remaining, 0.2)):
+                        if worker.process.is_alive():
+                            continue
+                        raise EOFError
+                    kind, payload = worker.conn.recv()
+                except (EOFError, OSError):
+                    raise self._crashed(worker)
+                if kind == 'done':
+                    finished = True
+                    return
+                if kind == 'error':
+                    finished = True
+                    raise WorkerError(payload)
+                yield kind, payload
+        finally:
+            if finished:
+                self.checkin(worker)
+            elif worker in self._workers and worker.process.is_alive():
+                # Closed early: cancel the job and wait for the worker to wind down
+                self._drain(worker)
+
+    def _crashed(self, worker):
+        reason = worker.recycle if worker.recycle and worker.recycle.startswith('killed') else None
+        if not reason:
+            with self._cond:
+                self.stats['crashed'] += 1
+            worker.process.join(1)
+            reason = f"exit code {worker.process.exitcode}"
+        logger.error(f"Scrape worker pid={worker.pid} died during a job ({reason})")
+        self._forget(worker)
+        worker.conn.close()
+        return WorkerCrashed(f"Scrape worker died ({reason})")
+
+    def _drain(self, worker):
+        worker.cancel_event.set()
+        deadline = time.monotonic() + self.stop_grace
+        try:
+            while time.monotonic() < deadline:
+                if worker.conn.poll(0.2):
+                    kind, _ = worker.conn.recv()
+                    if kind in ('done', 'error'):
+                        self.checkin(worker)
+                        return
+                elif not worker.process.is_alive():
+                    break
+        except (EOFError, OSError):
+            pass
+        if worker.process.is_alive():
+            self._kill(worker, 'killed_timeout')
+            return
+        # Exited on its own while winding down (e.g. told to stop by close())
+        with self._cond:
+            self.stats['exited'] += 1
+        self._forget(worker)
+        worker.conn.close()
+
+    def _watch(self):
+        """Watchdog: recycle workers over the RSS limits and top capacity back up"""
+        while not self._stopping.wait(self.check_interval):
+            with self._cond:
+                workers = list(self._workers)
+
+            for worker in workers:
+                if not worker.process.is_alive():
+                    if not worker.busy:
+                        with self._cond:
+                            self.stats['crashed'] += 1
+                        logger.warning(f"Idle scrape worker pid={worker.pid} exited "
+                                       f"(exit code {worker.process.exitcode})")
+                        self._forget(worker)
+                    continue
+                worker.rss = process_tree_rss(worker.pid)
+                if worker.rss is None or not self.max_rss:
+                    continue
+                if worker.busy and self.hard_rss and worker.rss >= self.hard_rss:
+                    logger.error(f"Scrape worker pid={worker.pid} reached {worker.rss / 2 ** 20:.0f} MiB, killing it")
+                    worker.recycle = 'killed over the hard RSS limit'
+                    self._kill(worker, 'killed_rss', close=False)
+                elif worker.rss >= self.max_rss and not worker.recycle:
+                    worker.recycle = f"RSS {worker.rss / 2 ** 20:.0f} MiB"
+                    with self._cond:
+                        self.stats['recycled_rss'] += 1
+                        idle = worker in self._idle
+                    if idle:
+                        self._retire(worker, worker.recycle)
+
+            self._top_up()
+
+    def _top_up(self):
+        """Restart workers lost to recycling or crashes, up to the demand seen so far"""
+        while True:
+            with self._cond:
+                if self._closed or len(self._workers) + self._starting >= min(self._wanted, self.size):
+                    return
+                self._starting += 1
+            worker = self._spawn()
+            if worker is None:
+                return
+            with self._cond:
+                self._idle.append(worker)
+                self._cond.notify()
+
+    def warm_up_async(self, count=1):
+        """Start up to ``count`` workers on a daemon thread"""
+        with self._cond:
+            self._wanted = max(self._wanted, min(count, self.size))
+        thread = threading.Thread(target=self._top_up, name='worker-prewarm', daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        """Stop every worker; busy ones are retired as their jobs end or are killed after ``stop_grace``"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._stopping.set()
+            idle, self._idle = self._idle, []
+            busy = [worker for worker in self._workers if worker not in idle]
+            self._cond.notify_all()
+        for worker in idle:
+            self._forget(worker)
+            worker.stop(self.stop_grace)
+        for worker in busy:
+            worker.cancel_event.set()
+            # Queued behind the cancelled job, so the worker loop exits instead of waiting for another task
+            try:
+                worker.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        deadline = time.monotonic() + self.stop_grace
+        for worker in busy:
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                worker.stop(1.0)
+        logger.info("Scrape workers stopped")
+
+    def status(self):
+        """Snapshot of worker occupancy and counters"""
+        with self._cond:
+            return {
+                'size': self.size,
+                'live': len(self._workers),
+                'idle': len(self._idle),
+                'in_use': len(self._workers) - len(self._idle),
+                'max_jobs': self.max_jobs,
+                'max_rss_mb': round(self.max_rss / 2 ** 20) if self.max_rss else None,
+                'workers': [{'pid': worker.pid, 'jobs': worker.jobs, 'busy': worker.busy,
+                             'rss_mb': round(worker.rss / 2 ** 20, 1) if worker.rss is not None else None}
+                            for worker in self._workers],
+                **self.stats
+            }
@@ -1,5 +1,10 @@
 # wsgi.py (for production deployment)
-from app import app
+from app import app, start_driver_prewarm, install_shutdown_handlers
+
+# Close browsers and scrape worker processes when the server stops this process
+install_shutdown_handlers()
+# Opt-in with DRIVER_PREWARM=<n>; each worker otherwise starts its first browser on the first scrape
+start_driver_prewarm()
 
 if __name__ == "__main__":
-    app.run()
\ No newline at end of file
+    app.run()